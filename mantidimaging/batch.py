@@ -0,0 +1,364 @@
+#!/usr/bin/env python
+# Copyright (C) 2023 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+Headless batch processing: load a stack, replay an operation history on it,
+optionally reconstruct it, and save the result. No display is needed.
+
+Every operation from the operations window can be replayed, with these exceptions:
+
+- Flat-fielding uses flat and dark stacks, which are not saved in the operation history.
+  They are given with --flat-before, --flat-after, --dark-before and --dark-after, as
+  needed by the flat fielding method that was used.
+- ROI Normalisation in 'Flat Field' mode uses the stack given with --flat-before.
+- Monitor Normalisation uses the log file loaded with a stack in the GUI, which is not
+  loaded here, so it can not be replayed.
+
+These are checked before any data is loaded. Entries that are not operations, such as
+COR/tilt finding, are skipped.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from logging import getLogger
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+import mantidimaging.core.parallel.manager as pm
+from mantidimaging import helper as h
+from mantidimaging.core.data import ImageStack
+from mantidimaging.core.io import loader, saver
+from mantidimaging.core.io.streaming import stream_process
+from mantidimaging.core.io.utility import DEFAULT_IO_FILE_FORMAT, get_file_names
+from mantidimaging.core.operation_history import const
+from mantidimaging.core.operation_history.operations import ImageOperation, apply_operations
+from mantidimaging.core.operations.loader import load_filter_packages
+from mantidimaging.core.reconstruct import get_reconstructor_for
+from mantidimaging.core.rotation.data_model import CorTiltDataModel
+from mantidimaging.core.utility.cuda_check import CudaChecker
+from mantidimaging.core.utility.data_containers import Degrees, ReconstructionParameters, ScalarCoR
+
+LOG = getLogger(__name__)
+
+# Used when no algorithm is given, the same as the reconstruction window offers with and without CUDA
+CUDA_ALGORITHM = "FBP_CUDA"
+CPU_ALGORITHM = "gridrec"
+
+# Stacks used by operations, which are not saved in the operation history, by their command line option
+STACK_INPUT_OPTIONS = {
+    "flat_before": "flat before",
+    "flat_after": "flat after",
+    "dark_before": "dark before",
+    "dark_after": "dark after",
+}
+
+# For each operation, the stack given to each of its keyword arguments
+OPERATION_STACK_INPUTS = {
+    "FlatFieldFilter": {
+        "flat_before": "flat_before",
+        "flat_after": "flat_after",
+        "dark_before": "dark_before",
+        "dark_after": "dark_after",
+    },
+    "RoiNormalisationFilter": {
+        "flat_field": "flat_before"
+    },
+}
+
+# Operations that can not be replayed, with the reason
+UNREPLAYABLE_OPERATIONS = {
+    "MonitorNormalisation": "it uses the log file loaded with the stack in the GUI",
+}
+
+
+def parse_args(args: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Mantid Imaging batch processing")
+
+    parser.add_argument(
+        "--log-level",
+        type=str,
+        default="INFO",
+        help="Log verbosity level. "
+        "Available options are: TRACE, DEBUG, INFO, WARN, CRITICAL",
+    )
+
+    parser.add_argument("--input-path", type=str, required=True, help="Directory containing the images to load.")
+    parser.add_argument("--in-prefix", type=str, default="", help="Prefix of the images to load.")
+    parser.add_argument("--in-format", type=str, default=DEFAULT_IO_FILE_FORMAT, help="Format of the images to load.")
+
+    parser.add_argument("--operation-history",
+                        type=str,
+                        help="JSON file containing an operation_history, e.g. the metadata saved alongside a stack.")
+    for name, description in STACK_INPUT_OPTIONS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}",
+                            type=str,
+                            help=f"Directory containing the {description} images, for operations that use them.")
+
+    parser.add_argument("--reconstruct", default=False, action="store_true", help="Reconstruct the processed stack.")
+    parser.add_argument("--algorithm",
+                        type=str,
+                        help=f"Reconstruction algorithm. Defaults to {CUDA_ALGORITHM} if CUDA is available, "
+                        f"otherwise {CPU_ALGORITHM}.")
+    parser.add_argument("--filter-name",
+                        type=str,
+                        help="Reconstruction filter. Defaults to the first filter the algorithm allows.")
+    parser.add_argument("--num-iter", type=int, default=1, help="Number of iterations for iterative algorithms.")
+    parser.add_argument("--cor",
+                        type=float,
+                        help="Centre of rotation. Defaults to the value in the operation history, "
+                        "or the middle of the image.")
+    parser.add_argument("--tilt",
+                        type=float,
+                        help="Tilt angle in degrees. Defaults to the value in the operation history, or 0.")
+    parser.add_argument("--max-projection-angle", type=float, default=360.0, help="Maximum projection angle.")
+
+    parser.add_argument("--output-path", type=str, required=True, help="Directory to save the result into.")
+    parser.add_argument("--out-prefix", type=str, default="image", help="Prefix for the saved images.")
+    parser.add_argument("--out-format", type=str, default=DEFAULT_IO_FILE_FORMAT, help="Format of the saved images.")
+    parser.add_argument("--pixel-depth",
+                        type=str,
+                        default="float32",
+                        choices=["float32", "int16"],
+                        help="Pixel depth of the saved images.")
+    parser.add_argument("--overwrite", default=False, action="store_true", help="Overwrite existing files.")
+
+    parser.add_argument("--slab-size",
+                        type=int,
+                        help="Process the stack out-of-core, this many projections at a time. "
+                        "Use 0 to choose the size from the free memory.")
+    parser.add_argument("--scratch-path",
+                        type=str,
+                        help="Directory for the intermediate volume when processing out-of-core with "
+                        "sinogram operations. Defaults to the system temporary directory.")
+
+    parsed = parser.parse_args(args)
+    if parsed.slab_size is not None:
+        if parsed.reconstruct:
+            parser.error("--reconstruct can not be used with --slab-size")
+        if parsed.pixel_depth != "float32":
+            parser.error("--slab-size only supports saving with --pixel-depth float32")
+    return parsed
+
+
+def load_operation_history(path: str) -> List[Dict[str, Any]]:
+    """
+    Read the operation history from a JSON file. The file can either contain the stack
+    metadata (with an operation_history key), or just the list of operations.
+    """
+    with open(path) as f:
+        contents = json.load(f)
+
+    if isinstance(contents, list):
+        return contents
+    return contents.get(const.OPERATION_HISTORY, [])
+
+
+def find_cor_and_tilt(history: List[Dict[str, Any]], width: int, cor: Optional[float],
+                      tilt: Optional[float]) -> Tuple[float, float]:
+    """
+    Pick the COR and tilt to reconstruct with. Values passed on the command line take priority,
+    then the last COR/tilt finding result in the history, otherwise the middle of the image and no tilt.
+    """
+    history_cor, history_tilt = width / 2, 0.0
+    for entry in history:
+        if entry[const.OPERATION_NAME] == const.OPERATION_NAME_COR_TILT_FINDING:
+            kwargs = entry[const.OPERATION_KEYWORD_ARGS]
+            history_cor = kwargs.get(const.COR_TILT_ROTATION_CENTRE, history_cor)
+            history_tilt = kwargs.get(const.COR_TILT_TILT_ANGLE_DEG, history_tilt)
+
+    return (cor if cor is not None else history_cor), (tilt if tilt is not None else history_tilt)
+
+
+def replayable_operations(history: List[Dict[str, Any]]) -> List[ImageOperation]:
+    """
+    The entries of the history that are operations, skipping things like COR/tilt finding.
+    """
+    filter_names = {f.__name__ for f in load_filter_packages(ignored_packages=['mantidimaging.core.operations.wip'])}
+
+    ops = []
+    for entry in history:
+        op = ImageOperation.from_serialized(entry)
+        if op.filter_name in filter_names:
+            ops.append(op)
+        else:
+            LOG.info(f"Skipping '{op.filter_name}', it is not an operation that can be replayed")
+    return ops
+
+
+def _required_stack_inputs(op: ImageOperation) -> List[str]:
+    kwargs = op.filter_kwargs
+    if op.filter_name == "FlatFieldFilter":
+        return {
+            "Only Before": ["flat_before", "dark_before"],
+            "Only After": ["flat_after", "dark_after"],
+            "Both, concatenated": ["flat_before", "flat_after", "dark_before", "dark_after"],
+        }.get(kwargs.get("selected_flat_fielding", ""), [])
+    if op.filter_name == "RoiNormalisationFilter" and kwargs.get("normalisation_mode") == "Flat Field":
+        return ["flat_field"]
+    return []
+
+
+def check_replayable(ops: List[ImageOperation], given_inputs: Collection[str]):
+    """
+    Check that all the operations can be replayed, so that a history that can not be is rejected
+    before any data is loaded.
+
+    :param ops: The operations to replay
+    :param given_inputs: The names from STACK_INPUT_OPTIONS of the stacks given on the command line
+    :raises ValueError: If an operation can not be replayed, or needs a stack that was not given
+    """
+    problems = []
+    for op in ops:
+        if op.filter_name in UNREPLAYABLE_OPERATIONS:
+            problems.append(f"'{op.display_name}' can not be replayed, {UNREPLAYABLE_OPERATIONS[op.filter_name]}")
+            continue
+
+        inputs = OPERATION_STACK_INPUTS.get(op.filter_name, {})
+        missing = [inputs[kwarg] for kwarg in _required_stack_inputs(op) if inputs[kwarg] not in given_inputs]
+        if missing:
+            options = ", ".join(f"--{name.replace('_', '-')}" for name in missing)
+            problems.append(f"'{op.display_name}' needs {options}")
+
+    if problems:
+        raise ValueError("The operation history can not be replayed: " + "; ".join(problems))
+
+
+def add_stack_inputs(ops: List[ImageOperation], stack_inputs: Dict[str, ImageStack]) -> List[ImageOperation]:
+    """
+    Give the operations the flat and dark stacks they use.
+
+    :param ops: The operations to replay
+    :param stack_inputs: The stacks given on the command line, by the names in STACK_INPUT_OPTIONS
+    :return: The operations, with the stacks added to their keyword arguments
+    """
+    with_inputs = []
+    for op in ops:
+        kwargs = dict(op.filter_kwargs)
+        for kwarg, input_name in OPERATION_STACK_INPUTS.get(op.filter_name, {}).items():
+            if input_name in stack_inputs:
+                kwargs[kwarg] = stack_inputs[input_name]
+        with_inputs.append(ImageOperation(op.filter_name, kwargs, op.display_name))
+    return with_inputs
+
+
+def load_stack_inputs(args: argparse.Namespace) -> Dict[str, ImageStack]:
+    stack_inputs = {}
+    for name in STACK_INPUT_OPTIONS:
+        path = getattr(args, name, None)
+        if path:
+            stack_inputs[name] = loader.load(path, in_format=args.in_format)
+            LOG.info(f"Loaded {STACK_INPUT_OPTIONS[name]} {stack_inputs[name]}")
+    return stack_inputs
+
+
+def prepare_operations(history: List[Dict[str, Any]], args: argparse.Namespace) -> List[ImageOperation]:
+    """
+    The operations of the history to replay, given the stacks they use from the command line options.
+    """
+    ops = replayable_operations(history)
+    if not ops:
+        return ops
+    check_replayable(ops, [name for name in STACK_INPUT_OPTIONS if getattr(args, name, None)])
+    return add_stack_inputs(ops, load_stack_inputs(args))
+
+
+def replay_history(images: ImageStack, ops: List[ImageOperation]) -> ImageStack:
+    """
+    Apply each operation to the images, recording it in the stack's own history as the
+    operations window does. Runs of element-wise operations are applied in a single pass
+    over the stack.
+    """
+    for op in ops:
+        LOG.info(f"Applying {op}")
+    return apply_operations(images, ops)
+
+
+def default_algorithm() -> str:
+    return CUDA_ALGORITHM if CudaChecker().cuda_is_present() else CPU_ALGORITHM
+
+
+def reconstruct(images: ImageStack, history: List[Dict[str, Any]], args: argparse.Namespace) -> ImageStack:
+    cor, tilt = find_cor_and_tilt(history, images.width, args.cor, args.tilt)
+    algorithm = args.algorithm or default_algorithm()
+    reconstructor = get_reconstructor_for(algorithm)
+    filter_name = args.filter_name or reconstructor.allowed_filters()[0]
+    LOG.info(f"Reconstructing with {algorithm} ({filter_name}), COR {cor}, tilt {tilt}")
+
+    data_model = CorTiltDataModel()
+    data_model.set_precalculated(ScalarCoR(float(cor)), Degrees(float(tilt)))
+
+    recon_params = ReconstructionParameters(algorithm=algorithm,
+                                            filter_name=filter_name,
+                                            num_iter=args.num_iter,
+                                            cor=ScalarCoR(float(cor)),
+                                            tilt=Degrees(float(tilt)),
+                                            max_projection_angle=args.max_projection_angle)
+    return reconstructor.full(images, data_model.get_all_cors_from_regression(images.height), recon_params)
+
+
+def run_streaming(args: argparse.Namespace):
+    history = load_operation_history(args.operation_history) if args.operation_history else []
+    ops = prepare_operations(history, args)
+    file_names = get_file_names(args.input_path, args.in_format, args.in_prefix)
+
+    stream_process(file_names,
+                   ops,
+                   args.output_path,
+                   in_format=args.in_format,
+                   slab_size=args.slab_size or None,
+                   scratch_dir=args.scratch_path,
+                   name_prefix=args.out_prefix,
+                   out_format=args.out_format,
+                   overwrite_all=args.overwrite)
+    LOG.info(f"Saved to {args.output_path}")
+
+
+def run(args: argparse.Namespace):
+    if args.slab_size is not None:
+        return run_streaming(args)
+
+    history = load_operation_history(args.operation_history) if args.operation_history else []
+    ops = prepare_operations(history, args)
+
+    images = loader.load(args.input_path, in_prefix=args.in_prefix, in_format=args.in_format)
+    LOG.info(f"Loaded {images}")
+
+    if ops and const.OPERATION_HISTORY in images.metadata:
+        # The replayed operations are recorded instead, otherwise replaying the history saved
+        # alongside the input images would record its operations twice
+        LOG.info("Replacing the operation history loaded with the input images")
+        del images.metadata[const.OPERATION_HISTORY]
+    images = replay_history(images, ops)
+
+    if args.reconstruct:
+        images = reconstruct(images, history, args)
+
+    saver.image_save(images,
+                     args.output_path,
+                     name_prefix=args.out_prefix,
+                     out_format=args.out_format,
+                     overwrite_all=args.overwrite,
+                     pixel_depth=args.pixel_depth)
+    LOG.info(f"Saved to {args.output_path}")
+
+
+def main():
+    args = parse_args()
+
+    h.initialise_logging(logging.getLevelName(args.log_level))
+
+    try:
+        pm.create_and_start_pool()
+        run(args)
+    except BaseException as e:
+        if sys.platform == 'linux':
+            pm.clear_memory_from_current_process_linux()
+        raise e
+    finally:
+        pm.end_pool()
+
+
+if __name__ == "__main__":
+    main()
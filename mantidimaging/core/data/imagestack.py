@@ -7,10 +7,11 @@ import json
 import os.path
 import uuid
 from copy import deepcopy
-from typing import List, Optional, Any, Dict, Union, TextIO, TYPE_CHECKING
+from typing import List, Optional, Any, Dict, Tuple, Union, TextIO, TYPE_CHECKING
 
 import numpy as np
 
+from mantidimaging.core.data.stack_statistics import StackStatistics, calculate_histogram, calculate_statistics
 from mantidimaging.core.data.utility import mark_cropped
 from mantidimaging.core.operation_history import const
 from mantidimaging.core.parallel import utility as pu
@@ -20,6 +21,7 @@ from mantidimaging.core.utility.leak_tracker import leak_tracker
 
 if TYPE_CHECKING:
     from mantidimaging.core.utility.imat_log_file_parser import IMATLogFile
+    from mantidimaging.core.utility.progress_reporting import Progress
 
 
 class ImageStack:
@@ -57,6 +59,9 @@ class ImageStack:
         self._proj180deg: Optional[ImageStack] = None
         self._log_file: Optional[IMATLogFile] = None
         self._projection_angles: Optional[ProjectionAngles] = None
+        self._statistics: Optional[StackStatistics] = None
+        self._version = 0
+        self._slice_of: Optional[Tuple[uuid.UUID, int, int]] = None
 
         if name is None:
             if filenames is not None:
@@ -116,6 +121,7 @@ class ImageStack:
         json.dump(self.metadata, f, indent=4)
 
     def record_operation(self, func_name: str, display_name, *args, **kwargs):
+        self.invalidate_statistics()
         if const.OPERATION_HISTORY not in self.metadata:
             self.metadata[const.OPERATION_HISTORY] = []
 
@@ -136,6 +142,45 @@ class ImageStack:
             const.OPERATION_DISPLAY_NAME: display_name
         })
 
+    def statistics(self, progress: Optional[Progress] = None) -> StackStatistics:
+        """
+        Min, max and the number of NaN, zero and negative values in the stack. These are calculated in a
+        single pass over the data and cached until an operation is recorded or the data is replaced.
+        Anything changing the data in place without recording an operation must call invalidate_statistics.
+        """
+        if self._statistics is None:
+            self._statistics = calculate_statistics(self._shared_array, progress)
+        return self._statistics
+
+    def histogram(self, bins: int = 256, progress: Optional[Progress] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Histogram of the whole stack between its min and max, cached alongside the statistics.
+
+        :return: The counts and the bin edges, as from np.histogram
+        """
+        return calculate_histogram(self._shared_array, self.statistics(progress), bins, progress)
+
+    def invalidate_statistics(self):
+        """
+        Mark the data as changed. The statistics are calculated again when next needed, and the version is
+        incremented so that other results calculated from the old data are not reused.
+        """
+        self._statistics = None
+        self._version += 1
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def image_key(self, index: int) -> Tuple[uuid.UUID, int, int]:
+        """
+        Identifies the current data of an image, for caching results calculated from it. A stack made by
+        slice_as_image_stack shares the key of the original image until its data is changed.
+        """
+        if self._slice_of is not None and self._version == 0:
+            return self._slice_of
+        return self._id, self._version, index
+
     def copy(self, flip_axes=False) -> 'ImageStack':
         shape = (self.data.shape[1], self.data.shape[0], self.data.shape[2]) if flip_axes else self.data.shape
         data_copy = pu.create_array(shape, self.data.dtype)
@@ -166,7 +211,9 @@ class ImageStack:
 
     def slice_as_image_stack(self, index) -> 'ImageStack':
         "A slice, either projection or sinogram depending on current ordering"
-        return ImageStack(self.slice_as_array(index), metadata=deepcopy(self.metadata), sinograms=self.is_sinograms)
+        images = ImageStack(self.slice_as_array(index), metadata=deepcopy(self.metadata), sinograms=self.is_sinograms)
+        images._slice_of = self.image_key(index)
+        return images
 
     def sino_as_image_stack(self, index) -> 'ImageStack':
         "A single sinogram slice as an ImageStack in projection ordering"
@@ -247,6 +294,7 @@ class ImageStack:
     @data.setter
     def data(self, other: np.ndarray):
         self._shared_array.array = other
+        self.invalidate_statistics()
 
     @property
     def shared_array(self) -> pu.SharedArray:
@@ -255,6 +303,7 @@ class ImageStack:
     @shared_array.setter
     def shared_array(self, shared_array: pu.SharedArray):
         self._shared_array = shared_array
+        self.invalidate_statistics()
 
     @property
     def uses_shared_memory(self) -> bool:
@@ -264,9 +313,13 @@ class ImageStack:
     def dtype(self):
         return self.data.dtype
 
+    @property
+    def uses_memmap(self) -> bool:
+        return self._shared_array.memmap_path is not None
+
     @staticmethod
-    def create_empty_image_stack(shape, dtype, metadata) -> 'ImageStack':
-        arr = pu.create_array(shape, dtype)
+    def create_empty_image_stack(shape, dtype, metadata, scratch_dir: Optional[str] = None) -> 'ImageStack':
+        arr = pu.create_array(shape, dtype, scratch_dir)
         return ImageStack(arr, metadata=metadata)
 
     @property
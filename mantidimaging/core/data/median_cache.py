@@ -0,0 +1,163 @@
+# Copyright (C) 2023 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from mantidimaging.core.parallel import shared as ps
+from mantidimaging.core.parallel import utility as pu
+from mantidimaging.core.utility import median
+from mantidimaging.core.utility.memory_usage import system_free_memory
+from mantidimaging.core.utility.size_calculator import full_size_bytes
+
+if TYPE_CHECKING:
+    import uuid
+    from mantidimaging.core.data import ImageStack
+    from mantidimaging.core.utility.progress_reporting import Progress
+
+# Fraction of the free memory, including the memory the cache already uses, that can be used to keep median
+# images between operations
+MEDIAN_CACHE_MEMORY_FRACTION = 0.25
+
+# ImageStack.image_key of the filtered image, the kernel size and the edge mode
+MedianKey = Tuple[Tuple['uuid.UUID', int, int], int, str]
+
+
+class MedianCache:
+    """
+    Median filtered images, kept so that operations needing the medians of the same data with the same kernel,
+    e.g. Remove Outliers and NaN Removal and their previews, do not calculate them again.
+
+    The images are kept in the shared arrays they were calculated in, rather than copied, and an array is kept
+    until none of its images are left in the cache. The least recently used images are dropped to keep the
+    arrays within max_bytes.
+    """
+    def __init__(self, max_bytes: Optional[int] = None):
+        """
+        :param max_bytes: Memory the cached arrays can use. By default this is MEDIAN_CACHE_MEMORY_FRACTION of the
+                          free memory, checked each time it is needed.
+        """
+        self._max_bytes = max_bytes
+        self._images: OrderedDict[MedianKey, Tuple[pu.SharedArray, int]] = OrderedDict()
+        self._num_images: Dict[int, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_bytes(self) -> int:
+        if self._max_bytes is not None:
+            return self._max_bytes
+        free_bytes = system_free_memory().kb() * 1024
+        return max(0, int((free_bytes + self._bytes) * MEDIAN_CACHE_MEMORY_FRACTION))
+
+    def copy_to(self, key: MedianKey, out: np.ndarray) -> bool:
+        """
+        Copy a cached image into out. The copy is made while the cache is locked, so that the array holding the
+        image can't be freed part way through.
+
+        :return: Whether the image was in the cache
+        """
+        with self._lock:
+            if key not in self._images:
+                return False
+            self._images.move_to_end(key)
+            images, index = self._images[key]
+            out[:] = images.array[index]
+            return True
+
+    def put(self, key: MedianKey, images: pu.SharedArray, index: int):
+        """
+        Keep an image of a shared array. The array should not be changed afterwards.
+        """
+        with self._lock:
+            self._remove(key)
+            self._images[key] = (images, index)
+            if self._num_images.get(id(images), 0) == 0:
+                self._bytes += images.array.nbytes
+            self._num_images[id(images)] = self._num_images.get(id(images), 0) + 1
+            max_bytes = self.max_bytes
+            while self._bytes > max_bytes and self._images:
+                self._remove(next(iter(self._images)))
+
+    def forget_stack(self, stack_id: uuid.UUID):
+        """
+        Drop the images of a stack, e.g. when it is deleted. The keys start with ImageStack.image_key.
+        """
+        with self._lock:
+            for key in [key for key in self._images if key[0][0] == stack_id]:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self._num_images.clear()
+            self._bytes = 0
+
+    def _remove(self, key: MedianKey):
+        if key not in self._images:
+            return
+        images, _ = self._images.pop(key)
+        self._num_images[id(images)] -= 1
+        if self._num_images[id(images)] == 0:
+            del self._num_images[id(images)]
+            self._bytes -= images.array.nbytes
+
+
+median_cache = MedianCache()
+
+
+def _median_compute_function(index: int, arrays: List[np.ndarray], params: Dict[str, Any]):
+    image = arrays[0][params['indices'][index]]
+    median_image = median.median_filter(image, params['size'], params['mode'], keep_nans=False)
+    arrays[1][params['out_indices'][index]] = median_image
+
+
+def median_images(images: ImageStack,
+                  indices: Sequence[int],
+                  size: int,
+                  mode: str,
+                  progress: Optional[Progress] = None) -> Optional[pu.SharedArray]:
+    """
+    Median filter some of the images of a stack, reusing the medians already in the cache. The others are
+    calculated in parallel and added to it. The images are keyed by ImageStack.image_key, so changing the data
+    or recording an operation stops old medians being used.
+
+    NaNs are treated as negative infinity, and are not put back in the medians.
+
+    :param images: The stack
+    :param indices: The images to filter
+    :param size: Width of the median kernel
+    :param mode: How the edges are handled, as in scipy.ndimage.median_filter
+    :param progress: Progress instance to use for progress reporting
+    :return: The medians, in the order of indices, which must not be changed as the cache keeps them.
+             None if they would not fit in the cache, in which case they should be calculated image by image as
+             they are used, rather than holding them all in memory.
+    """
+    image_shape = images.data.shape[1:]
+    if len(indices) * full_size_bytes(image_shape, images.dtype) > median_cache.max_bytes:
+        return None
+
+    keys: List[MedianKey] = [(images.image_key(idx), size, mode) for idx in indices]
+    medians = pu.create_array((len(indices), ) + image_shape, images.dtype)
+    missing = []
+    for out_idx, key in enumerate(keys):
+        if not median_cache.copy_to(key, medians.array[out_idx]):
+            missing.append(out_idx)
+
+    if missing:
+        params = {
+            'indices': [indices[out_idx] for out_idx in missing],
+            'out_indices': missing,
+            'size': size,
+            'mode': mode
+        }
+        ps.run_compute_func(_median_compute_function, len(missing), [images.shared_array, medians], params, progress)
+    # Keep all the images in the new array, so that older arrays are freed once their images are all replaced
+    for out_idx, key in enumerate(keys):
+        median_cache.put(key, medians, out_idx)
+    medians.array.flags.writeable = False
+    return medians
@@ -0,0 +1,98 @@
+# Copyright (C) 2023 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from mantidimaging.core.parallel import shared as ps
+from mantidimaging.core.parallel import utility as pu
+from mantidimaging.core.utility.progress_reporting import Progress
+
+# Columns of the per image statistics array
+_MIN, _MAX, _NANS, _ZEROES, _NEGATIVES = range(5)
+_NUM_COLUMNS = 5
+
+
+@dataclass
+class StackStatistics:
+    """
+    Statistics of a whole stack, kept per image so that the images containing e.g. negative values can be found
+    without scanning the data again. NaNs are ignored for the min and max, and count as non zero.
+    """
+    per_image: np.ndarray
+    histograms: Dict[int, Tuple[np.ndarray, np.ndarray]] = field(default_factory=dict)
+
+    @property
+    def min(self) -> float:
+        return float(np.fmin.reduce(self.per_image[:, _MIN])) if len(self.per_image) else np.nan
+
+    @property
+    def max(self) -> float:
+        return float(np.fmax.reduce(self.per_image[:, _MAX])) if len(self.per_image) else np.nan
+
+    @property
+    def nan_count(self) -> int:
+        return int(self.per_image[:, _NANS].sum())
+
+    @property
+    def zero_count(self) -> int:
+        return int(self.per_image[:, _ZEROES].sum())
+
+    @property
+    def negative_count(self) -> int:
+        return int(self.per_image[:, _NEGATIVES].sum())
+
+    def images_with_negative_values(self) -> List[int]:
+        return np.flatnonzero(self.per_image[:, _NEGATIVES]).tolist()
+
+    def images_with_nans(self) -> List[int]:
+        return np.flatnonzero(self.per_image[:, _NANS]).tolist()
+
+
+def _statistics_compute_function(index: int, arrays: List[np.ndarray], params: Dict[str, Any]):
+    image = np.ravel(arrays[0][index])
+    result = arrays[1][index]
+    result[_MIN] = np.fmin.reduce(image) if image.size else np.nan
+    result[_MAX] = np.fmax.reduce(image) if image.size else np.nan
+    result[_NANS] = np.count_nonzero(np.isnan(image))
+    result[_ZEROES] = image.size - np.count_nonzero(image)
+    result[_NEGATIVES] = np.count_nonzero(image < 0)
+
+
+def calculate_statistics(data: pu.SharedArray, progress: Optional[Progress] = None) -> StackStatistics:
+    """
+    Calculate the statistics of the stack in a single pass over the data, in parallel over the images.
+    """
+    num_images = data.array.shape[0]
+    per_image = pu.create_array((num_images, _NUM_COLUMNS), np.float64)
+    ps.run_compute_func(_statistics_compute_function, num_images, [data, per_image], {}, progress)
+    return StackStatistics(per_image.array.copy())
+
+
+def _histogram_compute_function(index: int, arrays: List[np.ndarray], params: Dict[str, Any]):
+    arrays[1][index] = np.histogram(arrays[0][index], bins=params['bin_edges'])[0]
+
+
+def calculate_histogram(data: pu.SharedArray,
+                        statistics: StackStatistics,
+                        bins: int,
+                        progress: Optional[Progress] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Histogram of the whole stack between its min and max, ignoring NaNs. Calculated per image in
+    parallel and summed. The result is cached in the statistics.
+
+    :return: The counts and the bin edges, as from np.histogram
+    """
+    if bins not in statistics.histograms:
+        low, high = statistics.min, statistics.max
+        if np.isnan(low):
+            low, high = 0.0, 1.0
+        bin_edges = np.histogram_bin_edges([], bins=bins, range=(low, high))
+        num_images = data.array.shape[0]
+        counts = pu.create_array((num_images, bins), np.int64)
+        ps.run_compute_func(_histogram_compute_function, num_images, [data, counts], {'bin_edges': bin_edges}, progress)
+        statistics.histograms[bins] = (counts.array.sum(axis=0), bin_edges)
+    return statistics.histograms[bins]
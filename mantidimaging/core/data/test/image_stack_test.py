@@ -287,3 +287,45 @@ class ImageStackTest(unittest.TestCase):
 
         image = ImageStack(raw_pixels.copy(), name="tomo", sinograms=True)
         np.testing.assert_array_equal(raw_pixels[[0], :, :].swapaxes(0, 1), image.sino_as_image_stack(0).data)
+
+    def test_statistics_are_cached(self):
+        images = generate_images()
+        stats = images.statistics()
+
+        self.assertIs(stats, images.statistics())
+
+    def test_record_operation_invalidates_statistics(self):
+        images = generate_images()
+        images.data[:] = 1
+        self.assertEqual(0, images.statistics().negative_count)
+
+        images.data[0, 0, 0] = -1
+        images.record_operation('test_func', 'A pretty name')
+
+        self.assertEqual(1, images.statistics().negative_count)
+
+    def test_replacing_data_invalidates_statistics(self):
+        images = generate_images()
+        images.statistics()
+
+        images.data = np.zeros((2, 3, 3))
+
+        self.assertEqual(18, images.statistics().zero_count)
+
+    def test_image_key_changes_with_data(self):
+        images = generate_images()
+        key = images.image_key(1)
+
+        self.assertEqual(key, images.image_key(1))
+        self.assertNotEqual(key, images.image_key(2))
+        images.record_operation('test_func', 'A pretty name')
+        self.assertNotEqual(key, images.image_key(1))
+        self.assertEqual(1, images.version)
+
+    def test_slice_shares_image_key_until_changed(self):
+        images = generate_images()
+        slice = images.slice_as_image_stack(1)
+
+        self.assertEqual(images.image_key(1), slice.image_key(0))
+        slice.record_operation('test_func', 'A pretty name')
+        self.assertNotEqual(images.image_key(1), slice.image_key(0))
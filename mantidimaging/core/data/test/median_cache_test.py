@@ -0,0 +1,130 @@
+# Copyright (C) 2023 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import unittest
+import uuid
+from unittest import mock
+
+import numpy as np
+import numpy.testing as npt
+
+from mantidimaging.core.data import median_cache
+from mantidimaging.core.data.median_cache import MedianCache, median_images
+from mantidimaging.core.parallel import utility as pu
+from mantidimaging.core.utility.median import median_filter
+from mantidimaging.test_helpers.start_qapplication import start_multiprocessing_pool
+from mantidimaging.test_helpers.unit_test_helper import generate_images
+
+
+def _shared(values) -> pu.SharedArray:
+    shared = pu.create_array((len(values), 1), np.float64)
+    shared.array[:, 0] = values
+    return shared
+
+
+class MedianCacheTest(unittest.TestCase):
+    def test_drops_least_recently_used(self):
+        cache = MedianCache(max_bytes=3 * 8)
+        for key in range(3):
+            cache.put(key, _shared([key]), 0)
+        out = np.zeros(1)
+        cache.copy_to(0, out)
+        cache.put(3, _shared([3]), 0)
+
+        self.assertFalse(cache.copy_to(1, out))
+        self.assertTrue(cache.copy_to(0, out))
+        self.assertEqual(0, out[0])
+        self.assertTrue(cache.copy_to(3, out))
+        self.assertEqual(3, out[0])
+
+    def test_array_kept_until_all_its_images_are_replaced(self):
+        cache = MedianCache(max_bytes=3 * 8)
+        first = _shared([0, 1])
+        cache.put(0, first, 0)
+        cache.put(1, first, 1)
+        self.assertEqual(2 * 8, cache._bytes)
+
+        cache.put(0, _shared([5]), 0)
+        self.assertEqual(3 * 8, cache._bytes)
+        cache.put(1, _shared([6]), 0)
+        self.assertEqual(2 * 8, cache._bytes)
+
+    @mock.patch("mantidimaging.core.data.median_cache.system_free_memory")
+    def test_default_max_bytes_from_free_memory(self, free_memory):
+        free_memory.return_value.kb.return_value = 100 * 8 / 1024
+        cache = MedianCache()
+        cache.put(0, _shared([0, 1, 2, 3]), 0)
+
+        # the memory already used by the cache counts as free
+        self.assertEqual(int(104 * 8 * median_cache.MEDIAN_CACHE_MEMORY_FRACTION), cache.max_bytes)
+        self.assertEqual(123, MedianCache(max_bytes=123).max_bytes)
+
+    def test_forget_stack(self):
+        cache = MedianCache()
+        stack_id, other_id = uuid.uuid4(), uuid.uuid4()
+        shared = _shared([1, 2, 3])
+        for index, key_id in enumerate([stack_id, stack_id, other_id]):
+            cache.put(((key_id, 0, index), 3, 'reflect'), shared, index)
+
+        cache.forget_stack(stack_id)
+
+        out = np.zeros(1)
+        self.assertFalse(cache.copy_to(((stack_id, 0, 0), 3, 'reflect'), out))
+        self.assertTrue(cache.copy_to(((other_id, 0, 2), 3, 'reflect'), out))
+        self.assertEqual(3, out[0])
+
+
+@start_multiprocessing_pool
+class MedianImagesTest(unittest.TestCase):
+    def setUp(self):
+        self.images = generate_images((12, 8, 10))
+        self.images.data[2, 1, 1] = np.nan
+        median_cache.median_cache.clear()
+
+    def tearDown(self):
+        median_cache.median_cache.clear()
+
+    def test_medians(self):
+        medians = median_images(self.images, [2, 5], 3, 'reflect')
+
+        self.assertFalse(medians.array.flags.writeable)
+
+        npt.assert_equal(medians.array[0], median_filter(self.images.data[2].copy(), 3, keep_nans=False))
+        npt.assert_equal(medians.array[1], median_filter(self.images.data[5].copy(), 3))
+
+    @mock.patch("mantidimaging.core.data.median_cache.ps.run_compute_func", wraps=median_cache.ps.run_compute_func)
+    def test_only_missing_medians_are_calculated(self, run_compute_func):
+        first = median_images(self.images, [2, 5], 3, 'reflect')
+        second = median_images(self.images, [5, 6, 2], 3, 'reflect')
+
+        self.assertEqual(2, run_compute_func.call_count)
+        self.assertEqual(1, run_compute_func.call_args.args[1])
+        npt.assert_equal(second.array[[2, 0]], first.array)
+
+    @mock.patch("mantidimaging.core.data.median_cache.ps.run_compute_func", wraps=median_cache.ps.run_compute_func)
+    def test_kernel_and_version_are_part_of_key(self, run_compute_func):
+        median_images(self.images, [2], 3, 'reflect')
+        median_images(self.images, [2], 5, 'reflect')
+        median_images(self.images, [2], 3, 'mirror')
+        self.images.record_operation('test_func', 'A pretty name')
+        median_images(self.images, [2], 3, 'reflect')
+
+        self.assertEqual(4, run_compute_func.call_count)
+
+    def test_previews_share_medians(self):
+        medians = median_images(self.images, [2], 3, 'reflect')
+
+        with mock.patch("mantidimaging.core.data.median_cache.ps.run_compute_func") as run_compute_func:
+            preview_medians = median_images(self.images.slice_as_image_stack(2), [0], 3, 'reflect')
+
+        run_compute_func.assert_not_called()
+        npt.assert_equal(preview_medians.array, medians.array)
+
+    @mock.patch("mantidimaging.core.data.median_cache.median_cache", MedianCache(max_bytes=100))
+    def test_too_large_to_cache(self):
+        self.assertIsNone(median_images(self.images, [2, 5], 3, 'reflect'))
+
+
+if __name__ == '__main__':
+    unittest.main()
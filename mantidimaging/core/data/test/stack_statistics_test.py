@@ -0,0 +1,57 @@
+# Copyright (C) 2023 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import unittest
+
+import numpy as np
+import numpy.testing as npt
+
+from mantidimaging.core.data.stack_statistics import calculate_histogram, calculate_statistics
+from mantidimaging.test_helpers.start_qapplication import start_multiprocessing_pool
+from mantidimaging.test_helpers.unit_test_helper import generate_images
+
+
+@start_multiprocessing_pool
+class StackStatisticsTest(unittest.TestCase):
+    def setUp(self):
+        self.images = generate_images((15, 8, 10))
+        self.images.data[2, 1, 1] = np.nan
+        self.images.data[3, 2, 2] = np.nan
+        self.images.data[4, 0, 0:3] = 0
+        self.images.data[5, 3, 3] = -2
+        self.images.data[9, 3, 3] = -1
+
+    def test_matches_numpy(self):
+        data = self.images.data
+        stats = calculate_statistics(self.images.shared_array)
+
+        self.assertEqual(np.nanmin(data), stats.min)
+        self.assertEqual(np.nanmax(data), stats.max)
+        self.assertEqual(2, stats.nan_count)
+        self.assertEqual(3, stats.zero_count)
+        self.assertEqual(2, stats.negative_count)
+        self.assertEqual([5, 9], stats.images_with_negative_values())
+        self.assertEqual([2, 3], stats.images_with_nans())
+
+    def test_all_nan_image(self):
+        self.images.data[0] = np.nan
+        stats = calculate_statistics(self.images.shared_array)
+
+        self.assertEqual(np.nanmin(self.images.data), stats.min)
+        self.assertEqual(8 * 10 + 2, stats.nan_count)
+
+    def test_histogram_matches_numpy(self):
+        stats = calculate_statistics(self.images.shared_array)
+        counts, edges = calculate_histogram(self.images.shared_array, stats, 16)
+
+        expected_counts, expected_edges = np.histogram(self.images.data[~np.isnan(self.images.data)],
+                                                       bins=16,
+                                                       range=(stats.min, stats.max))
+        npt.assert_equal(expected_counts, counts)
+        npt.assert_allclose(expected_edges, edges)
+        self.assertIs(counts, calculate_histogram(self.images.shared_array, stats, 16)[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
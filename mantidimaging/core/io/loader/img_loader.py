@@ -4,9 +4,10 @@ from __future__ import annotations
 """
 This module handles the loading of FIT, FITS, TIF, TIFF
 """
-from typing import Tuple, Optional, List, Callable, Union, TYPE_CHECKING
+from typing import Tuple, Optional, List, Callable, Union, Dict, Any, TYPE_CHECKING
 
 from mantidimaging.core.data import ImageStack
+from mantidimaging.core.parallel import shared as ps
 from mantidimaging.core.parallel import utility as pu
 from mantidimaging.core.utility.progress_reporting import Progress
 
@@ -21,7 +22,8 @@ def execute(load_func: Callable[[str], np.ndarray],
             img_format: str,
             dtype: 'npt.DTypeLike',
             indices: Union[List[int], Indices, None],
-            progress: Optional[Progress] = None) -> ImageStack:
+            progress: Optional[Progress] = None,
+            parallel_load: bool = True) -> ImageStack:
     """
     Reads a stack of images into memory, assuming dark and flat images
     are in separate directories.
@@ -31,6 +33,9 @@ def execute(load_func: Callable[[str], np.ndarray],
         '>f2' - float16
         '>f4' - float32
 
+    :param parallel_load: Read the files using the process pool, with each worker writing
+                          directly into the shared array. Falls back to sequential loading
+                          if the pool is not available.
     :returns: ImageStack object
     """
     if not sample_path:
@@ -47,7 +52,7 @@ def execute(load_func: Callable[[str], np.ndarray],
     img_shape = first_sample_img.shape
 
     # forward all arguments to internal class for easy re-usage
-    il = ImageLoader(load_func, img_format, img_shape, dtype, indices, progress)
+    il = ImageLoader(load_func, img_format, img_shape, dtype, indices, progress, parallel_load)
 
     sample_data = il.load_sample_data(chosen_input_filenames)
 
@@ -61,13 +66,15 @@ class ImageLoader(object):
                  img_shape: Tuple[int, ...],
                  data_dtype: 'npt.DTypeLike',
                  indices: Union[List[int], Indices, None],
-                 progress: Optional[Progress] = None):
+                 progress: Optional[Progress] = None,
+                 parallel_load: bool = True):
         self.load_func = load_func
         self.img_format = img_format
         self.img_shape = img_shape
         self.data_dtype = data_dtype
         self.indices = indices
         self.progress = progress
+        self.parallel_load = parallel_load
 
     def load_sample_data(self, input_file_names: List[str]) -> pu.SharedArray:
         # determine what the loaded data was
@@ -77,28 +84,45 @@ class ImageLoader(object):
         else:
             raise ValueError("Data loaded has invalid shape: {0}", self.img_shape)
 
+    @staticmethod
+    def _load_file_into(load_func: Callable[[str], np.ndarray], in_file: str, out: np.ndarray,
+                        img_shape: Tuple[int, ...]) -> None:
+        try:
+            out[:] = load_func(in_file)
+        except ValueError as exc:
+            raise ValueError("An image has different width and/or height "
+                             "dimensions! All images must have the same "
+                             "dimensions. Expected dimensions: {0} Error "
+                             "message: {1}".format(img_shape, exc))
+        except IOError as exc:
+            raise RuntimeError("Could not load file {0}. Error details: " "{1}".format(in_file, exc))
+
     def _do_files_load_seq(self, data: pu.SharedArray, files: List[str]) -> pu.SharedArray:
         progress = Progress.ensure_instance(self.progress, num_steps=len(files), task_name='Loading')
 
         with progress:
             for idx, in_file in enumerate(files):
-                try:
-                    data.array[idx, :] = self.load_func(in_file)
-                    progress.update(msg='Image')
-                except ValueError as exc:
-                    raise ValueError("An image has different width and/or height "
-                                     "dimensions! All images must have the same "
-                                     "dimensions. Expected dimensions: {0} Error "
-                                     "message: {1}".format(self.img_shape, exc))
-                except IOError as exc:
-                    raise RuntimeError("Could not load file {0}. Error details: " "{1}".format(in_file, exc))
+                self._load_file_into(self.load_func, in_file, data.array[idx, :], self.img_shape)
+                progress.update(msg='Image')
 
         return data
 
+    def _do_files_load_parallel(self, data: pu.SharedArray, files: List[str]) -> pu.SharedArray:
+        progress = Progress.ensure_instance(self.progress, num_steps=len(files), task_name='Loading')
+        params = {'load_func': self.load_func, 'files': files, 'img_shape': self.img_shape}
+        ps.run_compute_func(ImageLoader.compute_function, len(files), data, params, progress)
+        return data
+
+    @staticmethod
+    def compute_function(index: int, array: np.ndarray, params: Dict[str, Any]):
+        ImageLoader._load_file_into(params['load_func'], params['files'][index], array[index, :], params['img_shape'])
+
     def load_files(self, files: List[str]) -> pu.SharedArray:
         # Zeroing here to make sure that we can allocate the memory.
         # If it's not possible better crash here than later.
         num_images = len(files)
         shape = (num_images, self.img_shape[0], self.img_shape[1])
         data = pu.create_array(shape, self.data_dtype)
+        if self.parallel_load:
+            return self._do_files_load_parallel(data, files)
         return self._do_files_load_seq(data, files)
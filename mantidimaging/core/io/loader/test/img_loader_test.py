@@ -0,0 +1,76 @@
+# Copyright (C) 2023 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import unittest
+from unittest import mock
+
+import numpy as np
+import numpy.testing as npt
+
+from mantidimaging.core.io.loader import img_loader
+from mantidimaging.core.io.loader.img_loader import ImageLoader
+from mantidimaging.test_helpers.start_qapplication import start_multiprocessing_pool
+
+FILES = [f"/path/image_{i:04d}.tif" for i in range(15)]
+
+
+def _fake_load(filename: str) -> np.ndarray:
+    index = int(filename[-8:-4])
+    return np.full((4, 5), index, dtype=np.float32)
+
+
+@start_multiprocessing_pool
+class ImageLoaderTest(unittest.TestCase):
+    def test_parallel_load_matches_sequential_load(self):
+        seq = ImageLoader(_fake_load, "tif", (4, 5), np.float32, None, parallel_load=False).load_files(FILES)
+        par = ImageLoader(_fake_load, "tif", (4, 5), np.float32, None, parallel_load=True).load_files(FILES)
+
+        npt.assert_equal(seq.array, par.array)
+        for i in range(len(FILES)):
+            self.assertTrue(np.all(par.array[i] == i))
+
+    @mock.patch("mantidimaging.core.io.loader.img_loader.ps.run_compute_func")
+    def test_parallel_load_uses_compute_func(self, run_compute_func: mock.Mock):
+        loader = ImageLoader(_fake_load, "tif", (4, 5), np.float32, None, parallel_load=True)
+        data = loader.load_files(FILES)
+
+        run_compute_func.assert_called_once()
+        func, num_operations, arrays, params, _ = run_compute_func.call_args[0]
+        self.assertEqual(ImageLoader.compute_function, func)
+        self.assertEqual(len(FILES), num_operations)
+        self.assertIs(data, arrays)
+        self.assertEqual(FILES, params['files'])
+
+    def test_compute_function_loads_into_index(self):
+        array = np.zeros((3, 4, 5), dtype=np.float32)
+        params = {'load_func': _fake_load, 'files': FILES[:3], 'img_shape': (4, 5)}
+
+        ImageLoader.compute_function(2, array, params)
+
+        self.assertTrue(np.all(array[2] == 2))
+        self.assertTrue(np.all(array[:2] == 0))
+
+    def test_compute_function_raises_on_wrong_shape(self):
+        array = np.zeros((1, 3, 3), dtype=np.float32)
+        params = {'load_func': _fake_load, 'files': FILES[:1], 'img_shape': (3, 3)}
+
+        self.assertRaisesRegex(ValueError, "different width and/or height", ImageLoader.compute_function, 0, array,
+                               params)
+
+    def test_compute_function_raises_on_io_error(self):
+        array = np.zeros((1, 4, 5), dtype=np.float32)
+        load_func = mock.Mock(side_effect=IOError("missing"))
+        params = {'load_func': load_func, 'files': FILES[:1], 'img_shape': (4, 5)}
+
+        self.assertRaisesRegex(RuntimeError, "Could not load file", ImageLoader.compute_function, 0, array, params)
+
+    def test_execute_passes_parallel_flag(self):
+        images = img_loader.execute(_fake_load, FILES, "tif", np.float32, None, parallel_load=False)
+
+        self.assertEqual((15, 4, 5), images.data.shape)
+        self.assertTrue(np.all(images.data[7] == 7))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,8 +3,10 @@
 from __future__ import annotations
 import datetime
 import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from logging import getLogger
-from typing import List, Union, Optional, Dict, Callable, Tuple, TYPE_CHECKING
+from typing import Any, List, Union, Optional, Dict, Callable, Tuple, TYPE_CHECKING
 
 import h5py
 import numpy as np
@@ -14,7 +16,7 @@ from mantidimaging.core.operation_history.const import TIMESTAMP
 import astropy.io.fits as fits
 
 from .utility import DEFAULT_IO_FILE_FORMAT
-from ..operations.rescale import RescaleFilter
+from ..parallel import shared as ps
 from ..utility.progress_reporting import Progress
 from ..utility.version_check import CheckVersion
 
@@ -30,6 +32,12 @@ DEFAULT_NAME_PREFIX = 'image'
 DEFAULT_NAME_POSTFIX = ''
 INT16_SIZE = 65536
 
+NEXUS_COMPRESSION_TYPES = [None, "gzip", "lzf"]
+DEFAULT_NEXUS_COMPRESSION = "gzip"
+DEFAULT_NEXUS_COMPRESSION_LEVEL = 4
+# Number of bytes of image data converted and written to a NeXus file at a time
+NEXUS_SLAB_BYTES = 64 * 1024**2
+
 
 def write_fits(data: np.ndarray, filename: str, overwrite: bool = False, description: Optional[str] = ""):
     hdu = fits.PrimaryHDU(data)
@@ -71,7 +79,8 @@ def image_save(images: ImageStack,
                name_postfix: str = DEFAULT_NAME_POSTFIX,
                indices: Union[List[int], Indices, None] = None,
                pixel_depth: Optional[str] = None,
-               progress: Optional[Progress] = None) -> Union[str, List[str]]:
+               progress: Optional[Progress] = None,
+               parallel_save: bool = True) -> Union[str, List[str]]:
     """
     Save image volume (3d) into a series of slices along the Z axis.
     The Z axis in the script is the ndarray.shape[0].
@@ -101,6 +110,9 @@ def image_save(images: ImageStack,
     :param pixel_depth: Defines the target pixel depth of the save operation so
            np.float32 or np.int16 will ensure the values are scaled
            correctly to these values.
+    :param parallel_save: Encode and write the images using the process pool, with each worker
+           reading from the shared array. Falls back to saving sequentially if the
+           images are not in shared memory or the pool is not available.
     :returns: The filename/filenames of the saved data.
     """
     progress = Progress.ensure_instance(progress, task_name='Save')
@@ -110,8 +122,9 @@ def image_save(images: ImageStack,
     make_dirs_if_needed(output_dir, overwrite_all)
 
     # Define current parameters
-    min_value: float = np.nanmin(images.data)
-    max_value: float = np.nanmax(images.data)
+    statistics = images.statistics()
+    min_value: float = statistics.min
+    max_value: float = statistics.max
     int_16_slope = max_value / INT16_SIZE
 
     # Do rescale if needed.
@@ -155,37 +168,78 @@ def image_save(images: ImageStack,
         for i in range(len(names)):
             names[i] = os.path.join(output_dir, names[i])
 
-        with progress:
-            for idx in range(num_images):
-                # Overwrite images with the copy that has been rescaled.
-                if pixel_depth == "int16":
-                    output_data = RescaleFilter.filter_array(np.copy(images.data[idx]),
-                                                             min_input=min_value,
-                                                             max_input=max_value,
-                                                             max_output=INT16_SIZE - 1).astype(np.uint16)
-                    write_func(output_data, names[idx], overwrite_all, rescale_info)
-                else:
-                    write_func(data[idx, :, :], names[idx], overwrite_all, rescale_info)
-
-                progress.update(msg='Image')
+        params = {
+            'write_func': write_func,
+            'names': names,
+            'overwrite_all': overwrite_all,
+            'description': rescale_info,
+            'swap_axes': swap_axes,
+            'int16_range': (min_value, max_value) if pixel_depth == "int16" else None,
+        }
+        if parallel_save:
+            ps.run_compute_func(_save_compute_function, num_images, images.shared_array, params, progress)
+        else:
+            with progress:
+                for idx in range(num_images):
+                    _save_compute_function(idx, images.data, params)
+                    progress.update(msg='Image')
 
         return names
 
 
-def nexus_save(dataset: StrictDataset, path: str, sample_name: str):
+def _save_compute_function(index: int, array: np.ndarray, params: Dict[str, Any]):
+    data = np.swapaxes(array, 0, 1) if params['swap_axes'] else array
+    output_data = data[index]
+    if params['int16_range'] is not None:
+        output_data = rescale_to_uint16(output_data, *params['int16_range'])
+    params['write_func'](output_data, params['names'][index], params['overwrite_all'], params['description'])
+
+
+def rescale_to_uint16(image: np.ndarray, min_value: float, max_value: float) -> np.ndarray:
+    """
+    Linearly map [min_value, max_value] onto the full uint16 range, clipping values outside it.
+    NaNs are written as 0. The input image is not modified.
+    """
+    max_output = INT16_SIZE - 1
+    min_value, max_value = float(min_value), float(max_value)
+    scaled = np.subtract(image, min_value, dtype=np.float64)
+    if max_value > min_value:
+        # divide first so that max_value maps exactly onto max_output
+        scaled /= max_value - min_value
+        scaled *= max_output
+    else:
+        scaled[:] = 0
+    np.clip(scaled, 0, max_output, out=scaled)
+    np.nan_to_num(scaled, copy=False, nan=0.0)
+    return scaled.astype(np.uint16)
+
+
+def nexus_save(dataset: StrictDataset,
+               path: str,
+               sample_name: str,
+               compression: Optional[str] = DEFAULT_NEXUS_COMPRESSION,
+               compression_opts: Optional[int] = None,
+               shuffle: bool = True,
+               progress: Optional[Progress] = None):
     """
     Uses information from a StrictDataset to create a NeXus file.
     :param dataset: The dataset to save as a NeXus file.
     :param path: The NeXus file path.
     :param sample_name: The sample name.
+    :param compression: Compression filter for the image data: "gzip", "lzf" or None.
+    :param compression_opts: The gzip compression level, 0-9. Defaults to DEFAULT_NEXUS_COMPRESSION_LEVEL.
+    :param shuffle: Apply the byte shuffle filter before compressing, which usually improves the compression ratio.
+    :param progress: Progress instance to use for progress reporting.
     """
+    _check_nexus_compression(compression, compression_opts)
+
     try:
-        nexus_file = h5py.File(path, "w", driver="core")
+        nexus_file = h5py.File(path, "w")
     except OSError as e:
         raise RuntimeError("Unable to save NeXus file. " + str(e))
 
     try:
-        _nexus_save(nexus_file, dataset, sample_name)
+        _nexus_save(nexus_file, dataset, sample_name, compression, compression_opts, shuffle, progress)
     except OSError as e:
         nexus_file.close()
         os.remove(path)
@@ -194,68 +248,191 @@ def nexus_save(dataset: StrictDataset, path: str, sample_name: str):
     nexus_file.close()
 
 
-def _nexus_save(nexus_file: h5py.File, dataset: StrictDataset, sample_name: str):
+def _check_nexus_compression(compression: Optional[str], compression_opts: Optional[int]):
+    if compression not in NEXUS_COMPRESSION_TYPES:
+        raise ValueError(f"Unknown NeXus compression '{compression}'. Expected one of {NEXUS_COMPRESSION_TYPES}")
+    if compression_opts is not None and compression != "gzip":
+        raise ValueError("A compression level can only be given for gzip compression")
+
+
+def _nexus_save(nexus_file: h5py.File,
+                dataset: StrictDataset,
+                sample_name: str,
+                compression: Optional[str] = DEFAULT_NEXUS_COMPRESSION,
+                compression_opts: Optional[int] = None,
+                shuffle: bool = True,
+                progress: Optional[Progress] = None):
     """
     Takes a NeXus file and writes the StrictDataset information to it.
     :param nexus_file: The NeXus file.
     :param dataset: The StrictDataset.
     :param sample_name: The sample name.
+    :param compression: Compression filter for the image data: "gzip", "lzf" or None.
+    :param compression_opts: The gzip compression level.
+    :param shuffle: Apply the byte shuffle filter before compressing.
+    :param progress: Progress instance to use for progress reporting.
     """
-    # Top-level group
-    entry = nexus_file.create_group("entry1")
-    _set_nx_class(entry, "NXentry")
-
-    # Tomo entry
-    tomo_entry = entry.create_group("tomo_entry")
-    _set_nx_class(tomo_entry, "NXsubentry")
-
-    # definition field
-    tomo_entry.create_dataset("definition", data=np.string_("NXtomo"))
-
-    # instrument field
-    instrument_group = tomo_entry.create_group("instrument")
-    _set_nx_class(instrument_group, "NXinstrument")
-
-    # instrument/detector field
-    detector = instrument_group.create_group("detector")
-    _set_nx_class(detector, "NXdetector")
-
-    # instrument data
-    combined_data_shape = (sum([len(arr) for arr in dataset.nexus_arrays]), ) + dataset.nexus_arrays[0].shape[1:]
-    detector.create_dataset("data", shape=combined_data_shape, dtype="uint16")
-    index = 0
-    for arr in dataset.nexus_arrays:
-        detector["data"][index:index + arr.shape[0]] = arr
-        index += arr.shape[0]
-    detector.create_dataset("image_key", data=dataset.image_keys)
-
-    # sample field
-    sample_group = tomo_entry.create_group("sample")
-    _set_nx_class(sample_group, "NXsample")
-    sample_group.create_dataset("name", data=np.string_(sample_name))
-
-    # rotation angle
-    rotation_angle = sample_group.create_dataset("rotation_angle", data=np.concatenate(dataset.nexus_rotation_angles))
-    rotation_angle.attrs["units"] = "rad"
-
-    # data field
-    data = tomo_entry.create_group("data")
-    _set_nx_class(data, "NXdata")
-    data["data"] = detector["data"]
-    data["rotation_angle"] = rotation_angle
-    data["image_key"] = detector["image_key"]
+    num_images = sum([len(arr) for arr in dataset.nexus_arrays]) + sum([recon.num_images for recon in dataset.recons])
+    progress = Progress.ensure_instance(progress, num_steps=num_images, task_name="Save NeXus")
+
+    with progress:
+        # Top-level group
+        entry = nexus_file.create_group("entry1")
+        _set_nx_class(entry, "NXentry")
+
+        # Tomo entry
+        tomo_entry = entry.create_group("tomo_entry")
+        _set_nx_class(tomo_entry, "NXsubentry")
+
+        # definition field
+        tomo_entry.create_dataset("definition", data=np.string_("NXtomo"))
+
+        # instrument field
+        instrument_group = tomo_entry.create_group("instrument")
+        _set_nx_class(instrument_group, "NXinstrument")
+
+        # instrument/detector field
+        detector = instrument_group.create_group("detector")
+        _set_nx_class(detector, "NXdetector")
+
+        # instrument data
+        combined_data_shape = (sum([len(arr) for arr in dataset.nexus_arrays]), ) + dataset.nexus_arrays[0].shape[1:]
+        _create_image_dataset(detector, "data", combined_data_shape, "uint16", compression, compression_opts, shuffle)
+        index = 0
+        for arr in dataset.nexus_arrays:
+            _write_images(detector["data"], index, arr, progress)
+            index += arr.shape[0]
+        detector.create_dataset("image_key", data=dataset.image_keys)
+
+        # sample field
+        sample_group = tomo_entry.create_group("sample")
+        _set_nx_class(sample_group, "NXsample")
+        sample_group.create_dataset("name", data=np.string_(sample_name))
+
+        # rotation angle
+        rotation_angle = sample_group.create_dataset("rotation_angle",
+                                                     data=np.concatenate(dataset.nexus_rotation_angles))
+        rotation_angle.attrs["units"] = "rad"
+
+        # data field
+        data = tomo_entry.create_group("data")
+        _set_nx_class(data, "NXdata")
+        data["data"] = detector["data"]
+        data["rotation_angle"] = rotation_angle
+        data["image_key"] = detector["image_key"]
+
+        for recon in dataset.recons:
+            assert dataset.sample.filenames is not None
+            _save_recon_to_nexus(nexus_file, recon, dataset.sample.filenames[0], compression, compression_opts, shuffle,
+                                 progress)
+
+
+def _create_image_dataset(group: h5py.Group, name: str, shape: Tuple[int, ...], dtype: str, compression: Optional[str],
+                          compression_opts: Optional[int], shuffle: bool) -> h5py.Dataset:
+    """
+    Create a dataset for a stack of images, chunked so that each chunk holds one image.
+    """
+    if compression is None:
+        return group.create_dataset(name, shape=shape, dtype=dtype, chunks=_image_chunks(shape))
+    if compression == "gzip" and compression_opts is None:
+        compression_opts = DEFAULT_NEXUS_COMPRESSION_LEVEL
+    return group.create_dataset(name,
+                                shape=shape,
+                                dtype=dtype,
+                                chunks=_image_chunks(shape),
+                                compression=compression,
+                                compression_opts=compression_opts,
+                                shuffle=shuffle)
+
 
-    for recon in dataset.recons:
-        assert dataset.sample.filenames is not None
-        _save_recon_to_nexus(nexus_file, recon, dataset.sample.filenames[0])
+def _image_chunks(shape: Tuple[int, ...]) -> Optional[Tuple[int, ...]]:
+    # HDF5 does not allow chunked datasets that have a zero length dimension
+    return (1, ) + tuple(shape[1:]) if all(shape) else None
 
 
-def _save_recon_to_nexus(nexus_file: h5py.File, recon: ImageStack, sample_path: str):
+def _write_images(nexus_dataset: h5py.Dataset, offset: int, data: np.ndarray, progress: Progress):
+    """
+    Write a stack of images into a dataset a slab at a time. Only one slab is converted to the dtype of the
+    dataset at once. When gzip is used the chunks of each slab are compressed in parallel.
+    :param nexus_dataset: The dataset to write into.
+    :param offset: The index of the first image in the dataset.
+    :param data: The images to write.
+    :param progress: Progress instance to use for progress reporting.
+    """
+    if data.shape[0] == 0:
+        return
+    image_bytes = data[0].size * max(data.itemsize, nexus_dataset.dtype.itemsize)
+    slab_size = max(1, NEXUS_SLAB_BYTES // image_bytes)
+    compress = _direct_chunk_compressor(nexus_dataset)
+
+    with ThreadPoolExecutor() as executor:
+        for start in range(0, data.shape[0], slab_size):
+            stop = min(start + slab_size, data.shape[0])
+            if compress is None:
+                nexus_dataset[offset + start:offset + stop] = data[start:stop]
+            else:
+                slab = _convert_for_dataset(data[start:stop], nexus_dataset.dtype)
+                for i, chunk in enumerate(executor.map(compress, slab)):
+                    nexus_dataset.id.write_direct_chunk((offset + start + i, ) + (0, ) * (slab.ndim - 1), chunk)
+            progress.update(stop - start, msg="Writing images")
+
+
+def _direct_chunk_compressor(nexus_dataset: h5py.Dataset) -> Optional[Callable[[np.ndarray], bytes]]:
+    """
+    If the chunks of the dataset can be compressed here, return a function that does it. The HDF5 filters
+    run in a single thread, but zlib releases the GIL so the chunks can be compressed in parallel.
+    Only gzip (with or without shuffle) on one image per chunk is handled, anything else returns None.
+    """
+    chunks = nexus_dataset.chunks
+    if nexus_dataset.compression != "gzip" or chunks is None or chunks[0] != 1 or \
+            tuple(chunks[1:]) != nexus_dataset.shape[1:] or nexus_dataset.fletcher32 or nexus_dataset.scaleoffset:
+        return None
+    level = nexus_dataset.compression_opts
+    itemsize = nexus_dataset.dtype.itemsize
+
+    def compress(image: np.ndarray) -> bytes:
+        raw = np.ascontiguousarray(image)
+        if nexus_dataset.shuffle and itemsize > 1:
+            # The HDF5 shuffle filter stores the first byte of every element, then the second byte, and so on
+            buffer = raw.view(np.uint8).reshape(-1, itemsize).T.tobytes()
+        else:
+            buffer = raw.tobytes()
+        return zlib.compress(buffer, level)
+
+    return compress
+
+
+def _convert_for_dataset(data: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    """
+    Convert to the dataset dtype the same way HDF5 does, clamping to the range of integer types.
+    """
+    if data.dtype == dtype:
+        return data
+    if np.issubdtype(dtype, np.integer) and not np.issubdtype(data.dtype, np.integer):
+        info = np.iinfo(dtype)
+        data = np.clip(np.nan_to_num(data), info.min, info.max)
+    return data.astype(dtype)
+
+
+def _save_recon_to_nexus(nexus_file: h5py.File,
+                         recon: ImageStack,
+                         sample_path: str,
+                         compression: Optional[str] = DEFAULT_NEXUS_COMPRESSION,
+                         compression_opts: Optional[int] = None,
+                         shuffle: bool = True,
+                         progress: Optional[Progress] = None):
     """
     Saves a recon to a NeXus file.
     :param nexus_file: The NeXus file.
     :param recon: The recon data.
+    :param compression: Compression filter for the recon data: "gzip", "lzf" or None.
+    :param compression_opts: The gzip compression level.
+    :param shuffle: Apply the byte shuffle filter before compressing.
+    :param progress: Progress instance to use for progress reporting.
     """
+    if progress is None:
+        # When called from _nexus_save the progress already counts the recon images
+        progress = Progress(num_steps=recon.num_images, task_name="Save recon")
     recon_entry = nexus_file.create_group(recon.name)
     _set_nx_class(recon_entry, "NXentry")
 
@@ -292,8 +469,8 @@ def _save_recon_to_nexus(nexus_file: h5py.File, recon: ImageStack, sample_path:
     data = recon_entry.create_group("data")
     _set_nx_class(data, "NXdata")
 
-    data.create_dataset("data", shape=recon.data.shape, dtype="float32")
-    data["data"][:] = recon.data
+    _create_image_dataset(data, "data", recon.data.shape, "float32", compression, compression_opts, shuffle)
+    _write_images(data["data"], 0, recon.data, progress)
 
     x_arr, y_arr, z_arr = _create_pixel_size_arrays(recon)
     data.create_dataset("x", shape=x_arr.shape, dtype="float16", data=x_arr)
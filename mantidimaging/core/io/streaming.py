@@ -0,0 +1,291 @@
+# Copyright (C) 2023 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+Out-of-core processing of stacks that are too large to be held in memory.
+
+The stack is loaded, filtered and saved in slabs of projections. Operations that work on
+sinograms are applied to slabs of sinogram rows, read from a scratch file on disk that
+holds the intermediate volume. Only operations that act on each projection (or sinogram)
+independently give the same result as processing the whole stack at once, so only the
+filters in SLAB_SAFE_FILTERS are accepted.
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+import uuid
+from functools import partial
+from logging import getLogger
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Type, TYPE_CHECKING
+
+import numpy as np
+
+from mantidimaging.core.data import ImageStack
+from mantidimaging.core.io.loader import img_loader
+from mantidimaging.core.io.loader.loader import get_loader
+from mantidimaging.core.io.saver import (DEFAULT_NAME_PREFIX, DEFAULT_ZFILL_LENGTH, generate_names, make_dirs_if_needed,
+                                         write_fits, write_img)
+from mantidimaging.core.io.utility import DEFAULT_IO_FILE_FORMAT
+from mantidimaging.core.operation_history.operations import apply_steps
+from mantidimaging.core.operations.loader import load_filter_packages
+from mantidimaging.core.parallel import utility as pu
+from mantidimaging.core.utility.memory_usage import system_free_memory
+from mantidimaging.core.utility.progress_reporting import Progress
+from mantidimaging.core.utility.size_calculator import full_size_bytes
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+    from mantidimaging.core.operation_history.operations import ImageOperation
+    from mantidimaging.core.operations.base_filter import BaseFilter
+
+LOG = getLogger(__name__)
+
+# Fraction of the free memory that a single slab is allowed to use. Filters may allocate
+# temporary arrays the same size as their input, so leave plenty of room for those.
+SLAB_MEMORY_FRACTION = 0.25
+
+
+def _always(_: Dict[str, Any]) -> bool:
+    return True
+
+
+# The filters that give the same result applied to slabs of the stack as to the whole stack, as they process each
+# projection (or sinogram) on its own, and whether they do so with the given parameters. Filters that use values
+# from across the stack, like the mean of the air region of every projection, are left out. So are filters that
+# need other stacks, like the flats and darks, which stream_process does not load, and filters meant for
+# reconstructed slices rather than projections, like Ring Removal.
+SLAB_SAFE_FILTERS: Dict[str, Callable[[Dict[str, Any]], bool]] = {
+    'ArithmeticFilter': _always,
+    'CircularMaskFilter': _always,
+    'ClipValuesFilter': lambda kwargs: kwargs.get('clip_min') is not None and kwargs.get('clip_max') is not None,
+    'CropCoordinatesFilter': _always,
+    'DivideFilter': _always,
+    'GaussianFilter': _always,
+    'MedianFilter': _always,
+    'NaNRemovalFilter': _always,
+    'OutliersFilter': _always,
+    'RebinFilter': _always,
+    'RemoveAllStripesFilter': _always,
+    'RemoveDeadStripesFilter': _always,
+    'RemoveLargeStripesFilter': _always,
+    'RemoveStripeFilteringFilter': _always,
+    'RemoveStripeSortingFittingFilter': _always,
+    'RescaleFilter': _always,
+    'RotateFilter': _always,
+}
+
+
+class StreamedOperation(NamedTuple):
+    operation: ImageOperation
+    func: Callable[[ImageStack], Optional[ImageStack]]
+    operate_on_sinograms: bool
+    filter_class: Optional[Type[BaseFilter]] = None
+
+
+def streamed_operations(ops: Iterable[ImageOperation]) -> List[StreamedOperation]:
+    """
+    Look up the filter for each operation, and whether it has to be applied to sinograms.
+
+    :raises KeyError: If an operation is unknown, or uses values from across the stack so would give a different
+                      result applied to slabs
+    """
+    filters = {f.__name__: f for f in load_filter_packages(ignored_packages=['mantidimaging.core.operations.wip'])}
+    streamed = []
+    for op in ops:
+        if op.filter_name not in filters:
+            raise KeyError(f"Operation '{op.filter_name}' can not be applied to a streamed stack")
+        if not SLAB_SAFE_FILTERS.get(op.filter_name, lambda _: False)(op.filter_kwargs):
+            raise KeyError(f"Operation '{op.filter_name}' with {op.filter_kwargs} can not be applied to a streamed "
+                           f"stack, as it uses values from across the whole stack or from other stacks")
+        filter_class = filters[op.filter_name]
+        streamed.append(
+            StreamedOperation(op, partial(filter_class.filter_func, **op.filter_kwargs),
+                              filter_class.operate_on_sinograms, filter_class))
+    return streamed
+
+
+def calculate_slab_size(image_shape: Tuple[int, ...], dtype: 'npt.DTypeLike') -> int:
+    """
+    The number of images of the given shape that fit in SLAB_MEMORY_FRACTION of the free memory.
+    """
+    image_bytes = full_size_bytes(image_shape, dtype)
+    return max(1, int(system_free_memory().kb() * 1024 * SLAB_MEMORY_FRACTION // image_bytes))
+
+
+def _split_into_stages(ops: List[StreamedOperation]) -> List[Tuple[bool, List[StreamedOperation]]]:
+    """
+    Group consecutive operations that work on the same ordering (projections or sinograms).
+    """
+    stages: List[Tuple[bool, List[StreamedOperation]]] = []
+    for op in ops:
+        if stages and stages[-1][0] == op.operate_on_sinograms:
+            stages[-1][1].append(op)
+        else:
+            stages.append((op.operate_on_sinograms, [op]))
+    return stages
+
+
+def _apply(images: ImageStack, ops: List[StreamedOperation]) -> ImageStack:
+    return apply_steps(images, [(op.operation, op.filter_class, op.func) for op in ops], record=False)
+
+
+class _ScratchVolume:
+    """
+    The intermediate volume, held in a file on disk.
+    """
+    def __init__(self, scratch_dir: str, shape: Tuple[int, ...], dtype: 'npt.DTypeLike'):
+        self.path = os.path.join(scratch_dir, f"mantidimaging_stream_{uuid.uuid4()}.dat")
+        LOG.info(f"Creating scratch volume {self.path} with shape={shape}, dtype={dtype}")
+        self.array = np.memmap(self.path, dtype=dtype, mode='w+', shape=shape)
+
+    def remove(self):
+        del self.array
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _copy_to_shared(data: np.ndarray) -> pu.SharedArray:
+    shared = pu.create_array(data.shape, data.dtype)
+    shared.array[:] = data
+    return shared
+
+
+def stream_process(file_names: List[str],
+                   ops: Iterable[ImageOperation],
+                   output_dir: str,
+                   in_format: str = DEFAULT_IO_FILE_FORMAT,
+                   dtype: 'npt.DTypeLike' = np.float32,
+                   slab_size: Optional[int] = None,
+                   scratch_dir: Optional[str] = None,
+                   name_prefix: str = DEFAULT_NAME_PREFIX,
+                   out_format: str = DEFAULT_IO_FILE_FORMAT,
+                   overwrite_all: bool = False,
+                   progress: Optional[Progress] = None) -> List[str]:
+    """
+    Load, process and save a stack without holding the full volume in memory.
+
+    :param file_names: The projection files to load
+    :param ops: The operations to apply, in order
+    :param output_dir: Output directory for the processed images
+    :param in_format: Format of the input images
+    :param dtype: Data type the images are loaded as
+    :param slab_size: Number of projections processed at once. The same amount of memory is used
+                      for the sinogram slabs. If not provided it is calculated from the free memory.
+    :param scratch_dir: Directory used for the intermediate volume, when there are sinogram
+                        operations. Defaults to the system temporary directory.
+    :param name_prefix: Prefix for the names of the saved images
+    :param out_format: File format of the saved images
+    :param overwrite_all: Overwrite existing images with conflicting names
+    :param progress: Progress instance to use for progress reporting
+    :return: The filenames of the saved images
+    """
+    if not file_names:
+        raise RuntimeError("No filenames were provided.")
+
+    streamed_ops = streamed_operations(ops)
+    load_func = get_loader(in_format)
+    img_shape = load_func(file_names[0]).shape
+    if slab_size is None:
+        slab_size = calculate_slab_size(img_shape, dtype)
+    slab_bytes = slab_size * full_size_bytes(img_shape, dtype)
+    num_images = len(file_names)
+
+    output_dir = os.path.abspath(os.path.expanduser(output_dir))
+    make_dirs_if_needed(output_dir, overwrite_all)
+    write_func = write_fits if out_format in ['fit', 'fits'] else write_img
+    names = generate_names(name_prefix, None, num_images, zfill_len=DEFAULT_ZFILL_LENGTH, out_format=out_format)
+    names = [os.path.join(output_dir, name) for name in names]
+
+    stages = _split_into_stages(streamed_ops)
+    needs_scratch = any(on_sinograms for on_sinograms, _ in stages)
+    # The projection operations before the first sinogram stage are applied while loading
+    first_ops = stages.pop(0)[1] if stages and not stages[0][0] else []
+
+    num_slabs = -(-num_images // slab_size)
+    # The steps of the later stages are added once the shape of the intermediate volume is known
+    progress = Progress.ensure_instance(progress, num_steps=num_slabs, task_name='Streaming')
+    LOG.info(f"Streaming {num_images} images in slabs of {slab_size}")
+
+    loader = img_loader.ImageLoader(load_func, in_format, img_shape, dtype, None)
+    scratch: Optional[_ScratchVolume] = None
+    last_slab: Optional[ImageStack] = None
+    try:
+        with progress:
+            for start in range(0, num_images, slab_size):
+                stop = min(start + slab_size, num_images)
+                slab = _apply(ImageStack(loader.load_files(file_names[start:stop])), first_ops)
+                if needs_scratch:
+                    if scratch is None:
+                        scratch = _ScratchVolume(scratch_dir or tempfile.gettempdir(),
+                                                 (num_images, ) + slab.data.shape[1:], slab.data.dtype)
+                        progress.add_estimated_steps(
+                            sum(
+                                len(_stage_slabs(on_sinograms, scratch.array, slab_bytes))
+                                for on_sinograms, _ in stages) + num_slabs)
+                    scratch.array[start:stop] = slab.data
+                else:
+                    for idx in range(start, stop):
+                        write_func(slab.data[idx - start], names[idx], overwrite_all, "")
+                last_slab = slab
+                progress.update(msg=f"Processed images {start} to {stop}")
+
+            if scratch is not None:
+                last_slab = _run_scratch_stages(scratch, stages, slab_bytes, progress)
+                for start in range(0, num_images, slab_size):
+                    stop = min(start + slab_size, num_images)
+                    for idx in range(start, stop):
+                        write_func(np.asarray(scratch.array[idx]), names[idx], overwrite_all, "")
+                    progress.update(msg=f"Saved images {start} to {stop}")
+    finally:
+        if scratch is not None:
+            scratch.remove()
+
+    if last_slab is not None:
+        for streamed_op in streamed_ops:
+            op = streamed_op.operation
+            last_slab.record_operation(op.filter_name, op.display_name, **op.filter_kwargs)
+        with open(os.path.join(output_dir, name_prefix + '.json'), 'w+') as f:
+            last_slab.save_metadata(f)
+
+    return names
+
+
+def _stage_slabs(on_sinograms: bool, volume: np.ndarray, slab_bytes: int) -> List[Tuple[int, int]]:
+    """
+    The start and stop of each slab of a stage: rows of sinograms across all the projections for sinogram
+    stages, otherwise projections.
+    """
+    if on_sinograms:
+        count = volume.shape[1]
+        per_slab = max(1, slab_bytes // full_size_bytes((volume.shape[0], 1, volume.shape[2]), volume.dtype))
+    else:
+        count = volume.shape[0]
+        per_slab = max(1, slab_bytes // full_size_bytes(volume.shape[1:], volume.dtype))
+    return [(start, min(start + per_slab, count)) for start in range(0, count, per_slab)]
+
+
+def _run_scratch_stages(scratch: _ScratchVolume, stages: List[Tuple[bool, List[StreamedOperation]]], slab_bytes: int,
+                        progress: Progress) -> Optional[ImageStack]:
+    volume = scratch.array
+    num_images = volume.shape[0]
+    last_slab = None
+    for on_sinograms, stage_ops in stages:
+        for start, stop in _stage_slabs(on_sinograms, volume, slab_bytes):
+            if on_sinograms:
+                slab = _apply(ImageStack(_copy_to_shared(volume[:, start:stop, :])), stage_ops)
+                if slab.data.shape != (num_images, stop - start, volume.shape[2]):
+                    raise ValueError(f"Sinogram operations must not change the shape of the data when streaming. "
+                                     f"Got {slab.data.shape}")
+                volume[:, start:stop, :] = slab.data
+                progress.update(msg=f"Processed sinograms {start} to {stop}")
+            else:
+                slab = _apply(ImageStack(_copy_to_shared(volume[start:stop])), stage_ops)
+                if slab.data.shape[1:] != volume.shape[1:]:
+                    raise ValueError(f"Only the first projection operations can change the shape of the data when "
+                                     f"streaming. Got {slab.data.shape}")
+                volume[start:stop] = slab.data
+                progress.update(msg=f"Processed images {start} to {stop}")
+            last_slab = slab
+    return last_slab
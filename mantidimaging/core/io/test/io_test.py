@@ -9,6 +9,7 @@ from unittest import mock
 import h5py
 import numpy as np
 import numpy.testing as npt
+import tifffile
 from mantidimaging.core.operation_history.const import TIMESTAMP
 
 import mantidimaging.test_helpers.unit_test_helper as th
@@ -16,10 +17,12 @@ from mantidimaging.core.data import ImageStack
 from mantidimaging.core.data.dataset import StrictDataset
 from mantidimaging.core.io import loader
 from mantidimaging.core.io import saver
-from mantidimaging.core.io.saver import _rescale_recon_data, _save_recon_to_nexus
+from mantidimaging.core.io.saver import _rescale_recon_data, _save_recon_to_nexus, rescale_to_uint16
+from mantidimaging.core.utility.progress_reporting import Progress
 from mantidimaging.core.utility.version_check import CheckVersion
 from mantidimaging.helper import initialise_logging
 from mantidimaging.test_helpers import FileOutputtingTestCase
+from mantidimaging.test_helpers.start_qapplication import start_multiprocessing_pool
 
 NX_CLASS = "NX_class"
 
@@ -47,6 +50,53 @@ def test_rescale_negative_recon_data():
     assert int(np.max(_rescale_recon_data(recon.data))) == np.iinfo("uint16").max
 
 
+def test_rescale_to_uint16_matches_interp():
+    image = th.gen_img_numpy_rand((20, 20)) * 1000 - 200
+    image[0, 0] = np.nan
+    original = image.copy()
+
+    result = rescale_to_uint16(image, -100, 700)
+
+    expected = np.interp(image, [-100, 700], [0, saver.INT16_SIZE - 1])
+    expected[0, 0] = 0
+    assert result.dtype == np.uint16
+    npt.assert_allclose(result, expected.astype(np.uint16), atol=1)
+    npt.assert_equal(image, original)
+
+
+def test_rescale_to_uint16_constant_image():
+    npt.assert_equal(rescale_to_uint16(np.full((3, 3), 5.0), 5.0, 5.0), 0)
+
+
+@start_multiprocessing_pool
+class ParallelSaveTest(FileOutputtingTestCase):
+    def _save_and_load(self, images, parallel_save, **kwargs):
+        output_dir = os.path.join(self.output_directory, str(parallel_save))
+        names = saver.image_save(images, output_dir, overwrite_all=True, parallel_save=parallel_save, **kwargs)
+        return np.asarray([tifffile.imread(name) for name in names])
+
+    def test_parallel_save_matches_sequential(self):
+        images = th.generate_images((15, 8, 10))
+        for kwargs in [{}, {"pixel_depth": "int16"}, {"swap_axes": True}, {"swap_axes": True, "pixel_depth": "int16"}]:
+            with self.subTest(**kwargs):
+                seq = self._save_and_load(images, False, **kwargs)
+                par = self._save_and_load(images, True, **kwargs)
+                npt.assert_equal(seq, par)
+
+    def test_int16_save_is_rescaled(self):
+        images = th.generate_images((15, 8, 10))
+        saved = self._save_and_load(images, True, pixel_depth="int16")
+        self.assertEqual(saved.dtype, np.uint16)
+        self.assertEqual(saved.max(), saver.INT16_SIZE - 1)
+        self.assertEqual(saved.min(), 0)
+
+    def test_swap_axes_int16_saves_sinograms(self):
+        images = th.generate_images((15, 8, 10))
+        saved = self._save_and_load(images, True, swap_axes=True, pixel_depth="int16")
+        expected = rescale_to_uint16(np.swapaxes(images.data, 0, 1), np.nanmin(images.data), np.nanmax(images.data))
+        npt.assert_equal(saved, expected)
+
+
 class IOTest(FileOutputtingTestCase):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -309,6 +359,71 @@ class IOTest(FileOutputtingTestCase):
         saver.nexus_save(StrictDataset(th.generate_images()), "path", "sample-name")
         file_mock.return_value.close.assert_called_once()
 
+    @mock.patch("mantidimaging.core.io.saver.h5py.File")
+    @mock.patch("mantidimaging.core.io.saver._nexus_save")
+    def test_nexus_save_does_not_hold_file_in_memory(self, _: mock.Mock, file_mock: mock.Mock):
+        saver.nexus_save(StrictDataset(th.generate_images()), "path", "sample-name")
+        file_mock.assert_called_once_with("path", "w")
+
+    def test_nexus_save_invalid_compression_raises(self):
+        sd = StrictDataset(th.generate_images())
+        with self.assertRaises(ValueError):
+            saver.nexus_save(sd, "path", "sample-name", compression="bzip2")
+        with self.assertRaises(ValueError):
+            saver.nexus_save(sd, "path", "sample-name", compression="lzf", compression_opts=4)
+
+    def test_nexus_save_compressed_data_round_trips(self):
+        sample = _create_sample_with_filename()
+        sample.data *= 12
+        sample.data[0, 0, 0] = 1e6  # clamped to the uint16 range
+        recon = th.generate_images(seed=2)
+        recon.name = "Recon"
+        sd = StrictDataset(sample)
+        sd.recons.append(recon)
+        expected = np.clip(sample.data, 0, np.iinfo("uint16").max).astype("uint16")
+
+        for compression, shuffle in [("gzip", True), ("gzip", False), ("lzf", True), (None, False)]:
+            with self.subTest(compression=compression, shuffle=shuffle), \
+                    h5py.File("path", "w", driver="core", backing_store=False) as nexus_file:
+                saver._nexus_save(nexus_file, sd, "sample-name", compression=compression, shuffle=shuffle)
+                data = nexus_file["entry1"]["tomo_entry"]["instrument"]["detector"]["data"]
+                self.assertEqual(data.compression, compression)
+                self.assertEqual(data.chunks, (1, ) + sample.data.shape[1:])
+                npt.assert_array_equal(np.array(data), expected)
+                recon_data = nexus_file["Recon"]["data"]["data"]
+                self.assertEqual(recon_data.compression, compression)
+                npt.assert_array_equal(np.array(recon_data), recon.data)
+
+    def test_nexus_save_reports_progress(self):
+        sample = _create_sample_with_filename()
+        recon = th.generate_images(seed=2)
+        recon.name = "Recon"
+        sd = StrictDataset(sample, flat_before=th.generate_images())
+        sd.recons.append(recon)
+        progress = Progress()
+
+        with h5py.File("path", "w", driver="core", backing_store=False) as nexus_file:
+            saver._nexus_save(nexus_file, sd, "sample-name", progress=progress)
+
+        num_images = sample.num_images + sd.flat_before.num_images + recon.num_images
+        self.assertTrue(progress.is_completed())
+        # One step for each image, and one when the task is marked complete
+        self.assertEqual(num_images + 1, progress.current_step)
+
+    @mock.patch("mantidimaging.core.io.saver.NEXUS_SLAB_BYTES", 1)
+    def test_nexus_save_writes_in_slabs(self):
+        sample = th.generate_images()
+        sample._projection_angles = sample.projection_angles()
+        sd = StrictDataset(sample)
+
+        progress = mock.create_autospec(Progress, instance=True)
+
+        with h5py.File("path", "w", driver="core", backing_store=False) as nexus_file:
+            saver._nexus_save(nexus_file, sd, "sample-name", progress=progress)
+            progress.update.assert_has_calls([mock.call(1, msg="Writing images")] * sample.num_images)
+            npt.assert_array_equal(np.array(nexus_file["entry1"]["tomo_entry"]["instrument"]["detector"]["data"]),
+                                   sample.data.astype("uint16"))
+
     @mock.patch("mantidimaging.core.io.saver._save_recon_to_nexus")
     def test_save_recons_if_present(self, recon_save_mock: mock.Mock):
         sample = _create_sample_with_filename()
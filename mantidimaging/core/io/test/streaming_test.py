@@ -0,0 +1,148 @@
+# Copyright (C) 2023 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import os
+import unittest
+from unittest import mock
+
+import numpy as np
+import numpy.testing as npt
+import tifffile
+
+from mantidimaging.core.io import streaming
+from mantidimaging.core.io.streaming import StreamedOperation, stream_process
+from mantidimaging.core.operation_history.operations import ImageOperation
+from mantidimaging.core.utility.progress_reporting import Progress
+from mantidimaging.test_helpers import FileOutputtingTestCase
+
+
+def _add_one(images):
+    images.data += 1
+    return images
+
+
+def _double_sinograms(images):
+    images.data *= 2
+    return images
+
+
+class StreamingTest(FileOutputtingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.in_dir = os.path.join(self.output_directory, "in")
+        self.out_dir = os.path.join(self.output_directory, "out")
+        os.makedirs(self.in_dir)
+        self.data = np.arange(7 * 4 * 5, dtype=np.float32).reshape((7, 4, 5))
+        self.files = []
+        for i, image in enumerate(self.data):
+            name = os.path.join(self.in_dir, f"image_{i:04d}.tif")
+            tifffile.imwrite(name, image)
+            self.files.append(name)
+
+    def _read_output(self, names):
+        return np.asarray([tifffile.imread(name) for name in names])
+
+    def test_projection_ops_without_scratch(self):
+        ops = [ImageOperation("ClipValuesFilter", {"clip_min": 10, "clip_max": 100}, "Clip Values")]
+
+        with mock.patch("mantidimaging.core.io.streaming._ScratchVolume") as scratch:
+            names = stream_process(self.files, ops, self.out_dir, slab_size=3)
+
+        scratch.assert_not_called()
+        self.assertEqual(7, len(names))
+        npt.assert_equal(self._read_output(names), np.clip(self.data, 10, 100))
+        self.assertTrue(os.path.isfile(os.path.join(self.out_dir, "image.json")))
+
+    def test_sinogram_ops_use_scratch_volume(self):
+        ops = [
+            StreamedOperation(ImageOperation("AddOne", {}, "Add one"), _add_one, False),
+            StreamedOperation(ImageOperation("DoubleSinograms", {}, "Double"), _double_sinograms, True),
+            StreamedOperation(ImageOperation("AddOne", {}, "Add one"), _add_one, False),
+        ]
+        with mock.patch.object(streaming, "streamed_operations", return_value=ops), \
+                mock.patch.object(streaming.ImageStack, "save_metadata"):
+            names = stream_process(self.files, [], self.out_dir, slab_size=2, scratch_dir=self.output_directory)
+
+        npt.assert_equal(self._read_output(names), (self.data + 1) * 2 + 1)
+        leftover = [f for f in os.listdir(self.output_directory) if f.startswith("mantidimaging_stream_")]
+        self.assertEqual([], leftover)
+
+    def test_sinogram_op_changing_shape_raises(self):
+        ops = [
+            StreamedOperation(ImageOperation("Crop", {}, "Crop"),
+                              lambda images: streaming.ImageStack(images.data[:, :, 1:].copy()), True)
+        ]
+
+        with mock.patch.object(streaming, "streamed_operations", return_value=ops):
+            self.assertRaises(ValueError, stream_process, self.files, [], self.out_dir, slab_size=2)
+
+    def test_unknown_operation_raises(self):
+        self.assertRaises(KeyError, streaming.streamed_operations, [ImageOperation("NotAFilter", {}, "")])
+
+    def test_stack_wide_operations_raise(self):
+        for op in [
+                ImageOperation("RoiNormalisationFilter", {"normalisation_mode": "Stack Average"}, ""),
+                ImageOperation("RoiNormalisationFilter", {"normalisation_mode": "Flat Field"}, ""),
+                ImageOperation("FlatFieldFilter", {"selected_flat_fielding": "Only Before"}, ""),
+                ImageOperation("RingRemovalFilter", {}, ""),
+                ImageOperation("ClipValuesFilter", {"clip_min": 10}, ""),
+                ImageOperation("MonitorNormalisation", {}, "")
+        ]:
+            with self.subTest(op=op.filter_name):
+                self.assertRaisesRegex(KeyError, "uses values from across the whole stack",
+                                       streaming.streamed_operations, [op])
+
+    def test_slab_safe_operations(self):
+        ops = [
+            ImageOperation("DivideFilter", {"value": 2.0}, ""),
+            ImageOperation("ClipValuesFilter", {
+                "clip_min": 10,
+                "clip_max": 100
+            }, ""),
+            ImageOperation("RemoveAllStripesFilter", {}, "")
+        ]
+
+        streamed = streaming.streamed_operations(ops)
+
+        self.assertEqual([False, False, True], [op.operate_on_sinograms for op in streamed])
+
+    def test_progress_counts_slabs_of_each_stage(self):
+        ops = [
+            StreamedOperation(ImageOperation("AddOne", {}, "Add one"), _add_one, False),
+            StreamedOperation(ImageOperation("DoubleSinograms", {}, "Double"), _double_sinograms, True),
+            StreamedOperation(ImageOperation("AddOne", {}, "Add one"), _add_one, False),
+        ]
+        progress = Progress()
+        with mock.patch.object(streaming, "streamed_operations", return_value=ops), \
+                mock.patch.object(streaming.ImageStack, "save_metadata"), \
+                mock.patch.object(progress, "mark_complete"):
+            stream_process(self.files, [],
+                           self.out_dir,
+                           slab_size=2,
+                           scratch_dir=self.output_directory,
+                           progress=progress)
+
+        # 4 slabs of 2 projections to load, 4 of 1 sinogram row (the memory of 2 projections holds one row of
+        # all 7 projections), 4 of projections, 4 to save
+        self.assertEqual(16, progress.end_step)
+        self.assertEqual(16, progress.current_step)
+
+    def test_split_into_stages(self):
+        ops = [StreamedOperation(mock.Mock(), mock.Mock(), on_sino) for on_sino in [False, False, True, False]]
+
+        stages = streaming._split_into_stages(ops)
+
+        self.assertEqual([False, True, False], [on_sino for on_sino, _ in stages])
+        self.assertEqual([2, 1, 1], [len(stage_ops) for _, stage_ops in stages])
+
+    @mock.patch("mantidimaging.core.io.streaming.system_free_memory")
+    def test_calculate_slab_size(self, free_memory: mock.Mock):
+        free_memory.return_value.kb.return_value = 1024
+        # 1 MB free, a quarter of that for 100 x 100 float32 images of 40000 bytes each
+        self.assertEqual(6, streaming.calculate_slab_size((100, 100), np.float32))
+        self.assertEqual(1, streaming.calculate_slab_size((1000, 1000), np.float32))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,13 +4,23 @@ from __future__ import annotations
 
 from functools import partial
 from logging import getLogger
-from typing import Any, Callable, Dict, Iterable, List
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type, TYPE_CHECKING
 
 import numpy as np
 
 from mantidimaging.core.operations.loader import load_filter_packages
+from mantidimaging.core.parallel import shared as ps
 from . import const
 
+if TYPE_CHECKING:
+    from mantidimaging.core.data import ImageStack
+    from mantidimaging.core.operations.base_filter import BaseFilter
+    from mantidimaging.core.parallel.shared import ImageKernel
+    from mantidimaging.core.utility.progress_reporting import Progress
+
+# An operation, its filter if it has one, and the partial applying it to a stack
+OperationStep = Tuple['ImageOperation', Optional[Type['BaseFilter']], Callable]
+
 MODULE_NOT_FOUND = "Could not find module with name '{}'"
 
 
@@ -55,14 +65,96 @@ def deserialize_metadata(metadata: Dict[str, Any]) -> List[ImageOperation]:
         if const.OPERATION_HISTORY in metadata else []
 
 
-def ops_to_partials(filter_ops: Iterable[ImageOperation]) -> Iterable[partial]:
-    filter_funcs: Dict[str, Callable] = {
-        f.__name__: f.filter_func
-        for f in load_filter_packages(ignored_packages=['mantidimaging.core.operations.wip'])
-    }
+def _filter_classes() -> Dict[str, Type[BaseFilter]]:
+    return {f.__name__: f for f in load_filter_packages(ignored_packages=['mantidimaging.core.operations.wip'])}
+
+
+def _filter_funcs(filter_classes: Dict[str, Type[BaseFilter]]) -> Dict[str, Callable]:
+    filter_funcs: Dict[str, Callable] = {name: f.filter_func for name, f in filter_classes.items()}
     fixed_funcs = {
         const.OPERATION_NAME_AXES_SWAP: lambda img, **_: np.swapaxes(img, 0, 1),
         # const.OPERATION_NAME_TOMOPY_RECON: lambda img, **kwargs: TomopyReconWindowModel.do_recon(img, **kwargs),
     }
     filter_funcs.update(fixed_funcs)
+    return filter_funcs
+
+
+def ops_to_partials(filter_ops: Iterable[ImageOperation]) -> Iterable[partial]:
+    filter_funcs = _filter_funcs(_filter_classes())
     return (op.to_partial(filter_funcs) for op in filter_ops)
+
+
+def apply_operations(images: ImageStack,
+                     filter_ops: Iterable[ImageOperation],
+                     record: bool = True,
+                     progress: Optional[Progress] = None) -> ImageStack:
+    """
+    Apply the operations to the stack in order, see apply_steps.
+    """
+    filter_classes = _filter_classes()
+    filter_funcs = _filter_funcs(filter_classes)
+    steps = [(op, filter_classes.get(op.filter_name), op.to_partial(filter_funcs)) for op in filter_ops]
+    return apply_steps(images, steps, record, progress)
+
+
+def apply_steps(images: ImageStack,
+                steps: Sequence[OperationStep],
+                record: bool = True,
+                progress: Optional[Progress] = None) -> ImageStack:
+    """
+    Apply the operations to the stack in order. Consecutive operations whose filters provide an image kernel
+    (see BaseFilter.image_kernel), e.g. Arithmetic followed by Rescale, are applied together with a single pass
+    over the stack, rather than one pass each. The others are applied by calling their partials.
+
+    :param images: The stack
+    :param steps: The operations, with their filters and partials
+    :param record: Record each operation in the stack's history, in the order they are given
+    :param progress: Progress instance to use for progress reporting of the combined passes
+    :return: The stack, which is a new one if an operation returned one
+    """
+    pending: List[Tuple[ImageOperation, ImageKernel]] = []
+
+    def apply_pending():
+        if not pending:
+            return
+        ps.run_image_kernels([kernel for _, kernel in pending], images.shared_array, progress)
+        images.invalidate_statistics()
+        if record:
+            for pending_op, _ in pending:
+                images.record_operation(pending_op.filter_name, pending_op.display_name, **pending_op.filter_kwargs)
+        pending.clear()
+
+    for op, filter_class, func in steps:
+        kernel = None
+        if filter_class is not None:
+            try:
+                kernel = _image_kernel(images, filter_class, op, [k for _, k in pending])
+                if kernel is None and pending:
+                    # The filter may need to see the data as the earlier operations leave it
+                    apply_pending()
+                    kernel = _image_kernel(images, filter_class, op, [])
+            except Exception:
+                # Keep the stack as it would be after applying the operations one by one
+                apply_pending()
+                raise
+
+        if kernel is not None:
+            pending.append((op, kernel))
+            continue
+
+        apply_pending()
+        result = func(images)
+        if result is not None:
+            images = result
+        if record:
+            images.record_operation(op.filter_name, op.display_name, **op.filter_kwargs)
+
+    apply_pending()
+    return images
+
+
+def _image_kernel(images: ImageStack, filter_class: Type[BaseFilter], op: ImageOperation,
+                  preceding: List[ImageKernel]) -> Optional[ImageKernel]:
+    return filter_class.image_kernel(images,
+                                     preceding=partial(ps.apply_image_kernels, list(preceding)) if preceding else None,
+                                     **op.filter_kwargs)
@@ -3,9 +3,14 @@
 from __future__ import annotations
 
 import unittest
+from unittest import mock
 
-from mantidimaging.core.operation_history import operations
-from mantidimaging.core.operation_history.operations import (MODULE_NOT_FOUND, ImageOperation)
+import numpy.testing as npt
+
+from mantidimaging.core.operation_history import const, operations
+from mantidimaging.core.operation_history.operations import (MODULE_NOT_FOUND, ImageOperation, apply_operations)
+from mantidimaging.test_helpers.start_qapplication import start_multiprocessing_pool
+from mantidimaging.test_helpers.unit_test_helper import generate_images
 
 
 class OperationHistoryTest(unittest.TestCase):
@@ -22,3 +27,91 @@ class OperationHistoryTest(unittest.TestCase):
         ops = operations.ops_to_partials(in_ops)
         with self.assertRaisesRegex(KeyError, MODULE_NOT_FOUND.format(fake_module_name)):
             list(ops)
+
+
+@start_multiprocessing_pool
+class ApplyOperationsTest(unittest.TestCase):
+    def setUp(self):
+        self.images = generate_images((10, 20, 30), seed=2023)
+        self.ops = [
+            ImageOperation("ArithmeticFilter", {
+                "mult_val": 2.0,
+                "add_val": 1.0
+            }, "Arithmetic"),
+            ImageOperation("ClipValuesFilter", {
+                "clip_min": 0.5,
+                "clip_max": 2.5
+            }, "Clip Values"),
+            ImageOperation("RoiNormalisationFilter", {"region_of_interest": [3, 3, 6, 8]}, "ROI Normalisation"),
+            ImageOperation("CropCoordinatesFilter", {"region_of_interest": [0, 0, 25, 15]}, "Crop Coordinates"),
+            ImageOperation("RescaleFilter", {
+                "min_input": 0.0,
+                "max_input": 3.0,
+                "max_output": 1.0
+            }, "Rescale"),
+            ImageOperation("DivideFilter", {
+                "value": 2.0,
+                "unit": "cm"
+            }, "Divide"),
+        ]
+
+    def _apply_one_by_one(self, images, ops):
+        for op, func in zip(ops, operations.ops_to_partials(ops)):
+            images = func(images)
+            images.record_operation(op.filter_name, op.display_name, **op.filter_kwargs)
+        return images
+
+    def _history(self, images):
+        return [(entry[const.OPERATION_NAME], entry[const.OPERATION_KEYWORD_ARGS])
+                for entry in images.metadata[const.OPERATION_HISTORY]]
+
+    def test_same_result_as_one_by_one(self):
+        expected = self._apply_one_by_one(self.images.copy(), self.ops)
+
+        result = apply_operations(self.images, self.ops)
+
+        npt.assert_allclose(result.data, expected.data, rtol=1e-5)
+        self.assertEqual(self._history(expected), self._history(result))
+
+    @mock.patch("mantidimaging.core.operation_history.operations.ps.run_image_kernels",
+                wraps=operations.ps.run_image_kernels)
+    def test_runs_applied_in_one_pass(self, run_image_kernels):
+        apply_operations(self.images, self.ops)
+
+        # Arithmetic, Clip Values and ROI Normalisation, then Rescale and Divide after the crop
+        self.assertEqual(2, run_image_kernels.call_count)
+        self.assertEqual([3, 2], [len(call.args[0]) for call in run_image_kernels.call_args_list])
+
+    def test_clip_needing_data_limits_ends_run(self):
+        ops = [
+            ImageOperation("ArithmeticFilter", {"add_val": 1.0}, "Arithmetic"),
+            ImageOperation("ClipValuesFilter", {"clip_min": 1.5}, "Clip Values"),
+        ]
+        expected = self._apply_one_by_one(self.images.copy(), ops)
+
+        with mock.patch("mantidimaging.core.operation_history.operations.ps.run_image_kernels",
+                        wraps=operations.ps.run_image_kernels) as run_image_kernels:
+            result = apply_operations(self.images, ops)
+
+        self.assertEqual(2, run_image_kernels.call_count)
+        npt.assert_equal(result.data, expected.data)
+
+    def test_failing_operation_keeps_earlier_operations(self):
+        ops = [
+            ImageOperation("ArithmeticFilter", {"add_val": 1.0}, "Arithmetic"),
+            ImageOperation("DivideFilter", {"value": 0}, "Divide"),
+        ]
+        expected = self.images.data + 1
+
+        self.assertRaises(ValueError, apply_operations, self.images, ops)
+
+        npt.assert_allclose(self.images.data, expected)
+        self.assertEqual(["ArithmeticFilter"], [name for name, _ in self._history(self.images)])
+
+    def test_without_recording(self):
+        apply_operations(self.images, self.ops[:2], record=False)
+
+        self.assertNotIn(const.OPERATION_HISTORY, self.images.metadata)
+
+    def test_unknown_operation_raises(self):
+        self.assertRaises(KeyError, apply_operations, self.images, [ImageOperation("NonExistingFilter12", {}, "")])
@@ -2,14 +2,16 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 from functools import partial
-from typing import Callable, Dict, TYPE_CHECKING
+from typing import Callable, Dict, Optional, TYPE_CHECKING
+
+import numpy as np
 
 from mantidimaging.gui.utility.qt_helpers import add_property_to_form, MAX_SPIN_BOX, Type
 from mantidimaging.core.operations.base_filter import BaseFilter
 from mantidimaging.core.parallel import shared as ps
 
 if TYPE_CHECKING:
-    import numpy as np
+    from mantidimaging.core.parallel.shared import ImageKernel
     from mantidimaging.gui.mvp_base import BaseMainWindowView
     from mantidimaging.core.data import ImageStack
     from PyQt5.QtWidgets import QFormLayout, QWidget, QDoubleSpinBox
@@ -43,17 +45,16 @@ class ArithmeticFilter(BaseFilter):
         :param progress: The Progress object isn't used.
         :return: The processed ImageStack object.
         """
-        if div_val == 0 or mult_val == 0:
-            raise ValueError("Unable to proceed with operation because division/multiplication value is zero.")
-
-        params = {'div': div_val, 'mult': mult_val, 'add': add_val, 'sub': sub_val}
-        ps.run_compute_func(cls.compute_function, images.data.shape[0], images.shared_array, params, progress)
+        kernel = _arithmetic_kernel(div_val=div_val, mult_val=mult_val, add_val=add_val, sub_val=sub_val)
+        ps.run_image_kernels([kernel], images.shared_array, progress)
 
         return images
 
     @staticmethod
-    def compute_function(i: int, array: np.ndarray, params: Dict[str, float]):
-        array[i] = array[i] * (params["mult"] / params["div"]) + (params["add"] - params["sub"])
+    def image_kernel(images: ImageStack,
+                     preceding: Optional[ImageKernel] = None,
+                     **filter_kwargs) -> Optional[ImageKernel]:
+        return _arithmetic_kernel(**filter_kwargs)
 
     @staticmethod
     def register_gui(form: 'QFormLayout', on_change: Callable, view: 'BaseMainWindowView') -> Dict[str, 'QWidget']:
@@ -107,3 +108,17 @@ class ArithmeticFilter(BaseFilter):
                        div_val=div_input_widget.value(),
                        add_val=add_input_widget.value(),
                        sub_val=sub_input_widget.value())
+
+
+def _arithmetic(image: np.ndarray, index: int, scale: float, offset: float):
+    np.multiply(image, scale, out=image)
+    np.add(image, offset, out=image)
+
+
+def _arithmetic_kernel(div_val: float = 1.0,
+                       mult_val: float = 1.0,
+                       add_val: float = 0.0,
+                       sub_val: float = 0.0) -> ImageKernel:
+    if div_val == 0 or mult_val == 0:
+        raise ValueError("Unable to proceed with operation because division/multiplication value is zero.")
+    return partial(_arithmetic, scale=mult_val / div_val, offset=add_val - sub_val)
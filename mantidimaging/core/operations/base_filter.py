@@ -12,6 +12,7 @@ from mantidimaging.core.data import ImageStack
 
 if TYPE_CHECKING:
     from PyQt5.QtWidgets import QFormLayout, QWidget  # noqa: F401   # pragma: no cover
+    from mantidimaging.core.parallel.shared import ImageKernel  # pragma: no cover
     from mantidimaging.gui.mvp_base import BaseMainWindowView  # pragma: no cover
     from mantidimaging.gui.widgets.dataset_selector import DatasetSelectorWidgetView
 
@@ -88,6 +89,24 @@ class BaseFilter:
     def validate_execute_kwargs(kwargs: Dict[str, Any]) -> bool:
         return True
 
+    @staticmethod
+    def image_kernel(images: ImageStack,
+                     preceding: Optional['ImageKernel'] = None,
+                     **filter_kwargs) -> Optional['ImageKernel']:
+        """
+        Filters that change each pixel without looking at the other pixels can return a function applying the
+        filter in place to one image, given the image and its index in the stack. Runs of these filters in a list
+        of operations are applied together in a single pass over the stack, see operation_history.operations.
+        Filters override this with the same signature, and take their parameters from filter_kwargs.
+
+        :param images: The stack, before any filter in the run has been applied to it
+        :param preceding: Applies the filters before this one in the run to an image, or to some rows of one.
+                          For filters that look at the data to set themselves up. None if this is the first.
+        :param filter_kwargs: The parameters of the filter, as for filter_func
+        :return: A picklable function, or None if the filter can not be applied this way
+        """
+        return None
+
     @staticmethod
     def group_name() -> FilterGroup:
         return FilterGroup.NoGroup
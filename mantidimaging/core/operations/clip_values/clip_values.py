@@ -3,13 +3,16 @@
 from __future__ import annotations
 
 from functools import partial
-from typing import TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING
+
+import numpy as np
 
 from mantidimaging.core.operations.base_filter import BaseFilter
-from mantidimaging.core.utility.progress_reporting import Progress
+from mantidimaging.core.parallel import shared as ps
 
 if TYPE_CHECKING:
     from mantidimaging.core.data import ImageStack
+    from mantidimaging.core.parallel.shared import ImageKernel
 
 
 class ClipValuesFilter(BaseFilter):
@@ -52,30 +55,23 @@ class ClipValuesFilter(BaseFilter):
 
         :return: The processed 3D numpy.ndarray.
         """
-        # We're using is None because 0.0 is a valid value
-        if clip_min is None and clip_max is None:
-            raise ValueError('At least one of clip_min or clip_max must be supplied')
-
-        progress = Progress.ensure_instance(progress, num_steps=2, task_name='Clipping Values.')
-        with progress:
-            sample = data.data
-            progress.update(msg="Determining clip min and clip max")
-            clip_min = clip_min if clip_min is not None else sample.min()
-            clip_max = clip_max if clip_max is not None else sample.max()
-
-            clip_min_new_value = clip_min_new_value if clip_min_new_value is not None else clip_min
-
-            clip_max_new_value = clip_max_new_value if clip_max_new_value is not None else clip_max
-
-            progress.update(msg=f"Clipping data with values min {clip_min} and max {clip_max}")
-
-            # this is the fastest way to clip the values, np.clip does not do
-            # the clipping in place and ends up copying the data
-            sample[sample < clip_min] = clip_min_new_value
-            sample[sample > clip_max] = clip_max_new_value
-
+        kernel = _clip_values_kernel(data,
+                                     None,
+                                     clip_min=clip_min,
+                                     clip_max=clip_max,
+                                     clip_min_new_value=clip_min_new_value,
+                                     clip_max_new_value=clip_max_new_value)
+        # There is always a kernel when no operations come before this one
+        assert kernel is not None
+        ps.run_image_kernels([kernel], data.shared_array, progress)
         return data
 
+    @staticmethod
+    def image_kernel(images: ImageStack,
+                     preceding: Optional[ImageKernel] = None,
+                     **filter_kwargs) -> Optional[ImageKernel]:
+        return _clip_values_kernel(images, preceding, **filter_kwargs)
+
     @staticmethod
     def register_gui(form, on_change, view):
         from mantidimaging.gui.utility import add_property_to_form
@@ -151,3 +147,39 @@ class ClipValuesFilter(BaseFilter):
                        clip_max=clip_max,
                        clip_min_new_value=clip_min_new_value,
                        clip_max_new_value=clip_max_new_value)
+
+
+def _clip_values(image: np.ndarray, index: int, clip_min, clip_max, clip_min_new_value, clip_max_new_value):
+    # this is the fastest way to clip the values, np.clip does not do
+    # the clipping in place and ends up copying the data
+    image[image < clip_min] = clip_min_new_value
+    image[image > clip_max] = clip_max_new_value
+
+
+def _clip_values_kernel(images: ImageStack,
+                        preceding: Optional[ImageKernel],
+                        clip_min=None,
+                        clip_max=None,
+                        clip_min_new_value=None,
+                        clip_max_new_value=None) -> Optional[ImageKernel]:
+    # We're using is None because 0.0 is a valid value
+    if clip_min is None and clip_max is None:
+        raise ValueError('At least one of clip_min or clip_max must be supplied')
+
+    if clip_min is None or clip_max is None:
+        if preceding is not None:
+            # The missing limit comes from the data this filter is given, which isn't available
+            # until the earlier filters have been applied
+            return None
+        clip_min = clip_min if clip_min is not None else images.data.min()
+        clip_max = clip_max if clip_max is not None else images.data.max()
+
+    clip_min_new_value = clip_min_new_value if clip_min_new_value is not None else clip_min
+
+    clip_max_new_value = clip_max_new_value if clip_max_new_value is not None else clip_max
+
+    return partial(_clip_values,
+                   clip_min=clip_min,
+                   clip_max=clip_max,
+                   clip_min_new_value=clip_min_new_value,
+                   clip_max_new_value=clip_max_new_value)
@@ -3,13 +3,17 @@
 from __future__ import annotations
 
 from functools import partial
-from typing import Union, Callable, Dict, Any, TYPE_CHECKING
+from typing import Union, Callable, Dict, Any, Optional, TYPE_CHECKING
+
+import numpy as np
 
 from mantidimaging import helper as h
 from mantidimaging.core.operations.base_filter import BaseFilter
+from mantidimaging.core.parallel import shared as ps
 from mantidimaging.gui.utility.qt_helpers import Type
 
 if TYPE_CHECKING:
+    from mantidimaging.core.parallel.shared import ImageKernel
     from PyQt5.QtWidgets import QFormLayout, QDoubleSpinBox, QComboBox
     from mantidimaging.gui.mvp_base import BasePresenter
     from mantidimaging.core.data import ImageStack
@@ -36,16 +40,16 @@ class DivideFilter(BaseFilter):
 
         :return: The ImageStack object which has been divided by a value.
         """
-        h.check_data_stack(images)
-        if not value:
-            raise ValueError('value parameter must not equal 0 or None')
-
-        if unit == "micron":
-            value *= 1e-4
-
-        images.data /= value
+        kernel = _divide_kernel(images, value=value, unit=unit)
+        ps.run_image_kernels([kernel], images.shared_array, progress)
         return images
 
+    @staticmethod
+    def image_kernel(images: ImageStack,
+                     preceding: Optional[ImageKernel] = None,
+                     **filter_kwargs) -> Optional[ImageKernel]:
+        return _divide_kernel(images, **filter_kwargs)
+
     @staticmethod
     def register_gui(form: 'QFormLayout', on_change: Callable, view: 'BasePresenter') -> Dict[str, Any]:
         from mantidimaging.gui.utility import add_property_to_form
@@ -81,3 +85,18 @@ class DivideFilter(BaseFilter):
         if 'value_widget' not in kwargs:
             return False
         return True
+
+
+def _divide(image: np.ndarray, index: int, value: float):
+    np.true_divide(image, value, out=image)
+
+
+def _divide_kernel(images: ImageStack, value: Union[int, float] = 0, unit="micron") -> ImageKernel:
+    h.check_data_stack(images)
+    if not value:
+        raise ValueError('value parameter must not equal 0 or None')
+
+    if unit == "micron":
+        value *= 1e-4
+
+    return partial(_divide, value=value)
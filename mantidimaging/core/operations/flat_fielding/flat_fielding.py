@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from functools import partial
-from typing import Any, Dict, TYPE_CHECKING
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
 from PyQt5.QtWidgets import QComboBox, QCheckBox
 
 import numpy as np
@@ -73,6 +73,8 @@ class FlatFieldFilter(BaseFilter):
                     dark_after: ImageStack = None,
                     selected_flat_fielding: str = None,
                     use_dark: bool = True,
+                    clip_values: bool = False,
+                    nan_value: Optional[float] = None,
                     progress=None) -> ImageStack:
         """Do background correction with flat and dark images.
 
@@ -84,6 +86,8 @@ class FlatFieldFilter(BaseFilter):
         :param selected_flat_fielding: Select which of the flat fielding methods to use, just Before stacks, just After
                                        stacks or combined.
         :param use_dark: Whether to use dark frame subtraction
+        :param clip_values: Whether to clip the result to the range [MINIMUM_PIXEL_VALUE, MAXIMUM_PIXEL_VALUE]
+        :param nan_value: If provided, any NaNs in the result are replaced with this value
         :return: Filtered data (stack of images)
         """
         h.check_data_stack(images)
@@ -120,7 +124,7 @@ class FlatFieldFilter(BaseFilter):
             progress = Progress.ensure_instance(progress,
                                                 num_steps=images.data.shape[0],
                                                 task_name='Background Correction')
-            _execute(images, flat_avg, dark_avg, progress)
+            _execute(images, flat_avg, dark_avg, progress, clip_values=clip_values, nan_value=nan_value)
 
         h.check_data_stack(images)
         return images
@@ -260,36 +264,39 @@ class FlatFieldFilter(BaseFilter):
         return FilterGroup.Basic
 
 
-def _divide(data, norm_divide):
-    np.true_divide(data, norm_divide, out=data)
-
-
-def _subtract(data, dark=None):
-    # specify out to do in place, otherwise the data is copied
-    np.subtract(data, dark, out=data)
-
-
 def _norm_divide(flat: np.ndarray, dark: np.ndarray) -> np.ndarray:
     # subtract dark from flat
     return np.subtract(flat, dark)
 
 
-def _execute(images: ImageStack, flat=None, dark=None, progress=None):
-    """A benchmark justifying the current implementation, performed on
-    500x2048x2048 images.
+def _flat_field_compute(index: int, arrays: List[np.ndarray], params: Dict[str, Any]):
+    """
+    Dark subtract and flat divide a single image in place, so that each
+    projection is only read and written once.
+    """
+    data, dark, norm_divide = arrays
+    image = data[index]
+    # specify out to do in place, otherwise the data is copied
+    np.subtract(image, dark, out=image)
+    np.true_divide(image, norm_divide, out=image)
 
-    #1 Separate runs
-    Subtract (sequential with np.subtract(data, dark, out=data)) - 13s
-    Divide (par) - 1.15s
+    if params["nan_value"] is not None:
+        np.nan_to_num(image, copy=False, nan=params["nan_value"])
+    if params["clip_values"]:
+        np.clip(image, MINIMUM_PIXEL_VALUE, MAXIMUM_PIXEL_VALUE, out=image)
 
-    #2 Separate parallel runs
-    Subtract (par) - 5.5s
-    Divide (par) - 1.15s
 
-    #3 Added subtract into _divide so that it is:
-                np.true_divide(
-                    np.subtract(data, dark, out=data), norm_divide, out=data)
-    Subtract then divide (par) - 55s
+def _execute(images: ImageStack,
+             flat=None,
+             dark=None,
+             progress=None,
+             clip_values: bool = False,
+             nan_value: Optional[float] = None):
+    """
+    Subtracts the dark and divides by (flat - dark) in a single pass over the stack.
+
+    Each worker applies both steps to one image before moving on, rather than
+    sweeping the whole stack once for the subtraction and again for the division.
     """
     with progress:
         progress.update(msg="Applying background correction")
@@ -304,14 +311,8 @@ def _execute(images: ImageStack, flat=None, dark=None, progress=None):
         # prevent divide-by-zero issues, and negative pixels make no sense
         norm_divide.array[norm_divide.array == 0] = MINIMUM_PIXEL_VALUE
 
-        # subtract the dark from all images
-        do_subtract = ps.create_partial(_subtract, fwd_function=ps.inplace_second_2d)
-        arrays = [images.shared_array, shared_dark]
-        ps.execute(do_subtract, arrays, images.data.shape[0], progress)
-
-        # divide the data by (flat - dark)
-        do_divide = ps.create_partial(_divide, fwd_function=ps.inplace_second_2d)
-        arrays = [images.shared_array, norm_divide]
-        ps.execute(do_divide, arrays, images.data.shape[0], progress)
+        params = {"clip_values": clip_values, "nan_value": nan_value}
+        arrays = [images.shared_array, shared_dark, norm_divide]
+        ps.run_compute_func(_flat_field_compute, images.data.shape[0], arrays, params, progress)
 
     return images
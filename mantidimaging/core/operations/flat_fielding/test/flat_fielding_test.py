@@ -98,6 +98,36 @@ class FlatFieldingTest(unittest.TestCase):
 
         npt.assert_almost_equal(result.data, expected, 7)
 
+    def test_clip_values(self):
+        images, flat_before, dark_before, flat_after, dark_after = self._make_images()
+        images.data[:] = 5.
+        flat_before.data[:] = 7.
+        dark_before.data[:] = 6.
+
+        result = FlatFieldFilter.filter_func(images,
+                                             flat_before=flat_before,
+                                             dark_before=dark_before,
+                                             selected_flat_fielding="Only Before",
+                                             clip_values=True)
+
+        npt.assert_almost_equal(result.data, np.full(images.data.shape, 1e-9), 7)
+
+    def test_nan_value(self):
+        images, flat_before, dark_before, flat_after, dark_after = self._make_images()
+        images.data[:] = 26.
+        images.data[0, 0, 0] = np.nan
+        flat_before.data[:] = 7.
+        dark_before.data[:] = 6.
+
+        result = FlatFieldFilter.filter_func(images,
+                                             flat_before=flat_before,
+                                             dark_before=dark_before,
+                                             selected_flat_fielding="Only Before",
+                                             nan_value=0.)
+
+        self.assertEqual(0., result.data[0, 0, 0])
+        self.assertFalse(np.isnan(result.data).any())
+
     def test_execute_wrapper_return_is_runnable(self):
         """
         Test that the partial returned by execute_wrapper can be executed (kwargs are named correctly)
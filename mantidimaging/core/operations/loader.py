@@ -4,7 +4,7 @@ from __future__ import annotations
 import os
 import pkgutil
 import sys
-from typing import List, Protocol, cast, Union, TYPE_CHECKING
+from typing import List, Protocol, Type, cast, Union, TYPE_CHECKING
 from importlib.machinery import FileFinder, ModuleSpec
 from importlib.abc import Loader
 
@@ -30,10 +30,10 @@ if not MODULES_OPERATIONS:
 
 
 class OperationModule(Protocol):
-    FILTER_CLASS: BaseFilter
+    FILTER_CLASS: Type[BaseFilter]
 
 
-def load_filter_packages(ignored_packages=None) -> List[BaseFilter]:
+def load_filter_packages(ignored_packages=None) -> List[Type[BaseFilter]]:
     """
     Imports all subpackages with a FILTER_CLASS attribute, which should be an extension of BaseFilter.
 
@@ -6,8 +6,6 @@ from functools import partial
 from logging import getLogger
 from typing import Callable, Dict, Any, TYPE_CHECKING, Tuple
 
-import numpy as np
-import scipy.ndimage as scipy_ndimage
 from PyQt5.QtGui import QValidator
 from PyQt5.QtWidgets import QSpinBox, QLabel, QSizePolicy
 
@@ -15,6 +13,7 @@ from mantidimaging import helper as h
 from mantidimaging.core.gpu import utility as gpu
 from mantidimaging.core.operations.base_filter import BaseFilter
 from mantidimaging.core.parallel import shared as ps
+from mantidimaging.core.utility import median
 from mantidimaging.core.utility.progress_reporting import Progress
 from mantidimaging.gui.utility import add_property_to_form
 from mantidimaging.gui.utility.qt_helpers import Type, on_change_and_disable
@@ -132,23 +131,12 @@ def modes():
     return ['reflect', 'constant', 'nearest', 'mirror', 'wrap']
 
 
-def _median_filter(data: np.ndarray, size: int, mode: str):
-    # Replaces NaNs with negative infinity before median filter
-    # so they do not effect neighbouring pixels
-    nans = np.isnan(data)
-    data = np.where(nans, -np.inf, data)
-    data = scipy_ndimage.median_filter(data, size=size, mode=mode)
-    # Put the original NaNs back
-    data = np.where(nans, np.nan, data)
-    return data
-
-
 def _execute(images: ImageStack, size, mode, progress=None):
     log = getLogger(__name__)
     progress = Progress.ensure_instance(progress, task_name='Median filter')
 
     # create the partial function to forward the parameters
-    f = ps.create_partial(_median_filter, ps.return_to_self, size=size, mode=mode)
+    f = ps.create_partial(median.median_filter, ps.return_to_self, size=size, mode=mode)
 
     with progress:
         log.info("PARALLEL median filter, with pixel data type: {0}, filter "
@@ -2,22 +2,36 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 from functools import partial
-from typing import Callable, Dict, Any, TYPE_CHECKING
+from typing import Callable, Dict, Any, Optional, TYPE_CHECKING
 
 import numpy as np
 
 from mantidimaging.core.operations.base_filter import BaseFilter
 from mantidimaging.core.parallel import shared as ps
-from mantidimaging.core.parallel import utility as pu
 
 if TYPE_CHECKING:
     from mantidimaging.core.data import ImageStack
+    from mantidimaging.core.parallel.shared import ImageKernel
     from mantidimaging.gui.mvp_base import BaseMainWindowView
     from PyQt5.QtWidgets import QFormLayout, QWidget
 
 
-def _divide_by_counts(data=None, counts=None):
-    data[:] = np.true_divide(data, counts)
+def _divide_by_counts(image: np.ndarray, index: int, counts: np.ndarray):
+    np.true_divide(image, counts[index], out=image)
+
+
+def _monitor_normalisation_kernel(images: ImageStack) -> ImageKernel:
+    if images.num_projections == 1:
+        # we can't really compute the preview as the image stack copy
+        # passed in doesn't have the logfile in it
+        raise RuntimeError("No logfile available for this stack.")
+
+    counts = images.counts()
+
+    if counts is None:
+        raise RuntimeError("No loaded log values for this stack.")
+
+    return partial(_divide_by_counts, counts=counts.value / counts.value[0])
 
 
 class MonitorNormalisation(BaseFilter):
@@ -37,22 +51,16 @@ class MonitorNormalisation(BaseFilter):
         """
         :return: The ImageStack object which has been normalised.
         """
-        if images.num_projections == 1:
-            # we can't really compute the preview as the image stack copy
-            # passed in doesn't have the logfile in it
-            raise RuntimeError("No logfile available for this stack.")
-
-        counts = images.counts()
-
-        if counts is None:
-            raise RuntimeError("No loaded log values for this stack.")
-
-        counts_val = pu.copy_into_shared_memory(counts.value / counts.value[0])
-        do_division = ps.create_partial(_divide_by_counts, fwd_function=ps.inplace2)
-        arrays = [images.shared_array, counts_val]
-        ps.execute(do_division, arrays, images.num_projections, progress)
+        kernel = _monitor_normalisation_kernel(images)
+        ps.run_image_kernels([kernel], images.shared_array, progress)
         return images
 
+    @staticmethod
+    def image_kernel(images: ImageStack,
+                     preceding: Optional[ImageKernel] = None,
+                     **filter_kwargs) -> Optional[ImageKernel]:
+        return _monitor_normalisation_kernel(images)
+
     @staticmethod
     def register_gui(form: 'QFormLayout', on_change: Callable, view: 'BaseMainWindowView') -> Dict[str, 'QWidget']:
         return {}
@@ -4,13 +4,15 @@ from __future__ import annotations
 
 from functools import partial
 from logging import getLogger
-from typing import Dict, TYPE_CHECKING
+from typing import Any, Dict, List, TYPE_CHECKING, Union
 
 import numpy as np
-import scipy.ndimage as scipy_ndimage
 
+from mantidimaging.core.data.median_cache import median_images
 from mantidimaging.core.operations.base_filter import BaseFilter
 from mantidimaging.core.parallel import shared as ps
+from mantidimaging.core.parallel import utility as pu
+from mantidimaging.core.utility.median import median_filter
 from mantidimaging.core.utility.progress_reporting import Progress
 from mantidimaging.gui.utility.qt_helpers import Type
 
@@ -94,30 +96,48 @@ class NaNRemovalFilter(BaseFilter):
         return partial(NaNRemovalFilter.filter_func, replace_value=replace_value, mode_value=mode_value)
 
 
-def _nan_to_median(data: np.ndarray, size: int, edgemode: str):
-    nans = np.isnan(data)
-    if np.any(nans):
-        median_data = np.where(nans, -np.inf, data)
-        median_data = scipy_ndimage.median_filter(median_data, size=size, mode=edgemode)
-        data = np.where(nans, median_data, data)
+def _nan_to_median(i: int, arrays: Union[np.ndarray, List[np.ndarray]], params: Dict[str, Any]):
+    if isinstance(arrays, np.ndarray):
+        # The medians were too large to cache, so calculate them here
+        image = arrays[params['indices'][i]]
+        median = median_filter(image, params['size'], params['edgemode'], keep_nans=False)
+    else:
+        image, median = arrays[0][params['indices'][i]], arrays[1][i]
 
-        if np.any(data == -np.inf):
-            # Convert any left over -infs back to NaNs
-            data = np.where(np.logical_and(nans, data == -np.inf), np.NaN, data)
+    nans = np.isnan(image)
+    replacement = median[nans]
+    # Where most of the kernel is NaN the median is negative infinity, so leave those as NaN
+    replacement[np.isneginf(replacement)] = np.nan
+    image[nans] = replacement
 
-    return data
+
+def _has_nans_compute_function(i: int, arrays: List[np.ndarray], params: Dict[str, Any]):
+    arrays[1][i] = np.isnan(arrays[0][i]).any()
+
+
+def _images_with_nans(images: ImageStack) -> List[int]:
+    has_nans = pu.create_array((images.num_images, ), bool)
+    ps.run_compute_func(_has_nans_compute_function, images.num_images, [images.shared_array, has_nans], {})
+    return np.flatnonzero(has_nans.array).tolist()
 
 
 def _execute(images: ImageStack, size, edgemode, progress=None):
     log = getLogger(__name__)
     progress = Progress.ensure_instance(progress, task_name='NaN Removal')
 
-    # create the partial function to forward the parameters
-    f = ps.create_partial(_nan_to_median, ps.return_to_self, size=size, edgemode=edgemode)
-
     with progress:
         log.info("PARALLEL NaN Removal filter, with pixel data type: {0}".format(images.dtype))
 
-        ps.execute(f, [images.shared_array], images.data.shape[0], progress, msg="NaN Removal")
+        # Only the images containing NaNs need their medians. They are found here rather than taken from the
+        # cached statistics, as the data may have been changed in place since those were calculated.
+        indices = _images_with_nans(images)
+        if not indices:
+            return images
+        medians = median_images(images, indices, size, edgemode, progress)
+        arrays = [images.shared_array] if medians is None else [images.shared_array, medians]
+        params = {'indices': indices, 'size': size, 'edgemode': edgemode}
+        ps.run_compute_func(_nan_to_median, len(indices), arrays, params, progress)
+        # The cached medians must not be used for the new data
+        images.invalidate_statistics()
 
     return images
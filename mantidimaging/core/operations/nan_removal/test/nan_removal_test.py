@@ -3,11 +3,13 @@
 from __future__ import annotations
 
 import unittest
+from unittest import mock
 
 import numpy as np
 import numpy.testing as npt
 
 import mantidimaging.test_helpers.unit_test_helper as th
+from mantidimaging.core.data.median_cache import MedianCache
 from mantidimaging.core.operations.nan_removal import NaNRemovalFilter
 
 
@@ -34,3 +36,47 @@ class NaNRemovalFilterTest(unittest.TestCase):
 
         self.assertEqual(images.data[3, 4, 5], 7)
         self.assertTrue(np.all(images.data == 7))
+
+    def test_replace_nans_with_median_leaves_nan_blocks(self):
+        images = th.generate_images()
+        images.data[:] = 7
+        images.data[3, 0:3, 0:3] = np.NaN
+
+        NaNRemovalFilter().filter_func(images, 0, "Median")
+
+        self.assertTrue(np.isnan(images.data[3, 0, 0]))
+        self.assertEqual(7, images.data[3, 2, 2])
+        self.assertFalse(np.isinf(images.data).any())
+
+    @mock.patch("mantidimaging.core.operations.nan_removal.nan_removal.median_images")
+    def test_median_only_calculated_for_images_with_nans(self, median_images):
+        images = th.generate_images()
+        images.data[3, 4, 5] = np.NaN
+        median_images.return_value = None
+
+        NaNRemovalFilter().filter_func(images, 0, "Median")
+
+        self.assertEqual([3], median_images.call_args.args[1])
+        self.assertFalse(np.isnan(images.data).any())
+
+    def test_nans_written_after_statistics_are_replaced(self):
+        images = th.generate_images()
+        images.data[:] = 7
+        self.assertEqual(0, images.statistics().nan_count)
+        # changed in place, without invalidating the statistics
+        images.data[3, 4, 5] = np.NaN
+
+        NaNRemovalFilter().filter_func(images, 0, "Median")
+
+        self.assertEqual(7, images.data[3, 4, 5])
+
+    def test_medians_calculated_per_image_when_not_cached(self):
+        images = th.generate_images()
+        images.data[3, 4, 5] = np.NaN
+        images.data[5, 0:2, 0:2] = np.NaN
+        expected = NaNRemovalFilter().filter_func(images.copy(), 0, "Median")
+
+        with mock.patch("mantidimaging.core.data.median_cache.median_cache", MedianCache(max_bytes=0)):
+            result = NaNRemovalFilter().filter_func(images, 0, "Median")
+
+        npt.assert_equal(expected.data, result.data)
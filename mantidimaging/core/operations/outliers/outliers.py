@@ -3,13 +3,14 @@
 from __future__ import annotations
 
 from functools import partial
-from typing import TYPE_CHECKING
+from typing import Any, Dict, List, TYPE_CHECKING, Union
 
 import numpy as np
-import scipy.ndimage as scipy_ndimage
 
+from mantidimaging.core.data.median_cache import median_images
 from mantidimaging.core.operations.base_filter import BaseFilter, FilterGroup
 from mantidimaging.core.parallel import shared as ps
+from mantidimaging.core.utility.median import median_filter
 from mantidimaging.gui.utility import add_property_to_form
 from mantidimaging.gui.utility.qt_helpers import Type
 
@@ -34,18 +35,29 @@ class OutliersFilter(BaseFilter):
 
     Caution: This should usually be one of the first steps applied to the data, flat and dark
     images, to remove pixels with very large values that will cause issues for flat-fielding.
+
+    Note: NaN values are treated as negative infinity while calculating the medians, as in the Median filter.
     """
     filter_name = "Remove Outliers"
     link_histograms = True
 
     @staticmethod
-    def _execute(data, diff, radius, mode):
+    def compute_function(i: int, arrays: Union[np.ndarray, List[np.ndarray]], params: Dict[str, Any]):
         # Adapted from tomopy source
-        median = scipy_ndimage.median_filter(data, radius)
-        if mode == OUTLIERS_BRIGHT:
-            return np.where((data - median) > diff, median, data)
+        if isinstance(arrays, np.ndarray):
+            # The medians were too large to cache, so calculate them here
+            image = arrays[i]
+            median = median_filter(image, params['radius'], keep_nans=False)
+        else:
+            image, median = arrays[0][i], arrays[1][i]
+
+        if params['mode'] == OUTLIERS_BRIGHT:
+            outliers = np.subtract(image, median) > params['diff']
+            # The median is negative infinity where most of the kernel is NaN
+            outliers &= median > -np.inf
         else:
-            return np.where((median - data) > diff, median, data)
+            outliers = np.subtract(median, image) > params['diff']
+        np.copyto(image, median, where=outliers)
 
     @staticmethod
     def filter_func(images: ImageStack,
@@ -68,11 +80,13 @@ class OutliersFilter(BaseFilter):
         if not radius or not radius > 0:
             raise ValueError(f'radius parameter must be greater than 0. Value provided was {radius}')
 
-        func = ps.create_partial(OutliersFilter._execute, ps.return_to_self, diff=diff, radius=radius, mode=mode)
-        ps.execute(func, [images.shared_array],
-                   images.data.shape[0],
-                   progress=progress,
-                   msg=f"Outliers with threshold {diff} and kernel {radius}")
+        num_images = images.data.shape[0]
+        medians = median_images(images, range(num_images), radius, 'reflect', progress)
+        arrays = [images.shared_array] if medians is None else [images.shared_array, medians]
+        params = {'diff': diff, 'radius': radius, 'mode': mode}
+        ps.run_compute_func(OutliersFilter.compute_function, num_images, arrays, params, progress)
+        # The cached medians must not be used for the new data
+        images.invalidate_statistics()
         return images
 
     @staticmethod
@@ -11,8 +11,9 @@ from PyQt5.QtWidgets import QSpinBox, QComboBox, QDoubleSpinBox
 from mantidimaging.test_helpers import start_qapplication
 
 import mantidimaging.test_helpers.unit_test_helper as th
+from mantidimaging.core.data.median_cache import MedianCache
 from mantidimaging.core.operations.outliers import OutliersFilter
-from mantidimaging.core.operations.outliers.outliers import OUTLIERS_BRIGHT
+from mantidimaging.core.operations.outliers.outliers import OUTLIERS_BRIGHT, OUTLIERS_DARK
 
 
 @start_qapplication
@@ -49,6 +50,31 @@ class OutliersTest(unittest.TestCase):
 
         th.assert_not_equals(result.data, sample)
 
+    @parameterized.expand([("bright", OUTLIERS_BRIGHT, 9.0), ("dark", OUTLIERS_DARK, -9.0)])
+    def test_replaces_outliers_with_median(self, _, mode, outlier):
+        images = th.generate_images((2, 10, 10))
+        images.data[:] = 1
+        images.data[1, 4, 4] = outlier
+        images.data[1, 0:3, 0:3] = np.nan
+
+        OutliersFilter.filter_func(images, 1, 3, mode)
+
+        self.assertEqual(1, images.data[1, 4, 4])
+        # The NaNs are kept, and their neighbours are not replaced with negative infinity
+        self.assertTrue(np.isnan(images.data[1, 0:3, 0:3]).all())
+        self.assertFalse(np.isnan(images.data[1, 3:]).any())
+        self.assertTrue((images.data[1, 3:] == 1).all())
+
+    def test_medians_calculated_per_image_when_not_cached(self):
+        images = th.generate_images()
+        images.data[0, 0, 0] = np.nan
+        expected = OutliersFilter.filter_func(images.copy(), 0.1, 3)
+
+        with mock.patch("mantidimaging.core.data.median_cache.median_cache", MedianCache(max_bytes=0)):
+            result = OutliersFilter.filter_func(images, 0.1, 3)
+
+        np.testing.assert_equal(expected.data, result.data)
+
     def test_executed_sino_preview(self):
         images = th.generate_images([1, 10, 10])
         images._is_sinograms = True
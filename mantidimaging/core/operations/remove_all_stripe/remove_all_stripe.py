@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from functools import partial
-from typing import Dict, Any, TYPE_CHECKING
+from typing import TYPE_CHECKING
 
 from algotom.prep.removal import remove_all_stripe
 
@@ -12,7 +12,6 @@ from mantidimaging.core.parallel import shared as ps
 from mantidimaging.gui.utility.qt_helpers import Type
 
 if TYPE_CHECKING:
-    from numpy import ndarray
     from mantidimaging.core.data.imagestack import ImageStack
     from PyQt5.QtWidgets import QSpinBox, QDoubleSpinBox
 
@@ -51,22 +50,9 @@ class RemoveAllStripesFilter(BaseFilter):
         if images.num_projections < 2:
             return images
         params = {"snr": snr, "la_size": la_size, "sm_size": sm_size, "dim": dim}
-        if images.is_sinograms:
-            compute_func = RemoveAllStripesFilter.compute_function_sino
-        else:
-            compute_func = RemoveAllStripesFilter.compute_function
-
-        ps.run_compute_func(compute_func, images.num_sinograms, images.shared_array, params, progress)
+        ps.run_sinogram_func(remove_all_stripe, images.shared_array, images.is_sinograms, params, progress)
         return images
 
-    @staticmethod
-    def compute_function_sino(index: int, array: ndarray, params: Dict[str, Any]):
-        array[index] = remove_all_stripe(array[index], **params)
-
-    @staticmethod
-    def compute_function(index: int, array: ndarray, params: Dict[str, Any]):
-        array[:, index, :] = remove_all_stripe(array[:, index, :], **params)
-
     @staticmethod
     def register_gui(form, on_change, view):
         from mantidimaging.gui.utility import add_property_to_form
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from functools import partial
-from typing import Dict, Any, TYPE_CHECKING
+from typing import TYPE_CHECKING
 
 from algotom.prep.removal import remove_dead_stripe
 
@@ -12,7 +12,6 @@ from mantidimaging.core.parallel import shared as ps
 from mantidimaging.gui.utility.qt_helpers import Type
 
 if TYPE_CHECKING:
-    from numpy import ndarray
     from mantidimaging.core.data.imagestack import ImageStack
     from PyQt5.QtWidgets import QDoubleSpinBox, QSpinBox
 
@@ -46,21 +45,9 @@ class RemoveDeadStripesFilter(BaseFilter):
         if images.num_projections < 2:
             return images
         params = {"snr": snr, "size": size, "residual": False}
-        if images.is_sinograms:
-            compute_func = cls.compute_function_sino
-        else:
-            compute_func = cls.compute_function
-        ps.run_compute_func(compute_func, images.num_sinograms, images.shared_array, params, progress)
+        ps.run_sinogram_func(remove_dead_stripe, images.shared_array, images.is_sinograms, params, progress)
         return images
 
-    @staticmethod
-    def compute_function_sino(index: int, array: ndarray, params: Dict[str, Any]):
-        array[index] = remove_dead_stripe(array[index], **params)
-
-    @staticmethod
-    def compute_function(index: int, array: ndarray, params: Dict[str, Any]):
-        array[:, index, :] = remove_dead_stripe(array[:, index, :], **params)
-
     @staticmethod
     def register_gui(form, on_change, view):
         from mantidimaging.gui.utility import add_property_to_form
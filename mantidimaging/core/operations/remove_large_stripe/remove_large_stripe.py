@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from functools import partial
-from typing import TYPE_CHECKING, Dict, Any
+from typing import TYPE_CHECKING
 
 from algotom.prep.removal import remove_large_stripe
 
@@ -13,7 +13,6 @@ from mantidimaging.gui.utility.qt_helpers import Type
 
 if TYPE_CHECKING:
     from mantidimaging.core.data.imagestack import ImageStack
-    from numpy import ndarray
     from PyQt5.QtWidgets import QSpinBox, QDoubleSpinBox
 
 
@@ -44,21 +43,9 @@ class RemoveLargeStripesFilter(BaseFilter):
         :return: The ImageStack object with large stripes removed.
         """
         params = {"snr": snr, "size": la_size}
-        if images.is_sinograms:
-            compute_func = cls.compute_function_sino
-        else:
-            compute_func = cls.compute_function
-        ps.run_compute_func(compute_func, images.num_sinograms, images.shared_array, params, progress)
+        ps.run_sinogram_func(remove_large_stripe, images.shared_array, images.is_sinograms, params, progress)
         return images
 
-    @staticmethod
-    def compute_function_sino(index: int, array: 'ndarray', params: Dict[str, Any]):
-        array[index] = remove_large_stripe(array[index], **params)
-
-    @staticmethod
-    def compute_function(index: int, array: 'ndarray', params: Dict[str, Any]):
-        array[:, index, :] = remove_large_stripe(array[:, index, :], **params)
-
     @staticmethod
     def register_gui(form, on_change, view):
         from mantidimaging.gui.utility import add_property_to_form
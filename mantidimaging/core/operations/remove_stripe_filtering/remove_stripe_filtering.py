@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from functools import partial
-from typing import Dict, Any, TYPE_CHECKING
+from typing import TYPE_CHECKING
 
 from algotom.prep.removal import remove_stripe_based_filtering, remove_stripe_based_2d_filtering_sorting
 
@@ -12,7 +12,6 @@ from mantidimaging.core.parallel import shared as ps
 from mantidimaging.gui.utility.qt_helpers import Type
 
 if TYPE_CHECKING:
-    from numpy import ndarray
     from mantidimaging.core.data.imagestack import ImageStack
     from PyQt5.QtWidgets import QSpinBox
 
@@ -52,38 +51,15 @@ class RemoveStripeFilteringFilter(BaseFilter):
                  filtering and sorting technique.
         """
         params = {"sigma": sigma, "size": size, "dim": window_dim}
-        if images.is_sinograms:
-            if filtering_dim == 1:
-                params["sort"] = True
-                compute_func = cls.compute_function_sino
-            else:
-                compute_func = cls.compute_function_2d_sino
+        if filtering_dim == 1:
+            params["sort"] = True
+            func = remove_stripe_based_filtering
         else:
-            if filtering_dim == 1:
-                params["sort"] = True
-                compute_func = cls.compute_function
-            else:
-                compute_func = cls.compute_function_2d
+            func = remove_stripe_based_2d_filtering_sorting
 
-        ps.run_compute_func(compute_func, images.num_sinograms, images.shared_array, params, progress)
+        ps.run_sinogram_func(func, images.shared_array, images.is_sinograms, params, progress)
         return images
 
-    @staticmethod
-    def compute_function_sino(index: int, array: ndarray, params: Dict[str, Any]):
-        array[index] = remove_stripe_based_filtering(array[index], **params)
-
-    @staticmethod
-    def compute_function(index: int, array: ndarray, params: Dict[str, Any]):
-        array[:, index, :] = remove_stripe_based_filtering(array[:, index, :], **params)
-
-    @staticmethod
-    def compute_function_2d_sino(index: int, array: ndarray, params: Dict[str, Any]):
-        array[index] = remove_stripe_based_2d_filtering_sorting(array[index], **params)
-
-    @staticmethod
-    def compute_function_2d(index: int, array: ndarray, params: Dict[str, Any]):
-        array[:, index, :] = remove_stripe_based_2d_filtering_sorting(array[:, index, :], **params)
-
     @staticmethod
     def register_gui(form, on_change, view):
         from mantidimaging.gui.utility import add_property_to_form
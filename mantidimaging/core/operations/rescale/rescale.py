@@ -3,14 +3,16 @@
 from __future__ import annotations
 
 from functools import partial
-from typing import Any, Dict, TYPE_CHECKING
+from typing import Any, Dict, Optional, TYPE_CHECKING
 
 import numpy as np
 
 from mantidimaging.core.operations.base_filter import BaseFilter
+from mantidimaging.core.parallel import shared as ps
 from mantidimaging.gui.utility.qt_helpers import Type
 
 if TYPE_CHECKING:
+    from mantidimaging.core.parallel.shared import ImageKernel
     from mantidimaging.core.data import ImageStack
     from mantidimaging.gui.windows.operations import FiltersWindowView
     from PyQt5.QtWidgets import QComboBox, QDoubleSpinBox
@@ -42,9 +44,16 @@ class RescaleFilter(BaseFilter):
         :return: The ImageStack object scaled to a new range.
         """
 
-        RescaleFilter.filter_array(images.data, min_input, max_input, max_output)
+        kernel = _rescale_kernel(min_input=min_input, max_input=max_input, max_output=max_output)
+        ps.run_image_kernels([kernel], images.shared_array, progress)
         return images
 
+    @staticmethod
+    def image_kernel(images: ImageStack,
+                     preceding: Optional[ImageKernel] = None,
+                     **filter_kwargs) -> Optional[ImageKernel]:
+        return _rescale_kernel(**filter_kwargs)
+
     @staticmethod
     def filter_array(image: np.ndarray, min_input: float, max_input: float, max_output: float) -> np.ndarray:
         image[:] = np.interp(image, [min_input, max_input], [0, max_output])
@@ -113,3 +122,11 @@ class RescaleFilter(BaseFilter):
     @staticmethod
     def validate_execute_kwargs(kwargs: Dict[str, Any]) -> bool:
         return True
+
+
+def _rescale(image: np.ndarray, index: int, min_input: float, max_input: float, max_output: float):
+    RescaleFilter.filter_array(image, min_input, max_input, max_output)
+
+
+def _rescale_kernel(min_input: float = 0.0, max_input: float = 10000.0, max_output: float = 256.0) -> ImageKernel:
+    return partial(_rescale, min_input=min_input, max_input=max_input, max_output=max_output)
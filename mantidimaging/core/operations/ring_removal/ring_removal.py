@@ -2,6 +2,7 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 
+import os
 from functools import partial
 from typing import TYPE_CHECKING
 
@@ -16,6 +17,9 @@ from mantidimaging.gui.utility.qt_helpers import Type
 if TYPE_CHECKING:
     from mantidimaging.core.data import ImageStack
 
+# Number of slices given to each core between progress updates
+SLICES_PER_CORE = 4
+
 
 class RingRemovalFilter(BaseFilter):
     """Remove ring artifacts from images in the reconstructed domain.
@@ -59,8 +63,6 @@ class RingRemovalFilter(BaseFilter):
                        Maximum width of the rings to be filtered in pixels
         :returns: Filtered data
         """
-        progress = Progress.ensure_instance(progress, task_name='Ring Removal')
-
         tp = safe_import('tomopy.misc.corr')
 
         if center_mode != "manual":
@@ -68,18 +70,26 @@ class RingRemovalFilter(BaseFilter):
 
         h.check_data_stack(images)
 
+        num_slices = images.data.shape[0]
+        progress = Progress.ensure_instance(progress, num_steps=num_slices, task_name='Ring Removal')
+        ncore = os.cpu_count() or 1
+        chunk_size = ncore * SLICES_PER_CORE
+
         with progress:
-            progress.update(msg="Ring Removal")
-            sample = images.data
-            tp.remove_ring(sample,
-                           center_x=center_x,
-                           center_y=center_y,
-                           thresh=thresh,
-                           thresh_max=thresh_max,
-                           thresh_min=thresh_min,
-                           theta_min=theta_min,
-                           rwidth=rwidth,
-                           out=sample)
+            # TomoPy spreads each chunk over the cores, and the progress can be cancelled between chunks
+            for start in range(0, num_slices, chunk_size):
+                chunk = images.data[start:start + chunk_size]
+                tp.remove_ring(chunk,
+                               center_x=center_x,
+                               center_y=center_y,
+                               thresh=thresh,
+                               thresh_max=thresh_max,
+                               thresh_min=thresh_min,
+                               theta_min=theta_min,
+                               rwidth=rwidth,
+                               ncore=ncore,
+                               out=chunk)
+                progress.update(len(chunk), msg=f"Ring Removal: slices {start} to {start + len(chunk)}")
 
         return images
 
@@ -3,10 +3,15 @@
 from __future__ import annotations
 
 import unittest
+from unittest import mock
 from unittest.mock import Mock
 
+import numpy as np
+
 import mantidimaging.test_helpers.unit_test_helper as th
+from mantidimaging.core.data import ImageStack
 from mantidimaging.core.operations.ring_removal import RingRemovalFilter
+from mantidimaging.core.utility.progress_reporting import Progress
 
 
 class RingRemovalTest(unittest.TestCase):
@@ -23,6 +28,33 @@ class RingRemovalTest(unittest.TestCase):
         mocks = [Mock()] + [Mock(value=lambda: 0) for _ in range(7)]
         RingRemovalFilter.execute_wrapper(*mocks)(images)
 
+    @mock.patch("mantidimaging.core.operations.ring_removal.ring_removal.os.cpu_count", return_value=2)
+    @mock.patch("mantidimaging.core.operations.ring_removal.ring_removal.safe_import")
+    def test_processed_in_chunks(self, safe_import: Mock, _):
+        remove_ring = safe_import.return_value.remove_ring
+        remove_ring.side_effect = lambda chunk, out, **kwargs: np.add(chunk, 1, out=out)
+        images = ImageStack(np.zeros((19, 4, 4), dtype=np.float32))
+        progress = Progress()
+
+        RingRemovalFilter.filter_func(images, progress=progress)
+
+        self.assertEqual([8, 8, 3], [len(call.args[0]) for call in remove_ring.call_args_list])
+        self.assertTrue(all(call.kwargs['ncore'] == 2 for call in remove_ring.call_args_list))
+        np.testing.assert_equal(images.data, 1)
+        chunk_steps = [entry.step for entry in progress.progress_history if entry.msg.startswith("Ring Removal")]
+        self.assertEqual([8, 16, 19], chunk_steps)
+
+    @mock.patch("mantidimaging.core.operations.ring_removal.ring_removal.os.cpu_count", return_value=2)
+    @mock.patch("mantidimaging.core.operations.ring_removal.ring_removal.safe_import")
+    def test_cancelled_between_chunks(self, safe_import: Mock, _):
+        images = ImageStack(np.zeros((19, 4, 4), dtype=np.float32))
+        progress = Progress()
+        progress.cancel()
+
+        self.assertRaisesRegex(RuntimeError, "cancelled", RingRemovalFilter.filter_func, images, progress=progress)
+
+        safe_import.return_value.remove_ring.assert_called_once()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from functools import partial
 from logging import getLogger
-from typing import List, Optional, TYPE_CHECKING
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
 
 import numpy as np
 
@@ -20,6 +20,7 @@ from mantidimaging.gui.widgets.dataset_selector import DatasetSelectorWidgetView
 
 if TYPE_CHECKING:
     from mantidimaging.core.data import ImageStack
+    from mantidimaging.core.parallel.shared import ImageKernel
 
 
 def modes() -> List[str]:
@@ -73,22 +74,25 @@ class RoiNormalisationFilter(BaseFilter):
 
         :returns: Filtered data (stack of images)
         """
-        if normalisation_mode not in modes():
-            raise ValueError(f"Unknown normalisation_mode: {normalisation_mode}, should be one of {modes()}")
-
-        if normalisation_mode == "Flat Field" and flat_field is None:
-            raise ValueError('flat_field must provided if using normalisation_mode of "Flat Field"')
-
-        h.check_data_stack(images)
-
-        if not region_of_interest:
-            raise ValueError('region_of_interest must be provided')
+        kernel = _roi_normalisation_kernel(images,
+                                           None,
+                                           region_of_interest=region_of_interest,
+                                           normalisation_mode=normalisation_mode,
+                                           flat_field=flat_field)
 
         progress = Progress.ensure_instance(progress, task_name='ROI Normalisation')
-        _execute(images, region_of_interest, normalisation_mode, flat_field, progress)
+        with progress:
+            progress.update(msg="Normalization by air region")
+            ps.run_image_kernels([kernel], images.shared_array, progress)
         h.check_data_stack(images)
         return images
 
+    @staticmethod
+    def image_kernel(images: ImageStack,
+                     preceding: Optional[ImageKernel] = None,
+                     **filter_kwargs) -> Optional[ImageKernel]:
+        return _roi_normalisation_kernel(images, preceding, **filter_kwargs)
+
     @staticmethod
     def register_gui(form, on_change, view):
         label, roi_field = add_property_to_form("Air Region",
@@ -147,57 +151,83 @@ def _calc_mean(data, air_left=None, air_top=None, air_right=None, air_bottom=Non
     return data[air_top:air_bottom, air_left:air_right].mean()
 
 
-def _divide_by_air(data=None, air_sums=None):
-    data[:] = np.true_divide(data, air_sums)
+def _divide_by_air(image: np.ndarray, index: int, air_means: np.ndarray):
+    np.true_divide(image, air_means[index], out=image)
 
 
-def _execute(images: ImageStack,
-             air_region: SensibleROI,
-             normalisation_mode: str,
-             flat_field: Optional[ImageStack],
-             progress=None):
-    log = getLogger(__name__)
+def _preceding_mean_compute_function(index: int, arrays: List[np.ndarray], params: Dict[str, Any]):
+    # Only the rows of the air region are needed to see the values the earlier operations will give
+    air_region = params['air_region']
+    rows = arrays[0][index, air_region.top:air_region.bottom].copy()
+    params['preceding'](rows, index)
+    arrays[1][index] = rows[:, air_region.left:air_region.right].mean()
+
 
-    with progress:
-        progress.update(msg="Normalization by air region")
-        if isinstance(air_region, list):
-            air_region = SensibleROI.from_list(air_region)
+def _calc_means(images: ImageStack, air_region: SensibleROI, preceding: Optional[ImageKernel] = None) -> np.ndarray:
+    air_means = pu.create_array((images.data.shape[0], ), images.dtype)
+    if preceding is not None:
+        params = {'air_region': air_region, 'preceding': preceding}
+        ps.run_compute_func(_preceding_mean_compute_function, images.data.shape[0], [images.shared_array, air_means],
+                            params)
+        return air_means.array.copy()
 
-        # initialise same number of air sums
-        img_num = images.data.shape[0]
-        air_means = pu.create_array((img_num, ), images.dtype)
+    do_calculate_air_means = ps.create_partial(_calc_mean,
+                                               ps.return_to_second_at_i,
+                                               air_left=air_region.left,
+                                               air_top=air_region.top,
+                                               air_right=air_region.right,
+                                               air_bottom=air_region.bottom)
+    ps.execute(do_calculate_air_means, [images.shared_array, air_means], images.data.shape[0])
+    return air_means.array.copy()
 
-        do_calculate_air_means = ps.create_partial(_calc_mean,
-                                                   ps.return_to_second_at_i,
-                                                   air_left=air_region.left,
-                                                   air_top=air_region.top,
-                                                   air_right=air_region.right,
-                                                   air_bottom=air_region.bottom)
 
-        arrays = [images.shared_array, air_means]
-        ps.execute(do_calculate_air_means, arrays, images.data.shape[0], progress)
+def _roi_normalisation_kernel(images: ImageStack,
+                              preceding: Optional[ImageKernel],
+                              region_of_interest: Optional[SensibleROI] = None,
+                              normalisation_mode: str = DEFAULT_NORMALISATION_MODE,
+                              flat_field: Optional[ImageStack] = None) -> ImageKernel:
+    if normalisation_mode not in modes():
+        raise ValueError(f"Unknown normalisation_mode: {normalisation_mode}, should be one of {modes()}")
+
+    if normalisation_mode == "Flat Field" and flat_field is None:
+        raise ValueError('flat_field must provided if using normalisation_mode of "Flat Field"')
+
+    h.check_data_stack(images)
+
+    if not region_of_interest:
+        raise ValueError('region_of_interest must be provided')
+
+    air_means = _air_means(images, region_of_interest, normalisation_mode, flat_field, preceding)
+    return partial(_divide_by_air, air_means=air_means)
+
+
+def _air_means(images: ImageStack,
+               air_region: SensibleROI,
+               normalisation_mode: str,
+               flat_field: Optional[ImageStack],
+               preceding: Optional[ImageKernel] = None) -> np.ndarray:
+    log = getLogger(__name__)
+
+    if isinstance(air_region, list):
+        air_region = SensibleROI.from_list(air_region)
 
-        if normalisation_mode == 'Stack Average':
-            air_means.array /= air_means.array.mean()
+    air_means = _calc_means(images, air_region, preceding)
 
-        elif normalisation_mode == 'Flat Field' and flat_field is not None:
-            flat_mean = pu.create_array((flat_field.data.shape[0], ), flat_field.dtype)
-            arrays = [flat_field.shared_array, flat_mean]
-            ps.execute(do_calculate_air_means, arrays, flat_field.data.shape[0], progress)
-            air_means.array /= flat_mean.array.mean()
+    if normalisation_mode == 'Stack Average':
+        air_means /= air_means.mean()
 
-        if np.isnan(air_means.array).any():
-            raise ValueError("Air region contains invalid (NaN) pixels")
+    elif normalisation_mode == 'Flat Field' and flat_field is not None:
+        air_means /= _calc_means(flat_field, air_region).mean()
 
-        do_divide = ps.create_partial(_divide_by_air, fwd_function=ps.inplace2)
-        arrays = [images.shared_array, air_means]
-        ps.execute(do_divide, arrays, images.data.shape[0], progress)
+    if np.isnan(air_means).any():
+        raise ValueError("Air region contains invalid (NaN) pixels")
 
-        avg = np.average(air_means.array)
-        max_avg = np.max(air_means.array) / avg
-        min_avg = np.min(air_means.array) / avg
+    avg = np.average(air_means)
+    max_avg = np.max(air_means) / avg
+    min_avg = np.min(air_means) / avg
 
-        log.info(f"Normalization by air region. " f"Average: {avg}, max ratio: {max_avg}, min ratio: {min_avg}.")
+    log.info(f"Normalization by air region. Average: {avg}, max ratio: {max_avg}, min ratio: {min_avg}.")
+    return air_means
 
 
 def enable_correct_fields_only(text, flat_file_widget):
@@ -97,6 +97,26 @@ class ROINormalisationTest(unittest.TestCase):
         self.assertAlmostEqual(air_data_flat.mean(), air_data_after.mean(), places=6)
         self.assertAlmostEqual(air_data_after[0].mean(), air_data_after[1].mean(), places=6)
 
+    def test_image_kernel_sees_preceding_operations(self):
+        air = [3, 3, 6, 8]
+        images = th.generate_images([10, 20, 30], seed=2021)
+        expected = images.copy()
+        expected.data *= np.arange(1, 11, dtype=np.float32)[:, np.newaxis, np.newaxis]
+        RoiNormalisationFilter.filter_func(expected, air, "Stack Average")
+
+        def scale_by_index(image, index):
+            image *= index + 1
+
+        kernel = RoiNormalisationFilter.image_kernel(images,
+                                                     preceding=scale_by_index,
+                                                     region_of_interest=air,
+                                                     normalisation_mode="Stack Average")
+        for idx, image in enumerate(images.data):
+            scale_by_index(image, idx)
+            kernel(image, idx)
+
+        npt.assert_allclose(images.data, expected.data, rtol=1e-5)
+
     def test_execute_wrapper_bad_roi_raises_valueerror(self):
         """
         Test that the partial returned by execute_wrapper can be executed (kwargs are named correctly)
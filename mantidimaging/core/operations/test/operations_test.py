@@ -2,7 +2,7 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 
-from typing import Dict, List, TYPE_CHECKING
+from typing import Dict, List, Type, TYPE_CHECKING
 import unittest
 from unittest import mock
 
@@ -39,7 +39,7 @@ def get_filter_func_args():
 
 
 class OperationsTest(unittest.TestCase):
-    filters: List[BaseFilter]
+    filters: List[Type[BaseFilter]]
     filter_args: Dict
 
     @classmethod
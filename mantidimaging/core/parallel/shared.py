@@ -5,11 +5,17 @@ from __future__ import annotations
 from functools import partial
 from typing import List, Tuple, Union, Callable, Dict, Any, TYPE_CHECKING
 
+import numpy as np
+
+from mantidimaging.core.parallel import manager as pm
 from mantidimaging.core.parallel import utility as pu
 
 if TYPE_CHECKING:
     from numpy import ndarray
 
+# Largest number of sinograms processed by each task of run_sinogram_func
+SINOGRAM_BLOCK_SIZE = 8
+
 
 def inplace3(func, data: Union[List[pu.SharedArray], List[pu.SharedArrayProxy]], i, **kwargs):
     func(data[0].array[i], data[1].array[i], data[2].array, **kwargs)
@@ -106,6 +112,77 @@ def run_compute_func(func: ComputeFuncType,
     pu.run_compute_func_impl(worker_func, num_operations, all_data_in_shared_memory, progress)
 
 
+def run_sinogram_func(func: Callable[..., 'ndarray'],
+                      array: pu.SharedArray,
+                      is_sinograms: bool,
+                      params: Dict[str, Any],
+                      progress=None):
+    """
+    Replace each sinogram of the stack with the result of func(sinogram, **params).
+
+    Each task processes a block of sinograms. For projection ordered data the block is copied into a
+    contiguous buffer and written back in one go, rather than gathering each sinogram across the stack.
+
+    :param func: Function to apply to each 2D sinogram
+    :param array: The stack
+    :param is_sinograms: Whether the stack is in sinogram order
+    :param params: Keyword arguments for func
+    :param progress: Progress instance to use for progress reporting (optional)
+    """
+    num_sinograms = array.array.shape[0 if is_sinograms else 1]
+    # Keep the blocks small enough that there are several for each core to share the work out
+    block_size = max(1, min(SINOGRAM_BLOCK_SIZE, num_sinograms // (4 * pm.cores)))
+    num_blocks = -(-num_sinograms // block_size)
+    block_params = {
+        'func': func,
+        'func_params': params,
+        'block_size': block_size,
+        'num_sinograms': num_sinograms,
+        'is_sinograms': is_sinograms
+    }
+    run_compute_func(_sinogram_block_compute_func, num_blocks, array, block_params, progress)
+
+
+# Applies an operation in place to one image, given the image and its index in the stack
+ImageKernel = Callable[['ndarray', int], None]
+
+
+def apply_image_kernels(kernels: List[ImageKernel], image: 'ndarray', index: int):
+    for kernel in kernels:
+        kernel(image, index)
+
+
+def run_image_kernels(kernels: List[ImageKernel], array: pu.SharedArray, progress=None):
+    """
+    Apply the kernels in order to each image of the stack, finishing with one image before moving on to the
+    next, so that the stack is only swept over once.
+
+    :param kernels: Functions applying an operation in place to an image. They are sent to the worker
+                    processes, so must be picklable, e.g. partials of module level functions.
+    :param array: The stack
+    :param progress: Progress instance to use for progress reporting (optional)
+    """
+    run_compute_func(_image_kernels_compute_func, array.array.shape[0], array, {'kernels': kernels}, progress)
+
+
+def _image_kernels_compute_func(index: int, array: 'ndarray', params: Dict[str, Any]):
+    apply_image_kernels(params['kernels'], array[index], index)
+
+
+def _sinogram_block_compute_func(index: int, array: 'ndarray', params: Dict[str, Any]):
+    func, func_params = params['func'], params['func_params']
+    start = index * params['block_size']
+    block = slice(start, min(start + params['block_size'], params['num_sinograms']))
+    if params['is_sinograms']:
+        for i in range(block.start, block.stop):
+            array[i] = func(array[i], **func_params)
+    else:
+        sinograms = np.ascontiguousarray(np.swapaxes(array[:, block], 0, 1))
+        for sinogram in sinograms:
+            sinogram[:] = func(sinogram, **func_params)
+        array[:, block] = np.swapaxes(sinograms, 0, 1)
+
+
 def _check_shared_mem_and_get_data(
         arrays: List[pu.SharedArray]) -> Tuple[bool, Union[List[pu.SharedArray], List[pu.SharedArrayProxy]]]:
     """
@@ -4,10 +4,28 @@ from __future__ import annotations
 import unittest
 from unittest import mock
 
+import numpy as np
+import numpy.testing as npt
+
 from mantidimaging.core.parallel import shared as ps
+from mantidimaging.core.parallel import utility as pu
 from mantidimaging.core.parallel.utility import SharedArrayProxy
+from mantidimaging.test_helpers.start_qapplication import start_multiprocessing_pool
+
+
+def _cumsum_sinogram(sinogram: np.ndarray, axis: int) -> np.ndarray:
+    return np.cumsum(sinogram, axis=axis)
+
+
+def _add_index(image: np.ndarray, index: int):
+    image += index
 
 
+def _double(image: np.ndarray, index: int):
+    image *= 2
+
+
+@start_multiprocessing_pool
 class SharedTest(unittest.TestCase):
     def test_check_shared_mem_and_get_data_all_shared(self):
         arrays = self._create_array_list(5, True)
@@ -30,6 +48,42 @@ class SharedTest(unittest.TestCase):
         self.assertTrue(len(data) == 5)
         self.assertTrue(isinstance(data[0], mock.Mock))
 
+    def _run_sinogram_func(self, is_sinograms: bool):
+        sinograms = np.random.default_rng(0).random((37, 6, 5)).astype(np.float32)
+        data = sinograms if is_sinograms else np.swapaxes(sinograms, 0, 1)
+        shared = pu.create_array(data.shape, data.dtype)
+        shared.array[:] = data
+
+        ps.run_sinogram_func(_cumsum_sinogram, shared, is_sinograms, {'axis': 0})
+
+        result = shared.array if is_sinograms else np.swapaxes(shared.array, 0, 1)
+        npt.assert_allclose(result, np.cumsum(sinograms, axis=1), rtol=1e-6)
+
+    def test_run_sinogram_func_projections(self):
+        self._run_sinogram_func(is_sinograms=False)
+
+    def test_run_sinogram_func_sinograms(self):
+        self._run_sinogram_func(is_sinograms=True)
+
+    @mock.patch("mantidimaging.core.parallel.shared.run_compute_func")
+    def test_run_sinogram_func_blocks(self, run_compute_func: mock.Mock):
+        shared = pu.create_array((3, 100, 4), np.float32)
+        with mock.patch("mantidimaging.core.parallel.shared.pm.cores", 2):
+            ps.run_sinogram_func(_cumsum_sinogram, shared, False, {'axis': 0})
+
+        _, num_blocks, _, params, _ = run_compute_func.call_args.args
+        self.assertEqual(ps.SINOGRAM_BLOCK_SIZE, params['block_size'])
+        self.assertEqual(13, num_blocks)
+
+    def test_run_image_kernels(self):
+        shared = pu.create_array((12, 3, 4), np.float32)
+        shared.array[:] = 1
+
+        ps.run_image_kernels([_add_index, _double], shared)
+
+        npt.assert_equal(shared.array,
+                         np.broadcast_to((np.arange(12) + 1.0)[:, np.newaxis, np.newaxis] * 2, shared.array.shape))
+
     def _create_array_list(self, num_arrays, has_shared_mem):
         array_list = []
         for _ in range(num_arrays):
@@ -2,6 +2,8 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 
+import os
+
 import numpy as np
 from unittest import mock
 
@@ -10,7 +12,8 @@ import numpy.testing as npt
 
 from mantidimaging.test_helpers import unit_test_helper as th
 from mantidimaging.core.parallel.utility import _create_shared_array, execute_impl, multiprocessing_necessary,\
-    copy_into_shared_memory
+    copy_into_shared_memory, calculate_chunksize, split_into_blocks, _BlockWorker, create_array, \
+    create_memmap_array, open_memmap_array, SharedArray
 
 
 @pytest.mark.parametrize(
@@ -33,14 +36,49 @@ def test_execute_impl_seq():
     mock_progress.update.assert_called_once_with(1, "Test")
 
 
+def _fake_imap(worker, blocks):
+    return [(len(block), 0.001 * len(block)) for block in blocks]
+
+
+@mock.patch('mantidimaging.core.parallel.utility.pm.cores', 2)
 @mock.patch('mantidimaging.core.parallel.utility.pm.pool')
 def test_execute_impl_par(mock_pool):
     mock_partial = mock.Mock()
     mock_progress = mock.Mock()
-    mock_pool.imap.return_value = range(15)
+    mock_pool.imap.side_effect = _fake_imap
     execute_impl(15, mock_partial, True, mock_progress, "Test")
-    mock_pool.imap.assert_called_once()
-    assert mock_progress.update.call_count == 15
+    # one call to measure the cost per item, then one for the remaining blocks
+    assert mock_pool.imap.call_count == 2
+    probe_blocks = mock_pool.imap.call_args_list[0][0][1]
+    assert probe_blocks == [range(0, 1), range(1, 2)]
+    blocks = mock_pool.imap.call_args_list[1][0][1]
+    assert blocks[0].start == 2 and blocks[-1].stop == 15
+    assert sum(call[0][0] for call in mock_progress.update.call_args_list) == 15
+
+
+@pytest.mark.parametrize(
+    'num_operations,cores,item_cost,expected',
+    (
+        [1000, 4, 1.0, 1],  # expensive operations are sent one at a time
+        [1000, 4, 0.01, 5],  # cheap operations are grouped into blocks
+        [1000, 4, 1e-6, 62],  # very cheap operations are limited to MIN_BLOCKS_PER_CORE blocks per core
+        [1000, 4, 0, 62],
+        [3, 8, 1e-6, 1]))
+def test_calculate_chunksize(num_operations, cores, item_cost, expected):
+    assert calculate_chunksize(num_operations, cores, item_cost) == expected
+
+
+def test_split_into_blocks():
+    assert split_into_blocks(2, 9, 3) == [range(2, 5), range(5, 8), range(8, 9)]
+    assert split_into_blocks(0, 0, 3) == []
+
+
+def test_block_worker_runs_every_index():
+    mock_func = mock.Mock()
+    num_done, elapsed = _BlockWorker(mock_func)(range(3, 6))
+    assert num_done == 3
+    assert elapsed >= 0
+    assert mock_func.call_args_list == [mock.call(3), mock.call(4), mock.call(5)]
 
 
 @pytest.mark.parametrize('dtype,expected_dtype', [
@@ -71,6 +109,24 @@ def test_copy_into_shared_memory():
     npt.assert_equal(shared_array.array, array)
 
 
+def test_offset_view_is_not_shared():
+    shared_array = _create_shared_array((5, 5, 5), np.float32)
+
+    shared_array.array = shared_array.array[:3]
+    assert shared_array.has_shared_memory
+
+    shared_array.array = shared_array.array[1:]
+    assert not shared_array.has_shared_memory
+
+
+def test_array_like_without_shared_memory():
+    array_like = mock.Mock(spec=["shape", "dtype"])
+    shared_array = SharedArray(array_like, None)
+
+    assert shared_array.array is array_like
+    assert not shared_array.has_shared_memory
+
+
 def test_looking_up_shared_array_from_proxy():
     shape = (5, 5, 5)
     dtype = np.float32
@@ -91,6 +147,61 @@ def test_looking_up_shared_array_from_proxy():
     assert shared_array._shared_memory.name == proxy._shared_array._shared_memory.name
 
 
+def test_create_memmap_array(tmp_path):
+    shared_array = create_memmap_array((5, 5, 5), np.float32, str(tmp_path))
+    path = shared_array.memmap_path
+
+    assert shared_array.has_shared_memory
+    assert isinstance(shared_array.array, np.memmap)
+    assert os.path.isfile(path)
+
+    del shared_array
+    assert not os.path.exists(path)
+
+
+def test_looking_up_memmap_array_from_proxy(tmp_path):
+    array = th.gen_img_numpy_rand((5, 5, 5))
+    shared_array = create_memmap_array(array.shape, array.dtype, str(tmp_path))
+    shared_array.array[:] = array[:]
+
+    proxy = shared_array.array_proxy
+    npt.assert_equal(array, proxy.array)
+    assert proxy._shared_array.memmap_path == shared_array.memmap_path
+    assert not proxy._shared_array._free_mem_on_del
+
+    # Writes through the proxy are visible in the original array
+    proxy.array[0] = 1
+    npt.assert_equal(shared_array.array[0], 1)
+
+
+def test_open_memmap_array_keeps_file(tmp_path):
+    shared_array = create_memmap_array((3, 4, 5), np.float32, str(tmp_path))
+    shared_array.array[:] = 7
+    shared_array.array.flush()
+    shared_array._free_mem_on_del = False
+    path = shared_array.memmap_path
+    del shared_array
+
+    reopened = open_memmap_array(path)
+    assert reopened.array.shape == (3, 4, 5)
+    npt.assert_equal(reopened.array, 7)
+    del reopened
+    assert os.path.isfile(path)
+
+
+@mock.patch('mantidimaging.core.parallel.utility.enough_memory', return_value=False)
+def test_create_array_spills_to_memmap(_, tmp_path):
+    shared_array = create_array((5, 5, 5), np.float32, scratch_dir=str(tmp_path))
+    assert shared_array.memmap_path is not None
+    assert os.path.dirname(shared_array.memmap_path) == str(tmp_path)
+
+
+@mock.patch('mantidimaging.core.parallel.utility.enough_memory', return_value=False)
+def test_create_array_without_scratch_dir_raises(_):
+    with pytest.raises(RuntimeError):
+        create_array((5, 5, 5), np.float32)
+
+
 if __name__ == "__main__":
     import pytest
 
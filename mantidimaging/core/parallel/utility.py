@@ -2,10 +2,14 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 
+import math
 import os
+import shutil
+import tempfile
+import time
 from logging import getLogger
 from multiprocessing import shared_memory
-from typing import Tuple, TYPE_CHECKING, Optional, Callable
+from typing import List, Tuple, TYPE_CHECKING, Optional, Callable
 
 import numpy as np
 
@@ -21,26 +25,76 @@ if TYPE_CHECKING:
 
 LOG = getLogger(__name__)
 
+# Aim for each block sent to a worker to take at least this long, so that the cost of
+# pickling the task and returning the result is small compared to the work done
+TARGET_BLOCK_SECONDS = 0.05
+# Keep at least this many blocks per core, so that the work stays balanced between
+# the workers and the progress bar still moves
+MIN_BLOCKS_PER_CORE = 4
+
 
 def enough_memory(shape, dtype):
     return full_size_KB(shape=shape, dtype=dtype) < system_free_memory().kb()
 
 
-def create_array(shape: Tuple[int, ...], dtype: 'npt.DTypeLike' = np.float32) -> 'SharedArray':
+def create_array(shape: Tuple[int, ...],
+                 dtype: 'npt.DTypeLike' = np.float32,
+                 scratch_dir: Optional[str] = None) -> 'SharedArray':
     """
     Create an array in shared memory
 
     :param shape: Shape of the array
     :param dtype: Dtype of the array
+    :param scratch_dir: If provided, and there is not enough memory, the array is created
+                        as a memory-mapped file in this directory instead
     :return: The created SharedArray
     """
     if not enough_memory(shape, dtype):
+        if scratch_dir is not None:
+            LOG.info(f"Not enough memory for shape={shape}, dtype={dtype}. Using a memory-mapped file instead")
+            return create_memmap_array(shape, dtype, scratch_dir)
         raise RuntimeError(
             "The machine does not have enough physical memory available to allocate space for this data.")
 
     return _create_shared_array(shape, dtype)
 
 
+def create_memmap_array(shape: Tuple[int, ...],
+                        dtype: 'npt.DTypeLike' = np.float32,
+                        scratch_dir: Optional[str] = None) -> 'SharedArray':
+    """
+    Create an array backed by a memory-mapped file on disk. Worker processes attach to it by path.
+    The file is removed when the SharedArray is deleted.
+
+    :param shape: Shape of the array
+    :param dtype: Dtype of the array
+    :param scratch_dir: Directory to create the file in. Defaults to the system temporary directory
+    :return: The created SharedArray
+    """
+    scratch_dir = scratch_dir if scratch_dir is not None else tempfile.gettempdir()
+    size = full_size_bytes(shape, dtype)
+    if shutil.disk_usage(scratch_dir).free < size:
+        raise RuntimeError(f"There is not enough free disk space in {scratch_dir} to allocate space for this data.")
+
+    path = os.path.join(scratch_dir, f"{pm.generate_mi_shared_mem_name()}.npy")
+    LOG.info(f'Requested memory-mapped array with shape={shape}, size={size}, dtype={dtype}, path={path}')
+    array = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape)
+    return SharedArray(array, None, memmap_path=path)
+
+
+def open_memmap_array(path: str, free_mem_on_del: bool = False) -> 'SharedArray':
+    """
+    Open an existing memory-mapped array file, e.g. one kept from a previous session.
+    The data is not read until it is accessed.
+
+    :param path: Path of the .npy file
+    :param free_mem_on_del: Remove the file when the SharedArray is deleted
+    :return: The opened SharedArray
+    """
+    array = np.lib.format.open_memmap(path, mode='r+')
+    return SharedArray(array, None, free_mem_on_del=free_mem_on_del, memmap_path=path)
+
+
 def _create_shared_array(shape: Tuple[int, ...], dtype: 'npt.DTypeLike' = np.float32) -> 'SharedArray':
     size = full_size_bytes(shape, dtype)
 
@@ -63,24 +117,74 @@ def copy_into_shared_memory(array: np.ndarray) -> 'SharedArray':
     return shared_array
 
 
-def calculate_chunksize(cores):
+def calculate_chunksize(num_operations: int, cores: int, item_cost: float) -> int:
     """
-    TODO possible proper calculation of chunksize, although best performance has been with 1
-    From performance tests, the chunksize doesn't seem to make much of a
-    difference, but having larger chunks usually led to slower performance:
-
-    Shape: (50,512,512)
-    1 chunk 3.06s
-    2 chunks 3.05s
-    3 chunks 3.07s
-    4 chunks 3.06s
-    5 chunks 3.16s
-    6 chunks 3.06s
-    7 chunks 3.058s
-    8 chunks 3.25s
-    9 chunks 3.45s
+    Calculate how many consecutive indices should be given to a worker as a single task.
+
+    Cheap operations on small images are dominated by the inter-process communication overhead
+    when each index is sent separately, so the blocks are sized so that each one takes roughly
+    TARGET_BLOCK_SECONDS. Expensive operations (or large images) still get a chunk size of 1.
+    The chunk size is capped so that every core gets at least MIN_BLOCKS_PER_CORE blocks.
+
+    :param num_operations: The number of indices to be split into blocks
+    :param cores: The number of worker processes
+    :param item_cost: The measured time, in seconds, to process a single index
+    :return: The number of indices per block
     """
-    return 1
+    max_chunksize = max(1, num_operations // (max(1, cores) * MIN_BLOCKS_PER_CORE))
+    if item_cost <= 0:
+        return max_chunksize
+    chunksize = math.ceil(TARGET_BLOCK_SECONDS / item_cost)
+    return max(1, min(chunksize, max_chunksize))
+
+
+def split_into_blocks(start: int, stop: int, chunksize: int) -> List[range]:
+    """
+    Split the indices [start, stop) into contiguous blocks of at most chunksize indices.
+    """
+    return [range(i, min(i + chunksize, stop)) for i in range(start, stop, chunksize)]
+
+
+class _BlockWorker:
+    """
+    Runs a single-index function over a contiguous block of indices in a worker process.
+    Returns the number of indices processed and the time it took.
+    """
+    def __init__(self, func: Callable[[int], None]):
+        self.func = func
+
+    def __call__(self, block: range) -> Tuple[int, float]:
+        start = time.perf_counter()
+        for index in block:
+            self.func(index)
+        return len(block), time.perf_counter() - start
+
+
+def _update_progress(progress: Progress, num_done: int, msg: str):
+    # One step per operation, as when operations were sent to the pool individually
+    for _ in range(num_done):
+        progress.update(1, msg)
+
+
+def _run_in_blocks(func: Callable[[int], None], num_operations: int, progress: Progress, msg: str):
+    # Only called once the callers have checked that the pool has been started
+    assert pm.pool is not None
+    worker = _BlockWorker(func)
+
+    # Give each worker a single index first, to measure how expensive one operation is
+    num_probes = min(pm.cores, num_operations)
+    probe_time = 0.0
+    for num_done, elapsed in pm.pool.imap(worker, split_into_blocks(0, num_probes, 1)):
+        probe_time += elapsed
+        _update_progress(progress, num_done, msg)
+
+    chunksize = calculate_chunksize(num_operations - num_probes, pm.cores, probe_time / num_probes)
+    LOG.info(f"Running async on {pm.cores} cores with blocks of {chunksize}")
+    # Using imap here seems to be the best choice:
+    # - imap_unordered gives the images back in random order
+    # - map and map_async do not improve speed performance
+    for num_done, _ in pm.pool.imap(worker, split_into_blocks(num_probes, num_operations, chunksize)):
+        _update_progress(progress, num_done, msg)
 
 
 def multiprocessing_necessary(shape: int, is_shared_data: bool) -> bool:
@@ -107,14 +211,7 @@ def execute_impl(img_num: int, partial_func: partial, is_shared_data: bool, prog
     progress = Progress.ensure_instance(progress, num_steps=img_num, task_name=task_name)
     indices_list = range(img_num)
     if multiprocessing_necessary(img_num, is_shared_data) and pm.pool:
-        LOG.info(f"Running async on {pm.cores} cores")
-        # Using _ in the for _ enumerate is slightly faster, because the tuple from enumerate isn't unpacked,
-        # and thus some time is saved
-        # Using imap here seems to be the best choice:
-        # - imap_unordered gives the images back in random order
-        # - map and map_async do not improve speed performance
-        for _ in pm.pool.imap(partial_func, indices_list, chunksize=calculate_chunksize(pm.cores)):
-            progress.update(1, msg)
+        _run_in_blocks(partial_func, img_num, progress, msg)
     else:
         LOG.info("Running synchronously on 1 core")
         for ind in indices_list:
@@ -132,9 +229,7 @@ def run_compute_func_impl(worker_func: Callable[[int], None],
     progress = Progress.ensure_instance(progress, num_steps=num_operations, task_name=task_name)
     indices_list = range(num_operations)
     if multiprocessing_necessary(num_operations, is_shared_data) and pm.pool:
-        LOG.info(f"Running async on {pm.cores} cores")
-        for _ in pm.pool.imap(worker_func, indices_list, chunksize=calculate_chunksize(pm.cores)):
-            progress.update(1, msg)
+        _run_in_blocks(worker_func, num_operations, progress, msg)
     else:
         LOG.info("Running synchronously on 1 core")
         for ind in indices_list:
@@ -144,13 +239,23 @@ def run_compute_func_impl(worker_func: Callable[[int], None],
 
 
 class SharedArray:
-    def __init__(self, array: np.ndarray, shared_memory: Optional[SharedMemory], free_mem_on_del: bool = True):
+    def __init__(self,
+                 array: np.ndarray,
+                 shared_memory: Optional[SharedMemory],
+                 free_mem_on_del: bool = True,
+                 memmap_path: Optional[str] = None):
         self.array = array
         self._shared_memory = shared_memory
         self._free_mem_on_del = free_mem_on_del
+        self._memmap_path = memmap_path
+        # Workers attach to the start of the shared buffer, so remember where that is. Arrays without shared
+        # backing can be any array-like (e.g. a h5py dataset) and never need it.
+        self._buffer_address: Optional[int] = None
+        if shared_memory is not None or memmap_path is not None:
+            self._buffer_address = array.__array_interface__['data'][0]
 
     def __del__(self):
-        if self.has_shared_memory:
+        if self._shared_memory is not None:
             self._shared_memory.close()
             if self._free_mem_on_del:
                 try:
@@ -158,27 +263,54 @@ class SharedArray:
                 except FileNotFoundError:
                     # Do nothing, memory has already been freed
                     pass
+        elif self._memmap_path is not None and self._free_mem_on_del:
+            try:
+                os.remove(self._memmap_path)
+            except FileNotFoundError:
+                pass
 
     @property
     def has_shared_memory(self) -> bool:
-        return self._shared_memory is not None
+        """
+        Whether worker processes can attach to the array, either in shared memory or a memory-mapped file.
+        This is not the case if the array has been replaced by a view that does not start at the
+        beginning of the buffer, e.g. after cropping with images.data = images.data[3:].
+        """
+        if self._shared_memory is None and self._memmap_path is None:
+            return False
+        return self.array.__array_interface__['data'][0] == self._buffer_address and self.array.flags.c_contiguous
+
+    @property
+    def memmap_path(self) -> Optional[str]:
+        return self._memmap_path
 
     @property
     def array_proxy(self) -> 'SharedArrayProxy':
         mem_name = self._shared_memory.name if self._shared_memory else None
-        return SharedArrayProxy(mem_name=mem_name, shape=self.array.shape, dtype=self.array.dtype)
+        return SharedArrayProxy(mem_name=mem_name,
+                                shape=self.array.shape,
+                                dtype=self.array.dtype,
+                                memmap_path=self._memmap_path)
 
 
 class SharedArrayProxy:
-    def __init__(self, mem_name: Optional[str], shape: Tuple[int, ...], dtype: 'npt.DTypeLike'):
+    def __init__(self,
+                 mem_name: Optional[str],
+                 shape: Tuple[int, ...],
+                 dtype: 'npt.DTypeLike',
+                 memmap_path: Optional[str] = None):
         self._mem_name = mem_name
         self._shape = shape
         self._dtype = dtype
+        self._memmap_path = memmap_path
         self._shared_array: Optional['SharedArray'] = None
 
     @property
     def array(self) -> np.ndarray:
         if self._shared_array is None:
-            mem = shared_memory.SharedMemory(name=self._mem_name)
-            self._shared_array = _read_array_from_shared_memory(self._shape, self._dtype, mem, False)
+            if self._memmap_path is not None:
+                self._shared_array = open_memmap_array(self._memmap_path)
+            else:
+                mem = shared_memory.SharedMemory(name=self._mem_name)
+                self._shared_array = _read_array_from_shared_memory(self._shape, self._dtype, mem, False)
         return self._shared_array.array
@@ -2,74 +2,202 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 
-from contextlib import contextmanager
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from logging import getLogger
 from threading import Lock
-from typing import Union, List, Optional, Tuple, Generator
+from typing import Union, List, Optional
 
 import astra
 import numpy as np
 from scipy.optimize import minimize
 
 from mantidimaging.core.data import ImageStack
-from mantidimaging.core.reconstruct.base_recon import BaseRecon
+from mantidimaging.core.reconstruct.base_recon import BaseRecon, bin_sinogram, cor_search_binning, log_cor_search_level
 from mantidimaging.core.utility.cuda_check import CudaChecker
 from mantidimaging.core.utility.data_containers import ScalarCoR, ProjectionAngles, ReconstructionParameters
+from mantidimaging.core.utility.memory_usage import system_free_memory
 from mantidimaging.core.utility.progress_reporting import Progress
+from mantidimaging.core.utility.size_calculator import full_size_KB
 
 LOG = getLogger(__name__)
 astra_mutex = Lock()
 
+# Most sinograms prepared at a time for a volume reconstruction
+RECON_SLAB_SIZE = 16
+# Fraction of the free memory the prepared sinograms can use
+RECON_BUFFER_MEMORY_FRACTION = 0.1
+# Number of geometries kept by vec_geom_init2d
+VEC_GEOM_CACHE_SIZE = 128
+
 
 # Full credit for following code to Daniil Kazantzev
 # Source:
 # https://github.com/dkazanc/ToMoBAR/blob/5990aaa264e2f08bd9b0069c8847e5021fbf2ee2/src/Python/tomobar/supp/astraOP.py#L20-L70
-def rotation_matrix2d(theta: float):
-    return np.array([[np.cos(theta), -np.sin(theta)], [np.sin(theta), np.cos(theta)]])
+def vec_geom_init2d(angles_rad: ProjectionAngles, detector_spacing_x: float, center_rot_offset: Union[float]):
+    """
+    Parallel beam vector geometry, with the detector centre offset by center_rot_offset.
+    The vectors are cached for the most recently used angles and offsets, as they are rebuilt for every
+    preview and every step of the CoR search. The returned array is read only.
+    """
+    angles_value = np.ascontiguousarray(angles_rad.value, dtype=np.float64)
+    return _vec_geom_init2d(angles_value.tobytes(), float(detector_spacing_x), float(center_rot_offset))
 
 
-def vec_geom_init2d(angles_rad: ProjectionAngles, detector_spacing_x: float, center_rot_offset: Union[float]):
-    angles_value = angles_rad.value
-    s0 = [0.0, -1.0]  # source
-    u0 = [detector_spacing_x, 0.0]  # detector coordinates
-    vectors = np.zeros([angles_value.size, 6])
-    for i, theta in enumerate(angles_value):
-        d0 = [center_rot_offset, 0.0]  # detector
-        vectors[i, 0:2] = np.dot(rotation_matrix2d(theta), s0)[:]  # ray position
-        vectors[i, 2:4] = np.dot(rotation_matrix2d(theta), d0)[:]  # center of detector position
-        vectors[i, 4:6] = np.dot(rotation_matrix2d(theta), u0)[:]  # detector pixel (0,0) to (0,1).
+@lru_cache(maxsize=VEC_GEOM_CACHE_SIZE)
+def _vec_geom_init2d(angles_bytes: bytes, detector_spacing_x: float, center_rot_offset: float) -> np.ndarray:
+    angles_value = np.frombuffer(angles_bytes, dtype=np.float64)
+    cos = np.cos(angles_value)
+    sin = np.sin(angles_value)
+    vectors = np.empty([angles_value.size, 6])
+    # each of the vectors at 0 degrees, rotated by the projection angle
+    vectors[:, 0] = sin  # ray position, from source [0.0, -1.0]
+    vectors[:, 1] = -cos
+    vectors[:, 2] = cos * center_rot_offset  # center of detector position, from [center_rot_offset, 0.0]
+    vectors[:, 3] = sin * center_rot_offset
+    vectors[:, 4] = cos * detector_spacing_x  # detector pixel (0,0) to (0,1), from [detector_spacing_x, 0.0]
+    vectors[:, 5] = sin * detector_spacing_x
+    vectors.setflags(write=False)
     return vectors
 
 
-@contextmanager
-def _managed_recon(sino: np.ndarray, cfg, proj_geom, vol_geom) -> Generator[Tuple[int, int], None, None]:
-    proj_id = None
-    sino_id = None
-    rec_id = None
-    alg_id = None
-    try:
-        proj_type = 'cuda' if CudaChecker().cuda_is_present() else 'line'
-        LOG.debug("Using projection type {}".format(proj_type))
-
-        proj_id = astra.create_projector(proj_type, proj_geom, vol_geom)
-        sino_id = astra.data2d.create('-sino', proj_geom, sino)
-        rec_id = astra.data2d.create('-vol', vol_geom)
-
-        cfg['ReconstructionDataId'] = rec_id
-        cfg['ProjectionDataId'] = sino_id
-        cfg['ProjectorId'] = proj_id
-
-        alg_id = astra.algorithm.create(cfg)
-        yield alg_id, rec_id
-    finally:
-        if alg_id:
-            astra.algorithm.delete(alg_id)
-        if proj_id:
-            astra.projector.delete(proj_id)
-        if sino_id:
-            astra.data2d.delete(sino_id)
-        if rec_id:
-            astra.data2d.delete(rec_id)
+class _SliceReconstructor:
+    """
+    Reconstructs slices one after another. The ASTRA sinogram and volume data are kept between slices, and the
+    projector and algorithm are kept while the CoR stays the same. ASTRA's object managers are not thread safe,
+    so the methods must be called while holding astra_mutex.
+    """
+    def __init__(self, image_width: int, proj_angles: ProjectionAngles, recon_params: ReconstructionParameters):
+        self.image_width = image_width
+        self.proj_angles = proj_angles
+        self.recon_params = recon_params
+        self.proj_type = 'cuda' if CudaChecker().cuda_is_present() else 'line'
+        self.vol_geom = astra.create_vol_geom((image_width, image_width))
+        self.cor: Optional[float] = None
+        self.sino_id: Optional[int] = None
+        self.rec_id: Optional[int] = None
+        self.proj_id: Optional[int] = None
+        self.alg_id: Optional[int] = None
+
+    def _set_cor(self, cor: float):
+        vectors = vec_geom_init2d(self.proj_angles, 1.0, ScalarCoR(cor).to_vec(self.image_width).value)
+        proj_geom = astra.create_proj_geom('parallel_vec', self.image_width, vectors)
+        if self.sino_id is None:
+            self.sino_id = astra.data2d.create('-sino', proj_geom)
+            self.rec_id = astra.data2d.create('-vol', self.vol_geom)
+        else:
+            self._delete_algorithm()
+            astra.data2d.change_geometry(self.sino_id, proj_geom)
+
+        self.proj_id = astra.create_projector(self.proj_type, proj_geom, self.vol_geom)
+        cfg = astra.astra_dict(self.recon_params.algorithm)
+        cfg['FilterType'] = self.recon_params.filter_name
+        cfg['ReconstructionDataId'] = self.rec_id
+        cfg['ProjectionDataId'] = self.sino_id
+        cfg['ProjectorId'] = self.proj_id
+        self.alg_id = astra.algorithm.create(cfg)
+        self.cor = cor
+
+    def reconstruct(self, sino: np.ndarray, cor: float) -> np.ndarray:
+        """
+        :param sino: The prepared sinogram
+        :param cor: The CoR to reconstruct with
+        :return: The reconstructed slice, this is a view of ASTRA's volume that is overwritten by the next slice
+        """
+        if cor != self.cor:
+            self._set_cor(cor)
+        astra.data2d.store(self.sino_id, sino)
+        # iterative algorithms start from the current volume
+        astra.data2d.store(self.rec_id, 0)
+        astra.algorithm.run(self.alg_id, iterations=self.recon_params.num_iter)
+        return astra.data2d.get_shared(self.rec_id)
+
+    def _delete_algorithm(self):
+        if self.alg_id is not None:
+            astra.algorithm.delete(self.alg_id)
+        if self.proj_id is not None:
+            astra.projector.delete(self.proj_id)
+        self.alg_id = self.proj_id = None
+
+    def close(self):
+        self._delete_algorithm()
+        if self.sino_id is not None:
+            astra.data2d.delete(self.sino_id)
+            astra.data2d.delete(self.rec_id)
+        self.sino_id = self.rec_id = None
+        self.cor = None
+
+
+class _CorSearch:
+    """
+    Reconstructs one sinogram at different CoRs, for the CoR minimisation. The sinogram is only prepared once,
+    and the ASTRA sinogram and volume data are kept between evaluations.
+    """
+    def __init__(self, sino: np.ndarray, proj_angles: ProjectionAngles, recon_params: ReconstructionParameters):
+        self.sino = BaseRecon.prepare_sinogram(sino, recon_params)
+        self.reconstructor = _SliceReconstructor(self.sino.shape[1], proj_angles, recon_params)
+        self.evaluations = 0
+
+    def negative_sumsq(self, cor: Union[float, np.ndarray]) -> float:
+        """
+        Larger squared sum -> bigger deviance from the mean, i.e. larger distance between noise and data
+        """
+        # minimize passes the CoR as a 1 element array
+        cor = float(np.ravel(cor)[0])
+        self.evaluations += 1
+        with astra_mutex:
+            recon = self.reconstructor.reconstruct(self.sino, cor)
+            return -float(np.sum(np.square(recon, dtype=np.float64)))
+
+    def minimise(self, start_cor: float, window: Optional[float] = None, tol: float = 0.1) -> float:
+        """
+        :param start_cor: CoR to start the search from
+        :param window: Size of the initial step of the search, if the CoR is already known to be close to the start.
+                       By default the first step is 5% of the start CoR.
+        :param tol: Tolerance for the termination of the search, in pixels
+        """
+        initial_simplex = [[start_cor], [start_cor + window]] if window is not None else None
+        try:
+            result = minimize(self.negative_sumsq,
+                              start_cor,
+                              method='nelder-mead',
+                              tol=tol,
+                              options={'initial_simplex': initial_simplex})
+            return float(result.x[0])
+        finally:
+            with astra_mutex:
+                self.reconstructor.close()
+
+
+def _find_cor_coarse_to_fine(sino: np.ndarray, slice_idx: int, proj_angles: ProjectionAngles, start_cor: float,
+                             recon_params: ReconstructionParameters) -> float:
+    """
+    Search for the CoR on a binned sinogram first, then refine the result on less binned sinograms. The binned
+    searches only need to get within half a binned pixel, as the next search refines the result, so each
+    refinement starts with a step of that size.
+    """
+    cor = start_cor
+    window: Optional[float] = None
+    for factor in cor_search_binning(sino.shape[1], sino.shape[0]):
+        start = time.perf_counter()
+        search = _CorSearch(*bin_sinogram(sino, proj_angles, factor), recon_params)
+        binned_window = window / factor if window is not None else None
+        cor = search.minimise(cor / factor, binned_window, tol=0.1 if factor == 1 else 0.5) * factor
+        log_cor_search_level(slice_idx, factor, cor, time.perf_counter() - start, search.evaluations)
+        window = factor / 2
+    return cor
+
+
+def _recon_slab_size(images: ImageStack) -> int:
+    """
+    The number of sinograms to prepare at a time, up to RECON_SLAB_SIZE, so that the two slabs of prepared
+    sinograms fit in RECON_BUFFER_MEMORY_FRACTION of the free memory.
+    """
+    sino_kb = full_size_KB((images.num_projections, images.width), np.result_type(images.dtype, np.float32))
+    fits_in_memory = int(system_free_memory().kb() * RECON_BUFFER_MEMORY_FRACTION // (2 * sino_kb))
+    return max(1, min(RECON_SLAB_SIZE, images.height, fits_in_memory))
 
 
 class AstraRecon(BaseRecon):
@@ -89,16 +217,33 @@ class AstraRecon(BaseRecon):
 
         Larger squared sum -> bigger deviance from the mean, i.e. larger distance between noise and data
         """
-
         proj_angles = images.projection_angles(recon_params.max_projection_angle)
+        return _find_cor_coarse_to_fine(images.sino(slice_idx), slice_idx, proj_angles, start_cor, recon_params)
 
-        def get_sumsq(image: np.ndarray) -> float:
-            return np.sum(image**2)
+    @classmethod
+    def find_cors(cls,
+                  images: ImageStack,
+                  slice_indices: List[int],
+                  start_cors: List[float],
+                  recon_params: ReconstructionParameters,
+                  progress: Optional[Progress] = None) -> List[float]:
+        """
+        Find the best CoR for each slice, running the minimisation for the slices concurrently. The
+        reconstructions themselves take turns on the GPU, but the steps of the other searches carry on
+        while one slice is being reconstructed.
+        """
+        proj_angles = images.projection_angles(recon_params.max_projection_angle)
 
-        def minimizer_function(cor: float):
-            return -get_sumsq(AstraRecon.single_sino(images.sino(slice_idx), ScalarCoR(cor), proj_angles, recon_params))
+        def search(slice_idx: int, start_cor: float) -> float:
+            cor = _find_cor_coarse_to_fine(images.sino(slice_idx), slice_idx, proj_angles, start_cor, recon_params)
+            if progress:
+                progress.update(msg=f"Calculating COR for slice {slice_idx}")
+            return cor
 
-        return minimize(minimizer_function, start_cor, method='nelder-mead', tol=0.1).x[0]
+        if not slice_indices:
+            return []
+        with ThreadPoolExecutor(max_workers=min(len(slice_indices), os.cpu_count() or 1)) as executor:
+            return list(executor.map(search, slice_indices, start_cors))
 
     @staticmethod
     def single_sino(sino: np.ndarray,
@@ -114,15 +259,11 @@ class AstraRecon(BaseRecon):
         if astra_mutex.locked():
             LOG.warning("Astra recon already in progress. Waiting")
         with astra_mutex:
-            vectors = vec_geom_init2d(proj_angles, 1.0, cor.to_vec(image_width).value)
-            vol_geom = astra.create_vol_geom((image_width, image_width))
-            proj_geom = astra.create_proj_geom('parallel_vec', image_width, vectors)
-            cfg = astra.astra_dict(recon_params.algorithm)
-            cfg['FilterType'] = recon_params.filter_name
-
-            with _managed_recon(sino, cfg, proj_geom, vol_geom) as (alg_id, rec_id):
-                astra.algorithm.run(alg_id, iterations=recon_params.num_iter)
-                return astra.data2d.get(rec_id)
+            reconstructor = _SliceReconstructor(image_width, proj_angles, recon_params)
+            try:
+                return reconstructor.reconstruct(sino, cor.value).copy()
+            finally:
+                reconstructor.close()
 
     @staticmethod
     def full(images: ImageStack,
@@ -135,9 +276,41 @@ class AstraRecon(BaseRecon):
         output_images.record_operation('AstraRecon.full', 'Volume Reconstruction', **recon_params.to_dict())
 
         proj_angles = images.projection_angles(recon_params.max_projection_angle)
-        for i in range(images.height):
-            output_images.data[i] = AstraRecon.single_sino(images.sino(i), cors[i], proj_angles, recon_params)
-            progress.update(1, "Reconstructed slice")
+        reconstructor = _SliceReconstructor(images.width, proj_angles, recon_params)
+        slab_size = _recon_slab_size(images)
+        # One slab is prepared while the previous one is reconstructed
+        buffers = [
+            np.empty((slab_size, images.num_projections, images.width), np.result_type(images.dtype, np.float32))
+            for _ in range(2)
+        ]
+
+        def prepare_slab(slab: range, buffer: np.ndarray) -> np.ndarray:
+            return BaseRecon.prepare_sinogram(images.sinograms[slab.start:slab.stop],
+                                              recon_params,
+                                              out=buffer[:len(slab)])
+
+        slabs = [range(start, min(start + slab_size, images.height)) for start in range(0, images.height, slab_size)]
+        if astra_mutex.locked():
+            LOG.warning("Astra recon already in progress. Waiting")
+        try:
+            # ASTRA's object managers are not thread safe, so all the ASTRA calls are made from this thread while
+            # holding the mutex. Only the preparation of the sinograms runs alongside them. This also applies
+            # without CUDA: running the algorithm looks it up in the same managers, so reconstructing slices on
+            # several cores at once would race with the creation and deletion of the other workers' objects.
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                prepared = executor.submit(prepare_slab, slabs[0], buffers[0])
+                for slab_idx, slab in enumerate(slabs):
+                    sinos = prepared.result()
+                    if slab_idx + 1 < len(slabs):
+                        prepared = executor.submit(prepare_slab, slabs[slab_idx + 1], buffers[(slab_idx + 1) % 2])
+                    # Release the mutex between slabs, so that previews can still be reconstructed
+                    with astra_mutex:
+                        for i, sino in zip(slab, sinos):
+                            output_images.data[i] = reconstructor.reconstruct(np.ascontiguousarray(sino), cors[i].value)
+                    progress.update(len(slab), "Reconstructed slices")
+        finally:
+            with astra_mutex:
+                reconstructor.close()
 
         return output_images
 
@@ -2,32 +2,130 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 
-from typing import List, Optional, TYPE_CHECKING
+import os
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger
+from typing import List, Optional, Tuple, TYPE_CHECKING
 
 import numpy as np
-from numpy.polynomial import Polynomial
+
+from mantidimaging.core.utility.data_containers import ProjectionAngles
 
 if TYPE_CHECKING:
     from mantidimaging.core.data import ImageStack
-    from mantidimaging.core.utility.data_containers import ScalarCoR, ProjectionAngles, ReconstructionParameters
+    from mantidimaging.core.utility.data_containers import ScalarCoR, ReconstructionParameters
     from mantidimaging.core.utility.progress_reporting import Progress
 
+LOG = getLogger(__name__)
+
+# Binning factors used for the coarse CoR searches, before refining at full resolution
+COR_SEARCH_BINNING = [4, 2]
+# Binning that would leave fewer detector pixels or projections than this is skipped
+COR_SEARCH_MIN_BINNED_SIZE = 64
+
+# Number of images along the first axis that are prepared for reconstruction at a time
+PREPARE_CHUNK_SIZE = 8
+# Data with fewer elements than this is prepared on a single thread
+PARALLEL_PREPARE_MIN_SIZE = 2**22
+
+
+def cor_search_binning(width: int, num_projections: int) -> List[int]:
+    """
+    The binning factors to search for the CoR with, coarsest first and ending with 1 for full resolution.
+    """
+    factors = [
+        factor for factor in COR_SEARCH_BINNING
+        if width // factor >= COR_SEARCH_MIN_BINNED_SIZE and num_projections // factor >= COR_SEARCH_MIN_BINNED_SIZE
+    ]
+    return factors + [1]
+
+
+def bin_sinogram(sino: np.ndarray, proj_angles: ProjectionAngles, factor: int) -> Tuple[np.ndarray, ProjectionAngles]:
+    """
+    Bin a sinogram for a coarse CoR search, by averaging groups of detector pixels and keeping every factor-th
+    projection. The sinogram can have leading dimensions, the last two are (projections, detector).
+    Detector pixels that don't fill a whole bin are dropped from the right hand side, so a CoR measured from
+    the left edge of the detector is divided by the factor in the binned sinogram.
+    """
+    if factor == 1:
+        return sino, proj_angles
+    width = sino.shape[-1] // factor * factor
+    sino = sino[..., ::factor, :width]
+    binned = sino.reshape(sino.shape[:-1] + (width // factor, factor)).mean(axis=-1)
+    return binned, ProjectionAngles(proj_angles.value[::factor])
+
+
+def _prepare_chunk(data: np.ndarray, out: np.ndarray, beam_hardening_coefs: Optional[List[float]]):
+    np.log(data, out=out)
+    np.negative(out, out=out)
+    if beam_hardening_coefs is not None:
+        # Evaluate x + a0 x^2 + a1 x^3 + a2 x^4 + a3 x^5 by Horner's method, with one temporary array for the chunk
+        a0, a1, a2, a3 = beam_hardening_coefs
+        acc = np.multiply(out, a3)
+        for coef in (a2, a1, a0):
+            acc += coef
+            acc *= out
+        acc += 1
+        out *= acc
+
+
+def log_cor_search_level(slice_idx: int, factor: int, cor: float, seconds: float, evaluations: Optional[int] = None):
+    evaluations_msg = f"{evaluations} evaluations in " if evaluations is not None else ""
+    LOG.info(f"CoR search for slice {slice_idx} at binning {factor}: {cor:.2f} after {evaluations_msg}{seconds:.3f}s")
+
 
 class BaseRecon:
     @staticmethod
     def find_cor(images: ImageStack, slice_idx: int, start_cor: float, recon_params: ReconstructionParameters) -> float:
         raise NotImplementedError("Base class call")
 
+    @classmethod
+    def find_cors(cls,
+                  images: ImageStack,
+                  slice_indices: List[int],
+                  start_cors: List[float],
+                  recon_params: ReconstructionParameters,
+                  progress: Optional[Progress] = None) -> List[float]:
+        """
+        Find the CoR for each of the slices, starting the search for each slice from its start_cor.
+        Reconstructors that can search several slices at once override this, by default each slice is
+        searched in turn with find_cor.
+        """
+        cors = []
+        for slice_idx, start_cor in zip(slice_indices, start_cors):
+            cors.append(cls.find_cor(images, slice_idx, start_cor, recon_params))
+            if progress:
+                progress.update(msg=f"Calculating COR for slice {slice_idx}")
+        return cors
+
     @staticmethod
-    def prepare_sinogram(data: np.ndarray, recon_params: ReconstructionParameters):
-        if recon_params.beam_hardening_coefs is not None:
-            a0, a1, a2, a3 = recon_params.beam_hardening_coefs
-            bhc_poly = Polynomial([0, 1, a0, a1, a2, a3])
-            logged_data = BaseRecon.negative_log(data)
-            corrected_data = bhc_poly(logged_data)
-            return corrected_data
+    def prepare_sinogram(data: np.ndarray,
+                         recon_params: ReconstructionParameters,
+                         out: Optional[np.ndarray] = None,
+                         parallel: bool = True) -> np.ndarray:
+        """
+        Convert the transmission data to absorption with -log, and apply the beam hardening correction if set.
+
+        :param data: The data to prepare, sinograms or projections
+        :param recon_params: Reconstruction parameters, providing the beam hardening coefficients
+        :param out: Array to write the result into, which can be data itself. A new array is allocated if not given
+        :param parallel: Prepare chunks of large data at the same time, on several threads
+        :return: The prepared data
+        """
+        if out is None:
+            out = np.empty(data.shape, dtype=np.result_type(data.dtype, np.float32))
+        # Narrowed once here, as the type of out is not narrowed inside the lambda
+        prepared: np.ndarray = out
+        chunks = [slice(start, start + PREPARE_CHUNK_SIZE) for start in range(0, len(data), PREPARE_CHUNK_SIZE)]
+        coefs = recon_params.beam_hardening_coefs
+        if parallel and len(chunks) > 1 and data.size >= PARALLEL_PREPARE_MIN_SIZE:
+            # numpy releases the GIL in the ufuncs, so the chunks are processed at the same time
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                list(executor.map(lambda chunk: _prepare_chunk(data[chunk], prepared[chunk], coefs), chunks))
         else:
-            return BaseRecon.negative_log(data)
+            for chunk in chunks:
+                _prepare_chunk(data[chunk], prepared[chunk], coefs)
+        return prepared
 
     @staticmethod
     def negative_log(data: np.ndarray) -> np.ndarray:
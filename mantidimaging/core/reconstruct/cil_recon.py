@@ -3,10 +3,11 @@
 from __future__ import annotations
 
 import time
+from dataclasses import dataclass
 from logging import getLogger, DEBUG
 from math import sqrt
 from threading import Lock
-from typing import List, Optional, TYPE_CHECKING
+from typing import List, NamedTuple, Optional, Tuple, TYPE_CHECKING
 
 import numpy as np
 
@@ -30,6 +31,87 @@ LOG = getLogger(__name__)
 tomopy = safe_import('tomopy')
 cil_mutex = Lock()
 
+# The largest change in COR, in pixels, for which the previous single slice solution is used as the initial guess
+WARM_START_MAX_COR_CHANGE = 5.0
+# Single slice reconstructions kept to warm start from. This covers the preview slice and the slices either side
+# of it that the reconstruction window prefetches, so that prefetching does not push out the preview's run.
+WARM_START_MAX_SLICES = 5
+
+
+@dataclass
+class _WarmStart:
+    """
+    A single slice reconstruction, that the next one of the same sinogram can carry on from.
+    """
+    sino: np.ndarray
+    proj_angles: np.ndarray
+    cor: float
+    regularisation: Tuple[float, bool]
+    pdhg: PDHG
+    iterations: int
+    normK: float
+
+
+# The most recent single slice reconstructions of different sinograms, oldest first. Each keeps its PDHG, with
+# its operators and data, alive until it is pushed out by newer slices.
+_single_sino_runs: List[_WarmStart] = []
+
+# Rows reconstructed either side of a slab of the volume, so that the regularisation is not cut off at its edges
+SLAB_OVERLAP = 8
+
+
+class Slab(NamedTuple):
+    """
+    The rows of the volume that are reconstructed together, and those of them that are kept.
+    """
+    start: int
+    stop: int
+    keep_start: int
+    keep_stop: int
+
+
+def calculate_slabs(num_rows: int, max_slab_rows: int, overlap: int) -> List[Slab]:
+    """
+    Split the rows of a volume into slabs of at most max_slab_rows, each overlapping its neighbours by overlap
+    rows. The kept rows of the slabs cover the volume without overlapping.
+    """
+    if num_rows <= max_slab_rows:
+        return [Slab(0, num_rows, 0, num_rows)]
+    keep_rows = max_slab_rows - 2 * overlap
+    if keep_rows < 1:
+        raise ValueError(f"Slabs of {max_slab_rows} rows can not overlap by {overlap} rows")
+    return [
+        Slab(max(0, start - overlap), min(num_rows, start + keep_rows + overlap), start,
+             min(num_rows, start + keep_rows)) for start in range(0, num_rows, keep_rows)
+    ]
+
+
+def _regularisation_params(recon_params: ReconstructionParameters) -> Tuple[float, bool]:
+    return recon_params.alpha, recon_params.non_negative
+
+
+def _find_warm_start(sino: np.ndarray, cor: ScalarCoR, proj_angles: ProjectionAngles,
+                     recon_params: ReconstructionParameters) -> Optional[_WarmStart]:
+    """
+    The kept reconstruction of the same sinogram, if it had the same regularisation and a COR close to this one.
+    When the COR is the same, its PDHG can be resumed if it has not already run for more iterations than requested.
+    """
+    last = next((run for run in _single_sino_runs if np.array_equal(run.sino, sino)), None)
+    if last is None or last.regularisation != _regularisation_params(recon_params):
+        return None
+    if not np.array_equal(last.proj_angles, proj_angles.value):
+        return None
+    if abs(last.cor - cor.value) > WARM_START_MAX_COR_CHANGE:
+        return None
+    if last.cor == cor.value and last.iterations > recon_params.num_iter:
+        # A run can't be rewound to fewer iterations
+        return None
+    return last
+
+
+def _forget_single_sino(sino: np.ndarray):
+    _single_sino_runs[:] = [run for run in _single_sino_runs if not np.array_equal(run.sino, sino)]
+
 
 class CILRecon(BaseRecon):
     @staticmethod
@@ -95,40 +177,65 @@ class CILRecon(BaseRecon):
 
         print(f"SPDHG params: {recon_params.stochastic=} {recon_params.subsets=}")
 
-        if progress:
-            progress.add_estimated_steps(recon_params.num_iter + 1)
-            progress.update(steps=1, msg='CIL: Setting up reconstruction', force_continue=False)
-
         if cil_mutex.locked():
             LOG.warning("CIL recon already in progress")
 
         with cil_mutex:
             t0 = time.perf_counter()
             sino = BaseRecon.prepare_sinogram(sino, recon_params)
-            pixel_num_h = sino.shape[1]
-            pixel_size = 1.
-            rot_pos_x = (cor.value - pixel_num_h / 2) * pixel_size
-            ag = AcquisitionGeometry.create_Parallel2D(rotation_axis_position=[rot_pos_x, 0])
-
-            ag.set_panel(pixel_num_h, pixel_size=pixel_size)
-            ag.set_labels(DataOrder.ASTRA_AG_LABELS)
-            ag.set_angles(angles=proj_angles.value, angle_unit='radian')
-
-            data = ag.allocate(None)
-            data.fill(sino)
-
-            ig = ag.get_ImageGeometry()
-            K, f1, f2, G = CILRecon.set_up_TV_regularisation(ig, data, recon_params)
-
-            F = BlockFunction(f1, f2)
-            normK = K.norm()
-            sigma = 1
-            tau = 1 / (sigma * normK**2)
-
-            pdhg = PDHG(f=F, g=G, operator=K, tau=tau, sigma=sigma, max_iteration=100000, update_objective_interval=10)
-
+            warm_start = _find_warm_start(sino, cor, proj_angles, recon_params)
+            # When nothing but the number of iterations has changed, carry on from where the last call stopped
+            resume = warm_start is not None and warm_start.cor == cor.value
+            start_iter = warm_start.iterations if warm_start is not None and resume else 0
+
+            if progress:
+                progress.add_estimated_steps(recon_params.num_iter - start_iter + 1)
+                progress.update(steps=1, msg='CIL: Setting up reconstruction', force_continue=False)
+
+            if warm_start is not None and resume:
+                LOG.info(f"CIL: Resuming from iteration {start_iter}")
+                pdhg = warm_start.pdhg
+                normK = warm_start.normK
+            else:
+                pixel_num_h = sino.shape[1]
+                pixel_size = 1.
+                rot_pos_x = (cor.value - pixel_num_h / 2) * pixel_size
+                ag = AcquisitionGeometry.create_Parallel2D(rotation_axis_position=[rot_pos_x, 0])
+
+                ag.set_panel(pixel_num_h, pixel_size=pixel_size)
+                ag.set_labels(DataOrder.ASTRA_AG_LABELS)
+                ag.set_angles(angles=proj_angles.value, angle_unit='radian')
+
+                data = ag.allocate(None)
+                data.fill(sino)
+
+                ig = ag.get_ImageGeometry()
+                K, f1, f2, G = CILRecon.set_up_TV_regularisation(ig, data, recon_params)
+
+                F = BlockFunction(f1, f2)
+                # The norm only depends on the shape of the data, so it is the same for a warm start
+                normK = warm_start.normK if warm_start is not None else K.norm()
+                sigma = 1
+                tau = 1 / (sigma * normK**2)
+
+                # Start from the previous solution when only the COR has moved a little
+                initial = None
+                if warm_start is not None and warm_start.pdhg.solution is not None:
+                    initial = warm_start.pdhg.solution
+                    LOG.info(f"CIL: Warm start from the solution for COR {warm_start.cor}")
+                pdhg = PDHG(f=F,
+                            g=G,
+                            operator=K,
+                            tau=tau,
+                            sigma=sigma,
+                            initial=initial,
+                            max_iteration=100000,
+                            update_objective_interval=10)
+
+            # Forget the last run of this sinogram while this one is iterating, in case it is stopped part way
+            _forget_single_sino(sino)
             try:
-                for iter in range(recon_params.num_iter):
+                for iter in range(start_iter, recon_params.num_iter):
                     if progress:
                         progress.update(steps=1,
                                         msg=f'CIL: Iteration {iter + 1} of {recon_params.num_iter}'
@@ -138,9 +245,15 @@ class CILRecon(BaseRecon):
             finally:
                 if progress:
                     progress.mark_complete()
+
+            _single_sino_runs.append(
+                _WarmStart(sino, proj_angles.value, cor.value, _regularisation_params(recon_params), pdhg,
+                           recon_params.num_iter, normK))
+            del _single_sino_runs[:-WARM_START_MAX_SLICES]
             t1 = time.perf_counter()
             LOG.info(f"single_sino time: {t1-t0}s for shape {sino.shape}")
-            return pdhg.solution.as_array()
+            # Copied, as the solution is updated in place if the iterations are resumed
+            return pdhg.solution.as_array().copy()
 
     @staticmethod
     def full(images: ImageStack,
@@ -150,6 +263,9 @@ class CILRecon(BaseRecon):
         """
         Performs a volume reconstruction using sample data provided as sinograms.
 
+        If the volume does not fit in memory, it is reconstructed in overlapping slabs of rows, which are
+        stitched together without their overlaps.
+
         :param images: Array of sinogram images
         :param cors: Array of centre of rotation values
         :param proj_angles: Array of projection angles in radians
@@ -157,29 +273,33 @@ class CILRecon(BaseRecon):
         :param progress: Optional progress reporter
         :return: 3D image data for reconstructed volume
         """
-
-        progress = Progress.ensure_instance(progress,
-                                            task_name='CIL reconstruction',
-                                            num_steps=recon_params.num_iter + 1)
         shape = images.data.shape
         if images.is_sinograms:
             data_order = DataOrder.ASTRA_AG_LABELS
-            pixel_num_h, pixel_num_v = shape[2], shape[0]
+            pixel_num_h, pixel_num_v, num_projections = shape[2], shape[0], shape[1]
         else:
             data_order = DataOrder.TIGRE_AG_LABELS
-            pixel_num_h, pixel_num_v = shape[2], shape[1]
-
-        projection_size = full_size_KB(images.data.shape, images.dtype)
-        recon_volume_shape = pixel_num_h, pixel_num_h, pixel_num_v
-        recon_volume_size = full_size_KB(recon_volume_shape, images.dtype)
-        estimated_mem_required = 5 * projection_size + 13 * recon_volume_size
-        free_mem = system_free_memory().kb()
-
-        if (estimated_mem_required > free_mem):
-            estimate_gb = estimated_mem_required / 1024 / 1024
+            pixel_num_h, pixel_num_v, num_projections = shape[2], shape[1], shape[0]
+
+        recon_volume_shape = pixel_num_v, pixel_num_h, pixel_num_h
+        # The output volume is held throughout, and each slab needs memory in proportion to its rows
+        recon_volume_size = full_size_KB(recon_volume_shape, np.float32)
+        row_size = 5 * full_size_KB((num_projections, pixel_num_h), images.dtype) + 13 * full_size_KB(
+            (pixel_num_h, pixel_num_h), images.dtype)
+        max_slab_rows = int((system_free_memory().kb() - recon_volume_size) // row_size)
+        min_slab_rows = min(pixel_num_v, 2 * SLAB_OVERLAP + 1)
+        if max_slab_rows < min_slab_rows:
+            estimate_gb = (min_slab_rows * row_size + recon_volume_size) / 1024 / 1024
             raise RuntimeError(
                 "The machine does not have enough physical memory available to allocate space for this data."
                 f" Estimated RAM needed is {estimate_gb:.2f} GB")
+        if recon_params.tilt is None:
+            raise ValueError("recon_params.tilt is not set")
+
+        slabs = calculate_slabs(pixel_num_v, max_slab_rows, SLAB_OVERLAP)
+        progress = Progress.ensure_instance(progress,
+                                            task_name='CIL reconstruction',
+                                            num_steps=len(slabs) * (recon_params.num_iter + 1))
 
         if cil_mutex.locked():
             LOG.warning("CIL recon already in progress")
@@ -187,51 +307,67 @@ class CILRecon(BaseRecon):
         with cil_mutex:
             t0 = time.perf_counter()
             LOG.info(f"Starting 3D PDHG-TV reconstruction: input shape {images.data.shape}"
-                     f"output shape {recon_volume_shape}\n"
+                     f"output shape {recon_volume_shape}, in {len(slabs)} slabs\n"
                      f"Num iter {recon_params.num_iter}, alpha {recon_params.alpha}, "
                      f"Non-negative {recon_params.non_negative}")
-            progress.update(steps=1, msg='CIL: Setting up reconstruction', force_continue=False)
             angles = images.projection_angles(recon_params.max_projection_angle).value
-
-            pixel_size = 1.
-            if recon_params.tilt is None:
-                raise ValueError("recon_params.tilt is not set")
-            rot_pos = [(cors[pixel_num_v // 2].value - pixel_num_h / 2) * pixel_size, 0, 0]
-            slope = -np.tan(np.deg2rad(recon_params.tilt.value))
-            rot_angle = [slope, 0, 1]
-
-            ag = AcquisitionGeometry.create_Parallel3D(rotation_axis_position=rot_pos,
-                                                       rotation_axis_direction=rot_angle)
-            ag.set_panel([pixel_num_h, pixel_num_v], pixel_size=(pixel_size, pixel_size))
-            ag.set_angles(angles=angles, angle_unit='radian')
-            ag.set_labels(data_order)
-
-            data = ag.allocate(None)
-            data.fill(BaseRecon.prepare_sinogram(images.data, recon_params))
-            data.reorder('astra')
-
-            ig = ag.get_ImageGeometry()
-            K, f1, f2, G = CILRecon.set_up_TV_regularisation(ig, data, recon_params)
-
-            F = BlockFunction(f1, f2)
-            normK = K.norm()
-            sigma = 1
-            tau = 1 / (sigma * normK**2)
-
-            pdhg = PDHG(f=F, g=G, operator=K, tau=tau, sigma=sigma, max_iteration=100000, update_objective_interval=10)
+            output_images = ImageStack.create_empty_image_stack(recon_volume_shape, np.float32, None)
 
             with progress:
-                for iter in range(recon_params.num_iter):
-                    progress.update(steps=1,
-                                    msg=f'CIL: Iteration {iter+1} of {recon_params.num_iter}:'
-                                    f'Objective {pdhg.get_last_objective():.2f}',
-                                    force_continue=False)
-                    pdhg.next()
-                volume = pdhg.solution.as_array()
-                LOG.info('Reconstructed 3D volume with shape: {0}'.format(volume.shape))
+                for i, slab in enumerate(slabs):
+                    msg = f'CIL: Slab {i + 1} of {len(slabs)}: ' if len(slabs) > 1 else 'CIL: '
+                    progress.update(steps=1, msg=f'{msg}Setting up reconstruction', force_continue=False)
+                    rows = slice(slab.start, slab.stop)
+                    data = images.data[rows] if images.is_sinograms else images.data[:, rows]
+                    volume = CILRecon._reconstruct_slab(data, data_order, angles, cors[rows], recon_params, progress,
+                                                        msg)
+                    kept_rows = slice(slab.keep_start - slab.start, slab.keep_stop - slab.start)
+                    output_images.data[slab.keep_start:slab.keep_stop] = volume[kept_rows]
+                LOG.info('Reconstructed 3D volume with shape: {0}'.format(output_images.data.shape))
             t1 = time.perf_counter()
             LOG.info(f"full reconstruction time: {t1-t0}s for shape {images.data.shape}")
-            return ImageStack(volume)
+            return output_images
+
+    @staticmethod
+    def _reconstruct_slab(data: np.ndarray, data_order: List[str], angles: np.ndarray, cors: List[ScalarCoR],
+                          recon_params: ReconstructionParameters, progress: Progress, msg: str) -> np.ndarray:
+        """
+        Reconstruct a slab of rows with a 3D PDHG-TV, returning the volume in (vertical, y, x) order.
+        """
+        pixel_num_h, pixel_num_v = data.shape[2], len(cors)
+        pixel_size = 1.
+        assert recon_params.tilt is not None
+        # The CoRs follow the tilt, so the mean is the CoR at the centre of the slab
+        rot_pos = [(np.mean([cor.value for cor in cors]) - pixel_num_h / 2) * pixel_size, 0, 0]
+        slope = -np.tan(np.deg2rad(recon_params.tilt.value))
+        rot_angle = [slope, 0, 1]
+
+        ag = AcquisitionGeometry.create_Parallel3D(rotation_axis_position=rot_pos, rotation_axis_direction=rot_angle)
+        ag.set_panel([pixel_num_h, pixel_num_v], pixel_size=(pixel_size, pixel_size))
+        ag.set_angles(angles=angles, angle_unit='radian')
+        ag.set_labels(data_order)
+
+        acquisition_data = ag.allocate(None)
+        BaseRecon.prepare_sinogram(data, recon_params, out=acquisition_data.as_array())
+        acquisition_data.reorder('astra')
+
+        ig = ag.get_ImageGeometry()
+        K, f1, f2, G = CILRecon.set_up_TV_regularisation(ig, acquisition_data, recon_params)
+
+        F = BlockFunction(f1, f2)
+        normK = K.norm()
+        sigma = 1
+        tau = 1 / (sigma * normK**2)
+
+        pdhg = PDHG(f=F, g=G, operator=K, tau=tau, sigma=sigma, max_iteration=100000, update_objective_interval=10)
+
+        for iter in range(recon_params.num_iter):
+            progress.update(steps=1,
+                            msg=f'{msg}Iteration {iter+1} of {recon_params.num_iter}:'
+                            f'Objective {pdhg.get_last_objective():.2f}',
+                            force_continue=False)
+            pdhg.next()
+        return pdhg.solution.as_array()
 
 
 def allowed_recon_kwargs() -> dict:
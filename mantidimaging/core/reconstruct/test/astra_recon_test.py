@@ -0,0 +1,94 @@
+# Copyright (C) 2023 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+import numpy.testing as npt
+
+from mantidimaging.core.data import ImageStack
+from mantidimaging.core.reconstruct import astra_recon
+from mantidimaging.core.reconstruct.astra_recon import AstraRecon, vec_geom_init2d
+from mantidimaging.core.utility.data_containers import ProjectionAngles, ReconstructionParameters, ScalarCoR
+
+
+@mock.patch("mantidimaging.core.reconstruct.astra_recon.CudaChecker.cuda_is_present", return_value=False)
+class AstraReconTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.images = ImageStack(np.exp(-rng.random((20, 40, 32))).astype(np.float32))
+        self.recon_params = ReconstructionParameters("SIRT", "ram-lak", num_iter=3, max_projection_angle=180)
+        # change the CoR every few slices, and across the slab boundaries
+        self.cors = [ScalarCoR(16 + 0.1 * (i // 3)) for i in range(self.images.height)]
+
+    def test_full_matches_single_sino(self, _):
+        result = AstraRecon.full(self.images, self.cors, self.recon_params)
+
+        proj_angles = self.images.projection_angles(self.recon_params.max_projection_angle)
+        for i in range(self.images.height):
+            expected = AstraRecon.single_sino(self.images.sino(i), self.cors[i], proj_angles, self.recon_params)
+            npt.assert_allclose(result.data[i], expected, rtol=1e-6)
+
+    @mock.patch("mantidimaging.core.reconstruct.astra_recon.system_free_memory")
+    def test_full_with_small_slabs(self, free_memory, _):
+        # enough memory for two slabs of 3 prepared sinograms
+        sino_kb = self.images.num_projections * self.images.width * 4 / 1024
+        free_memory.return_value.kb.return_value = 2 * 3 * sino_kb / astra_recon.RECON_BUFFER_MEMORY_FRACTION
+        self.assertEqual(3, astra_recon._recon_slab_size(self.images))
+        result = AstraRecon.full(self.images, self.cors, self.recon_params)
+
+        free_memory.return_value.kb.return_value = 1e9
+        expected = AstraRecon.full(self.images, self.cors, self.recon_params)
+        npt.assert_equal(result.data, expected.data)
+
+    def test_full_calls_astra_from_one_thread(self, _):
+        threads = set()
+        run = astra_recon.astra.algorithm.run
+
+        def record_thread(*args, **kwargs):
+            threads.add(threading.get_ident())
+            self.assertTrue(astra_recon.astra_mutex.locked())
+            return run(*args, **kwargs)
+
+        with mock.patch("mantidimaging.core.reconstruct.astra_recon.astra.algorithm.run", side_effect=record_thread):
+            AstraRecon.full(self.images, self.cors, self.recon_params)
+
+        self.assertEqual({threading.get_ident()}, threads)
+
+    def test_full_reports_progress_per_slice(self, _):
+        progress = mock.Mock()
+        AstraRecon.full(self.images, self.cors, self.recon_params, progress)
+
+        self.assertEqual(self.images.height, sum(c.args[0] for c in progress.update.call_args_list))
+
+
+def rotation_matrix2d(theta: float):
+    return np.array([[np.cos(theta), -np.sin(theta)], [np.sin(theta), np.cos(theta)]])
+
+
+class VecGeomTest(unittest.TestCase):
+    def test_matches_rotated_vectors(self):
+        angles = ProjectionAngles(np.linspace(0, 2 * np.pi, 7))
+
+        vectors = vec_geom_init2d(angles, 1.5, -3.25)
+
+        for i, theta in enumerate(angles.value):
+            npt.assert_allclose(vectors[i, 0:2], rotation_matrix2d(theta) @ [0.0, -1.0], atol=1e-15)
+            npt.assert_allclose(vectors[i, 2:4], rotation_matrix2d(theta) @ [-3.25, 0.0], atol=1e-15)
+            npt.assert_allclose(vectors[i, 4:6], rotation_matrix2d(theta) @ [1.5, 0.0], atol=1e-15)
+
+    def test_geometry_is_cached(self):
+        angles = ProjectionAngles(np.linspace(0, np.pi, 5))
+
+        vectors = vec_geom_init2d(angles, 1.0, 2.0)
+
+        self.assertIs(vectors, vec_geom_init2d(ProjectionAngles(angles.value.copy()), 1.0, 2.0))
+        self.assertIsNot(vectors, vec_geom_init2d(angles, 1.0, 2.5))
+        self.assertFalse(vectors.flags.writeable)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+# Copyright (C) 2023 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import unittest
+from unittest import mock
+
+import numpy as np
+import numpy.testing as npt
+from numpy.polynomial import Polynomial
+
+from mantidimaging.core.reconstruct.base_recon import BaseRecon, bin_sinogram, cor_search_binning
+from mantidimaging.core.utility.data_containers import ProjectionAngles, ReconstructionParameters
+
+
+class BaseReconTest(unittest.TestCase):
+    def test_cor_search_binning(self):
+        self.assertEqual([4, 2, 1], cor_search_binning(2560, 1000))
+        self.assertEqual([2, 1], cor_search_binning(200, 1000))
+        self.assertEqual([1], cor_search_binning(2560, 100))
+
+    def test_bin_sinogram(self):
+        sino = np.arange(6 * 7, dtype=np.float32).reshape((6, 7))
+        angles = ProjectionAngles(np.linspace(0, np.pi, 6))
+
+        binned, binned_angles = bin_sinogram(sino, angles, 2)
+
+        self.assertEqual((3, 3), binned.shape)
+        npt.assert_equal(binned[1], [14.5, 16.5, 18.5])
+        npt.assert_equal(binned_angles.value, angles.value[::2])
+
+    def test_bin_sinogram_keeps_leading_dimensions(self):
+        sino = np.ones((1, 8, 8))
+        binned, _ = bin_sinogram(sino, ProjectionAngles(np.zeros(8)), 4)
+        self.assertEqual((1, 2, 2), binned.shape)
+
+    def test_no_binning(self):
+        sino = np.ones((4, 4))
+        angles = ProjectionAngles(np.zeros(4))
+        binned, binned_angles = bin_sinogram(sino, angles, 1)
+        self.assertIs(sino, binned)
+        self.assertIs(angles, binned_angles)
+
+    def test_prepare_sinogram(self):
+        data = np.exp(-np.random.default_rng(0).random((20, 5, 6))).astype(np.float32)
+        prepared = BaseRecon.prepare_sinogram(data, ReconstructionParameters("FBP_CUDA", "ram-lak"))
+
+        self.assertEqual(np.float32, prepared.dtype)
+        npt.assert_allclose(prepared, -np.log(data), rtol=1e-6)
+
+    def test_prepare_sinogram_beam_hardening(self):
+        data = np.exp(-np.random.default_rng(0).random((20, 5, 6)))
+        coefs = [0.5, -0.2, 0.1, 0.05]
+        recon_params = ReconstructionParameters("FBP_CUDA", "ram-lak", beam_hardening_coefs=coefs)
+
+        prepared = BaseRecon.prepare_sinogram(data, recon_params)
+
+        npt.assert_allclose(prepared, Polynomial([0, 1] + coefs)(-np.log(data)))
+
+    def test_prepare_sinogram_in_place(self):
+        data = np.exp(-np.random.default_rng(0).random((20, 5, 6)))
+        expected = -np.log(data)
+
+        prepared = BaseRecon.prepare_sinogram(data, ReconstructionParameters("FBP_CUDA", "ram-lak"), out=data)
+
+        self.assertIs(data, prepared)
+        npt.assert_allclose(data, expected)
+
+    @mock.patch("mantidimaging.core.reconstruct.base_recon.PARALLEL_PREPARE_MIN_SIZE", 1)
+    def test_prepare_sinogram_parallel_matches_serial(self):
+        data = np.exp(-np.random.default_rng(0).random((37, 5, 6)))
+        recon_params = ReconstructionParameters("FBP_CUDA", "ram-lak", beam_hardening_coefs=[0.5, -0.2, 0.1, 0.05])
+
+        parallel = BaseRecon.prepare_sinogram(data, recon_params)
+        serial = BaseRecon.prepare_sinogram(data, recon_params, parallel=False)
+
+        npt.assert_equal(parallel, serial)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+# Copyright (C) 2023 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from mantidimaging.core.data import ImageStack
+from mantidimaging.core.reconstruct import cil_recon
+from mantidimaging.core.reconstruct.cil_recon import CILRecon, Slab, calculate_slabs
+from mantidimaging.core.utility.data_containers import Degrees, ProjectionAngles, ReconstructionParameters, ScalarCoR
+
+
+@mock.patch("mantidimaging.core.reconstruct.cil_recon.DataOrder")
+@mock.patch("mantidimaging.core.reconstruct.cil_recon.BlockFunction")
+@mock.patch("mantidimaging.core.reconstruct.cil_recon.AcquisitionGeometry")
+@mock.patch("mantidimaging.core.reconstruct.cil_recon.CILRecon.set_up_TV_regularisation")
+@mock.patch("mantidimaging.core.reconstruct.cil_recon.PDHG")
+class CILReconWarmStartTest(unittest.TestCase):
+    def setUp(self):
+        cil_recon._single_sino_runs.clear()
+        self.sino = np.exp(-np.random.default_rng(0).random((10, 8)))
+        self.proj_angles = ProjectionAngles(np.linspace(0, np.pi, 10))
+
+    def tearDown(self):
+        cil_recon._single_sino_runs.clear()
+
+    def _single_sino(self, cor: float, num_iter: int, alpha: float = 1.0, sino=None):
+        recon_params = ReconstructionParameters("CIL: PDHG-TV", "", num_iter=num_iter, alpha=alpha)
+        return CILRecon.single_sino(self.sino if sino is None else sino, ScalarCoR(cor), self.proj_angles, recon_params)
+
+    def _set_up(self, pdhg_class, set_up_tv):
+        set_up_tv.return_value = (mock.MagicMock(), mock.Mock(), mock.Mock(), mock.Mock())
+        set_up_tv.return_value[0].norm.return_value = 2.0
+        pdhg_class.side_effect = lambda **kwargs: mock.MagicMock()
+
+    def test_more_iterations_resumes(self, pdhg_class, set_up_tv, *_):
+        self._set_up(pdhg_class, set_up_tv)
+
+        self._single_sino(4, 2)
+        pdhg = pdhg_class.mock_calls[0]
+        self._single_sino(4, 5)
+
+        self.assertEqual(1, pdhg_class.call_count)
+        self.assertIsNone(pdhg.kwargs['initial'])
+        self.assertEqual(5, cil_recon._single_sino_runs[-1].pdhg.next.call_count)
+
+    def test_fewer_iterations_starts_again(self, pdhg_class, set_up_tv, *_):
+        self._set_up(pdhg_class, set_up_tv)
+
+        self._single_sino(4, 5)
+        self._single_sino(4, 2)
+
+        self.assertEqual(2, pdhg_class.call_count)
+        self.assertIsNone(pdhg_class.call_args.kwargs['initial'])
+
+    def test_small_cor_change_warm_starts(self, pdhg_class, set_up_tv, *_):
+        self._set_up(pdhg_class, set_up_tv)
+
+        self._single_sino(4, 5)
+        first = cil_recon._single_sino_runs[-1].pdhg
+        self._single_sino(5, 5)
+
+        self.assertEqual(2, pdhg_class.call_count)
+        self.assertIs(first.solution, pdhg_class.call_args.kwargs['initial'])
+        # the norm is reused
+        set_up_tv.return_value[0].norm.assert_called_once()
+        self.assertEqual(5, cil_recon._single_sino_runs[-1].pdhg.next.call_count)
+
+    def test_no_warm_start(self, pdhg_class, set_up_tv, *_):
+        self._set_up(pdhg_class, set_up_tv)
+
+        self._single_sino(4, 5)
+        self._single_sino(4 + cil_recon.WARM_START_MAX_COR_CHANGE + 1, 5)
+        self.assertIsNone(pdhg_class.call_args.kwargs['initial'])
+        self._single_sino(4, 5, alpha=2.0)
+        self.assertIsNone(pdhg_class.call_args.kwargs['initial'])
+        self._single_sino(4, 5, alpha=2.0, sino=self.sino * 0.5)
+        self.assertIsNone(pdhg_class.call_args.kwargs['initial'])
+
+    def test_stopped_run_is_not_resumed(self, pdhg_class, set_up_tv, *_):
+        self._set_up(pdhg_class, set_up_tv)
+        pdhg_class.side_effect = None
+        pdhg_class.return_value.next.side_effect = [None, StopIteration]
+
+        self.assertRaises(StopIteration, self._single_sino, 4, 5)
+
+        self.assertEqual([], cil_recon._single_sino_runs)
+
+    def test_other_slices_do_not_replace_warm_start(self, pdhg_class, set_up_tv, *_):
+        self._set_up(pdhg_class, set_up_tv)
+
+        self._single_sino(4, 2)
+        # the slices either side, as the preview prefetch reconstructs
+        for scale in [0.5, 0.25, 2, 4]:
+            self._single_sino(4, 2, sino=self.sino * scale)
+        self._single_sino(4, 5)
+
+        self.assertEqual(5, pdhg_class.call_count)
+        self.assertEqual(5, len(cil_recon._single_sino_runs))
+        self.assertEqual(5, cil_recon._single_sino_runs[-1].pdhg.next.call_count)
+
+    def test_number_of_kept_slices_is_limited(self, pdhg_class, set_up_tv, *_):
+        self._set_up(pdhg_class, set_up_tv)
+
+        for scale in range(1, cil_recon.WARM_START_MAX_SLICES + 2):
+            self._single_sino(4, 2, sino=self.sino * scale)
+        self._single_sino(4, 5)
+
+        self.assertEqual(cil_recon.WARM_START_MAX_SLICES, len(cil_recon._single_sino_runs))
+        self.assertEqual(cil_recon.WARM_START_MAX_SLICES + 2, pdhg_class.call_count)
+
+
+class CILReconSlabTest(unittest.TestCase):
+    def test_calculate_slabs_single(self):
+        self.assertEqual([Slab(0, 10, 0, 10)], calculate_slabs(10, 10, 2))
+
+    def test_calculate_slabs(self):
+        slabs = calculate_slabs(20, 8, 2)
+
+        expected = [Slab(0, 6, 0, 4), Slab(2, 10, 4, 8), Slab(6, 14, 8, 12), Slab(10, 18, 12, 16), Slab(14, 20, 16, 20)]
+        self.assertEqual(expected, slabs)
+        self.assertTrue(all(slab.stop - slab.start <= 8 for slab in slabs))
+
+    def test_calculate_slabs_too_small(self):
+        self.assertRaises(ValueError, calculate_slabs, 20, 4, 2)
+
+    @mock.patch("mantidimaging.core.reconstruct.cil_recon.DataOrder")
+    @mock.patch("mantidimaging.core.reconstruct.cil_recon.CILRecon._reconstruct_slab")
+    @mock.patch("mantidimaging.core.reconstruct.cil_recon.system_free_memory")
+    def test_full_stitches_slabs(self, free_memory, reconstruct_slab, _):
+        # each projection row holds its own index
+        images = ImageStack(np.broadcast_to(np.arange(40, dtype=np.float32)[:, np.newaxis], (6, 40, 4)).copy())
+        cors = [ScalarCoR(2)] * 40
+        recon_params = ReconstructionParameters("CIL: PDHG-TV", "", num_iter=3, tilt=Degrees(0))
+        # enough for the output and about 20 rows
+        free_memory.return_value.kb.return_value = 28.2
+        reconstruct_slab.side_effect = lambda data, *args: np.broadcast_to(data[0, :, :1, np.newaxis],
+                                                                           (data.shape[1], 4, 4))
+        progress = mock.MagicMock()
+
+        with mock.patch("mantidimaging.core.reconstruct.cil_recon.Progress.ensure_instance",
+                        return_value=progress) as ensure_instance:
+            result = CILRecon.full(images, cors, recon_params, progress)
+
+        self.assertEqual((40, 4, 4), result.data.shape)
+        np.testing.assert_equal(result.data[:, 0, 0], np.arange(40))
+        num_slabs = reconstruct_slab.call_count
+        self.assertGreater(num_slabs, 1)
+        self.assertEqual(num_slabs * 4, ensure_instance.call_args.kwargs['num_steps'])
+        self.assertEqual(num_slabs, progress.update.call_count)
+
+    @mock.patch("mantidimaging.core.reconstruct.cil_recon.DataOrder")
+    @mock.patch("mantidimaging.core.reconstruct.cil_recon.system_free_memory")
+    def test_full_not_enough_memory(self, free_memory, _):
+        images = ImageStack(np.ones((6, 40, 4), dtype=np.float32))
+        free_memory.return_value.kb.return_value = 0
+
+        self.assertRaisesRegex(RuntimeError, "not have enough physical memory", CILRecon.full, images,
+                               [ScalarCoR(2)] * 40, ReconstructionParameters("CIL: PDHG-TV", "", tilt=Degrees(0)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+# Copyright (C) 2023 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import unittest
+from unittest import mock
+
+import numpy as np
+import numpy.testing as npt
+
+from mantidimaging.core.data import ImageStack
+from mantidimaging.core.reconstruct import tomopy_recon
+from mantidimaging.core.reconstruct.tomopy_recon import TomopyRecon
+from mantidimaging.core.utility.data_containers import ReconstructionParameters, ScalarCoR
+
+
+def _fake_recon(tomo, center, init_recon, **kwargs):
+    # fill each slice with its centre, and the sum of its sinogram
+    init_recon[:] = (np.asarray(center) + tomo.sum(axis=(1, 2)))[:, np.newaxis, np.newaxis]
+    return init_recon
+
+
+@mock.patch("mantidimaging.core.reconstruct.tomopy_recon.multiprocessing.cpu_count", return_value=2)
+@mock.patch("mantidimaging.core.reconstruct.tomopy_recon.tomopy")
+class TomopyReconTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.images = ImageStack(np.exp(-rng.random((6, 19, 8))).astype(np.float32))
+        self.recon_params = ReconstructionParameters("gridrec", "ramlak", max_projection_angle=180)
+        self.cors = [ScalarCoR(4 + 0.1 * i) for i in range(self.images.height)]
+
+    def test_full_reconstructs_in_slabs(self, tomopy, _):
+        tomopy.recon.side_effect = _fake_recon
+
+        result = TomopyRecon.full(self.images, self.cors, self.recon_params)
+
+        # 2 cores reconstruct 8 sinograms in each slab
+        self.assertEqual(3, tomopy.recon.call_count)
+        self.assertEqual([8, 8, 3], [len(c.kwargs['center']) for c in tomopy.recon.call_args_list])
+        for c in tomopy.recon.call_args_list:
+            self.assertTrue(c.kwargs['sinogram_order'])
+            self.assertEqual(2, c.kwargs['ncore'])
+
+        self.assertEqual((19, 8, 8), result.data.shape)
+        sinograms = np.swapaxes(-np.log(self.images.data), 0, 1)
+        expected = np.array([cor.value for cor in self.cors]) + sinograms.sum(axis=(1, 2))
+        npt.assert_allclose(result.data[:, 0, 0], expected, rtol=1e-5)
+
+    def test_full_copies_result_into_output(self, tomopy, _):
+        tomopy.recon.side_effect = lambda tomo, **kwargs: np.ones((tomo.shape[0], 8, 8), dtype=np.float32)
+
+        result = TomopyRecon.full(self.images, self.cors, self.recon_params)
+
+        npt.assert_equal(result.data, 1)
+
+    def test_full_progress_per_slab(self, tomopy, _):
+        tomopy.recon.side_effect = _fake_recon
+        progress = mock.MagicMock()
+
+        with mock.patch("mantidimaging.core.reconstruct.tomopy_recon.Progress.ensure_instance",
+                        return_value=progress) as ensure_instance:
+            TomopyRecon.full(self.images, self.cors, self.recon_params, progress)
+
+        self.assertEqual(19, ensure_instance.call_args.kwargs['num_steps'])
+        self.assertEqual([8, 8, 3], [c.args[0] for c in progress.update.call_args_list])
+
+    @mock.patch("mantidimaging.core.reconstruct.tomopy_recon._find_cor_in_window", side_effect=[2.3, 4.7])
+    @mock.patch("mantidimaging.core.reconstruct.tomopy_recon.cor_search_binning", return_value=[4, 2, 1])
+    def test_find_cor_refines_within_previous_pixel(self, _, find_cor_in_window, tomopy, _cpu_count):
+        tomopy.find_center.return_value = 1.25
+
+        cor = TomopyRecon.find_cor(self.images, 3, 4.0, self.recon_params)
+
+        tomopy.find_center.assert_called_once()
+        self.assertEqual(1.0, tomopy.find_center.call_args.kwargs['init'])
+        # each refinement searches within a pixel of the previous binning
+        self.assertEqual([(5.0 / 2, 4 / 2), (4.6, 2 / 1)], [c.args[2:] for c in find_cor_in_window.call_args_list])
+        self.assertEqual(4.7, cor)
+
+    def test_find_cor_without_binning(self, tomopy, _):
+        tomopy.find_center.return_value = 4.2
+
+        with mock.patch("mantidimaging.core.reconstruct.tomopy_recon._find_cor_in_window") as find_cor_in_window:
+            cor = TomopyRecon.find_cor(self.images, 3, 4.0, self.recon_params)
+
+        find_cor_in_window.assert_not_called()
+        self.assertEqual(4.0, tomopy.find_center.call_args.kwargs['init'])
+        self.assertEqual(4.2, cor)
+
+    def test_find_cor_in_window(self, tomopy, _):
+        # The reconstruction spreads out as the CoR moves from 9.3, so its entropy is lowest there
+        tomopy.recon.side_effect = lambda sino, angles, center, **kwargs: np.linspace(0, 1, 400).reshape(
+            (1, 20, 20)) * abs(center - 9.3)
+        tomopy.circ_mask.side_effect = lambda recon, axis: recon
+
+        cor = tomopy_recon._find_cor_in_window(np.ones((1, 8, 16)), np.zeros(8), 8.0, 4.0)
+
+        self.assertLessEqual(abs(cor - 9.3), tomopy_recon.COR_SEARCH_TOLERANCE)
+        centres = [c.kwargs['center'] for c in tomopy.recon.call_args_list]
+        self.assertTrue(all(4.0 <= centre <= 12.0 for centre in centres))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,13 +2,16 @@
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
 
+import multiprocessing
+import time
 from logging import getLogger
-from typing import List, Optional, TYPE_CHECKING
+from typing import List, Optional, Tuple, TYPE_CHECKING
 
 import numpy as np
+from scipy.optimize import minimize_scalar
 
 from mantidimaging.core.data import ImageStack
-from mantidimaging.core.reconstruct.base_recon import BaseRecon
+from mantidimaging.core.reconstruct.base_recon import BaseRecon, bin_sinogram, cor_search_binning, log_cor_search_level
 from mantidimaging.core.utility.optional_imports import safe_import
 from mantidimaging.core.utility.progress_reporting import Progress
 
@@ -18,17 +21,73 @@ if TYPE_CHECKING:
 LOG = getLogger(__name__)
 tomopy = safe_import('tomopy')
 
+# Number of sinograms reconstructed by each core in a slab
+SLICES_PER_CORE = 4
+# Tolerance of the CoR searches, in pixels of the searched sinogram, as the default of tomopy.find_center
+COR_SEARCH_TOLERANCE = 0.5
+
+
+def _masked_gridrec(sino: np.ndarray, angles: np.ndarray, cor: float) -> np.ndarray:
+    return tomopy.circ_mask(tomopy.recon(sino, angles, center=cor, sinogram_order=True, algorithm='gridrec'), axis=0)
+
+
+def _reconstruction_entropy(cor: float, sino: np.ndarray, angles: np.ndarray, hist_range: Tuple[float, float]) -> float:
+    """
+    The entropy of the histogram of the reconstruction, which is what tomopy.find_center minimises.
+    """
+    recon = _masked_gridrec(sino, angles, cor)
+    hist, _ = np.histogram(recon, bins=64, range=hist_range)
+    hist = hist / recon.size + 1e-12
+    return float(-np.dot(hist, np.log2(hist)))
+
+
+def _find_cor_in_window(sino: np.ndarray, angles: np.ndarray, cor: float, window: float) -> float:
+    """
+    Minimise the reconstruction entropy, as tomopy.find_center does, but only within window pixels of cor.
+    The histogram range is taken from the reconstruction at cor, widened in the same way as tomopy does so that
+    the reconstructions at the other CoRs fit in it.
+    """
+    recon = _masked_gridrec(sino, angles, cor)
+    low, high = float(recon.min()), float(recon.max())
+    hist_range = (low * 2 if low < 0 else low / 2, high * 2 if high > 0 else high / 2)
+    result = minimize_scalar(_reconstruction_entropy,
+                             bounds=(cor - window, cor + window),
+                             args=(sino, angles, hist_range),
+                             method='bounded',
+                             options={'xatol': COR_SEARCH_TOLERANCE})
+    return float(result.x)
+
 
 class TomopyRecon(BaseRecon):
     @staticmethod
     def find_cor(images: ImageStack, slice_idx: int, start_cor: float, recon_params: ReconstructionParameters) -> float:
+        """
+        Find the CoR with tomopy's entropy minimisation, first on binned sinograms and then at full resolution.
+        The first search is tomopy.find_center from start_cor. Each refinement only searches within one pixel
+        of the previous level, i.e. factor pixels of the full sinogram, around its result.
+        """
         sino = np.maximum(images.sinograms[slice_idx:slice_idx + 1], 1e-6)
-        sino = BaseRecon.prepare_sinogram(sino, recon_params)
-        return tomopy.find_center(sino,
-                                  images.projection_angles(recon_params.max_projection_angle).value,
-                                  ind=0,
-                                  init=start_cor,
-                                  sinogram_order=True)
+        proj_angles = images.projection_angles(recon_params.max_projection_angle)
+        cor = start_cor
+        window: Optional[float] = None
+        for factor in cor_search_binning(sino.shape[2], sino.shape[1]):
+            start = time.perf_counter()
+            binned_sino, binned_angles = bin_sinogram(sino, proj_angles, factor)
+            prepared = BaseRecon.prepare_sinogram(binned_sino, recon_params)
+            if window is None:
+                # find_center gives the CoR as a 1 element array
+                found = tomopy.find_center(prepared,
+                                           binned_angles.value,
+                                           ind=0,
+                                           init=cor / factor,
+                                           tol=COR_SEARCH_TOLERANCE,
+                                           sinogram_order=True)
+                cor = float(np.ravel(found)[0]) * factor
+            else:
+                cor = _find_cor_in_window(prepared, binned_angles.value, cor / factor, window / factor) * factor
+            log_cor_search_level(slice_idx, factor, cor, time.perf_counter() - start)
+            window = factor
+        return cor
 
     @staticmethod
     def single_sino(sino: np.ndarray,
@@ -61,26 +120,42 @@ class TomopyRecon(BaseRecon):
         :param progress: Optional progress reporter
         :return: 3D image data for reconstructed volume
         """
-        progress = Progress.ensure_instance(progress, task_name='TomoPy reconstruction')
-
-        import multiprocessing
         ncores = multiprocessing.cpu_count()
 
-        kwargs = {
-            'ncore': ncores,
-            'tomo': BaseRecon.prepare_sinogram(images.data, recon_params),
-            'sinogram_order': images._is_sinograms,
-            'theta': images.projection_angles(recon_params.max_projection_angle).value,
-            'center': [cor.value for cor in cors],
-            'algorithm': recon_params.algorithm,
-            'filter_name': recon_params.filter_name
-        }
+        num_slices = images.num_sinograms
+        progress = Progress.ensure_instance(progress, num_steps=num_slices, task_name='TomoPy reconstruction')
+        output_shape = (num_slices, images.width, images.width)
+        output_images = ImageStack.create_empty_image_stack(output_shape, np.float32, None)
 
-        with progress:
-            volume = tomopy.recon(**kwargs)
-            LOG.info('Reconstructed 3D volume with shape: {0}'.format(volume.shape))
+        theta = images.projection_angles(recon_params.max_projection_angle).value
+        centers = np.array([cor.value for cor in cors])
+        slab_size = ncores * SLICES_PER_CORE
+        prepared = np.empty((min(slab_size, num_slices), images.num_projections, images.width),
+                            dtype=np.result_type(images.dtype, np.float32))
 
-        return ImageStack(volume)
+        with progress:
+            # Prepare and reconstruct a slab of sinograms at a time, reusing the buffer for the prepared slab
+            for start in range(0, num_slices, slab_size):
+                stop = min(start + slab_size, num_slices)
+                out = output_images.data[start:stop]
+                tomo = BaseRecon.prepare_sinogram(images.sinograms[start:stop],
+                                                  recon_params,
+                                                  out=prepared[:stop - start])
+                volume = tomopy.recon(tomo=tomo,
+                                      sinogram_order=True,
+                                      theta=theta,
+                                      center=centers[start:stop],
+                                      algorithm=recon_params.algorithm,
+                                      filter_name=recon_params.filter_name,
+                                      init_recon=out,
+                                      ncore=ncores)
+                # tomopy reconstructs into init_recon when it can use it directly
+                if volume is not out:
+                    out[:] = volume
+                progress.update(stop - start, msg="Reconstructed slices")
+            LOG.info('Reconstructed 3D volume with shape: {0}'.format(output_images.data.shape))
+
+        return output_images
 
     @staticmethod
     def allowed_filters() -> List[str]:
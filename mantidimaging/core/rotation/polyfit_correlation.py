@@ -7,80 +7,105 @@ from typing import Tuple, TYPE_CHECKING
 
 import numpy as np
 
-from mantidimaging.core.parallel import utility as pu, shared as ps
 from mantidimaging.core.utility.data_containers import Degrees, ScalarCoR
+from mantidimaging.core.utility.progress_reporting import Progress
 
 if TYPE_CHECKING:
     from mantidimaging.core.data import ImageStack
-    from mantidimaging.core.utility.progress_reporting import Progress
 
 LOG = getLogger(__name__)
 
 
-def do_calculate_correlation_err(store: np.ndarray, search_index: int, p0_and_180: Tuple[np.ndarray, np.ndarray],
-                                 image_width: int):
+def calculate_correlation_error(p0: np.ndarray, p180: np.ndarray, search_range: range) -> np.ndarray:
     """
-    Calculates squared sum error in the difference between the projection at 0 degrees, and the one at 180 degrees
-    """
-    store[:] = np.square(np.roll(p0_and_180[0], search_index, axis=1) - p0_and_180[1]).sum(axis=1) / image_width
+    Squared sum error between each row of the 0 degree projection, rolled by every shift in the search range,
+    and the same row of the flipped 180 degree projection. This is found for all the shifts at once, using
+    sum((roll(p0, s) - p180)^2) = sum(p0^2) + sum(p180^2) - 2 * cross_correlation(p0, p180)[s]
+    where the circular cross correlation of every row is found with a single FFT.
 
+    :return: The error with shape (len(search_range), height)
+    """
+    p0 = np.asarray(p0, dtype=np.float64)
+    p180 = np.asarray(p180, dtype=np.float64)
+    width = p0.shape[1]
+    cross_correlation = np.fft.irfft(np.fft.rfft(p180, axis=1) * np.conj(np.fft.rfft(p0, axis=1)), n=width, axis=1)
+    row_energy = np.square(p0).sum(axis=1) + np.square(p180).sum(axis=1)
+    error = (row_energy[:, np.newaxis] - 2 * cross_correlation) / width
+    # rounding errors in the FFT can make the error slightly negative where the rows match exactly
+    np.clip(error, 0, None, out=error)
+    return np.transpose(error[:, np.mod(np.asarray(search_range), width)])
+
+
+def find_center(images: ImageStack, progress: Progress, sub_pixel: bool = False) -> Tuple[ScalarCoR, Degrees]:
+    """
+    Find the COR and tilt by correlating the projection at 0 degrees with the flipped one at 180 degrees.
 
-def find_center(images: ImageStack, progress: Progress) -> Tuple[ScalarCoR, Degrees]:
+    :param images: The stack, which must have a 180 degree projection
+    :param progress: Progress instance to use for progress reporting
+    :param sub_pixel: Refine the shift of each row to sub-pixel precision by fitting a parabola
+                      through the minimum of the error and its neighbours
+    """
+    progress = Progress.ensure_instance(progress, num_steps=2, task_name="Finding correlation")
     # assume the ROI is the full image, i.e. the slices are ALL rows of the image
     slices = np.arange(images.height)
-    shift = pu.create_array((images.height, ))
+    shift = np.zeros((images.height, ))
 
+    assert images.proj180deg is not None
     search_range = get_search_range(images.width)
-    min_correlation_error = pu.create_array((len(search_range), images.height))
-    shared_search_range = pu.create_array((len(search_range), ), dtype=np.int32)
-    shared_search_range.array[:] = np.asarray(search_range, dtype=np.int32)
-    _calculate_correlation_error(images, shared_search_range, min_correlation_error, progress)
-
-    # Originally the output of do_search is stored in dimensions
-    # corresponding to (search_range, square sum). This is awkward to navigate
-    # we transpose store to make the array hold (square sum, search range)
-    # so that each store[row] accesses the information for the row's square sum across all search ranges
-    _find_shift(images, search_range, min_correlation_error.array, shift.array)
-
-    par = np.polyfit(slices, shift.array, deg=1)
+    min_correlation_error = calculate_correlation_error(images.projection(0), np.fliplr(images.proj180deg.data[0]),
+                                                        search_range)
+    progress.update(msg="Finding correlation on rows")
+
+    _find_shift(images, search_range, min_correlation_error, shift, sub_pixel)
+
+    par = np.polyfit(slices, shift, deg=1)
     m = par[0]
     q = par[1]
     LOG.debug(f"m={m}, q={q}")
     theta = Degrees(np.rad2deg(np.arctan(0.5 * m)))
-    offset = np.round(m * images.height * 0.5 + q) * 0.5
+    offset = m * images.height * 0.5 + q
+    offset = (offset if sub_pixel else np.round(offset)) * 0.5
     LOG.info(f"found offset: {-offset} and tilt {theta}")
+    progress.update(msg="Fitting shifts")
     return ScalarCoR(images.h_middle + -offset), theta
 
 
-def _calculate_correlation_error(images, shared_search_range, min_correlation_error, progress):
-    # if the projections are passed in the partial they are copied to every process on every iteration
-    # this makes the multiprocessing significantly slower
-    # so they are copied into a shared array to avoid that copying
-    shared_projections = pu.create_array((2, images.height, images.width))
-    shared_projections.array[0][:] = images.projection(0)
-    shared_projections.array[1][:] = np.fliplr(images.proj180deg.data[0])
-
-    do_search_partial = ps.create_partial(do_calculate_correlation_err, ps.inplace3, image_width=images.width)
-
-    arrays = [min_correlation_error, shared_search_range, shared_projections]
-    ps.execute(do_search_partial,
-               arrays,
-               num_operations=min_correlation_error.array.shape[0],
-               progress=progress,
-               msg="Finding correlation on row")
-
-
-def _find_shift(images: ImageStack, search_range: range, min_correlation_error: np.ndarray, shift: np.ndarray):
-    min_correlation_error = np.transpose(min_correlation_error)
-    for row in range(images.height):
-        # then we just find the index of the minimum one (minimum error)
-        min_arg_positions = min_correlation_error[row].argmin()
-        # argmin returns a list of where the minimum argument is found
-        # just in case that happens - get the first minimum one, should be close enough
-        min_arg = min_arg_positions if isinstance(min_arg_positions, np.int64) else min_arg_positions[0]
-        # and we get which search range is at that index
-        # that is the number that we then pass into polyfit
-        shift[row] = search_range[min_arg]
+def _find_shift(images: ImageStack,
+                search_range: range,
+                min_correlation_error: np.ndarray,
+                shift: np.ndarray,
+                sub_pixel: bool = False):
+    # The error is stored with dimensions (search range, row), transpose it
+    # so that each row of errors holds the error of an image row across all the search range
+    errors = np.transpose(min_correlation_error)
+    # Take the first minimum of each row. Errors within a small tolerance of the minimum are treated as equal,
+    # so that rounding errors don't decide between shifts that match equally well.
+    tolerance = 1e-9 * max(float(np.abs(errors).max(initial=0)), 1e-30)
+    min_args = np.argmax(errors <= errors.min(axis=1, keepdims=True) + tolerance, axis=1)
+    # and we get which search range is at that index
+    # that is the number that we then pass into polyfit
+    shift[:] = np.asarray(search_range)[min_args]
+
+    if sub_pixel:
+        shift += _parabolic_refinement(errors, min_args)
+
+
+def _parabolic_refinement(errors: np.ndarray, min_args: np.ndarray) -> np.ndarray:
+    """
+    Offset of the minimum of the parabola through each row's minimum and its neighbours, within +-0.5.
+    Minimums at the ends of the search range are not refined.
+    """
+    rows = np.arange(errors.shape[0])
+    inner = (min_args > 0) & (min_args < errors.shape[1] - 1)
+    refinement = np.zeros(errors.shape[0])
+    below = errors[rows[inner], min_args[inner] - 1]
+    centre = errors[rows[inner], min_args[inner]]
+    above = errors[rows[inner], min_args[inner] + 1]
+    curvature = below - 2 * centre + above
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta = np.where(curvature > 0, 0.5 * (below - above) / curvature, 0)
+    refinement[inner] = np.clip(delta, -0.5, 0.5)
+    return refinement
 
 
 def get_search_range(width):
@@ -7,11 +7,19 @@ import numpy as np
 
 from mantidimaging.test_helpers.start_qapplication import start_multiprocessing_pool
 from mantidimaging.test_helpers.unit_test_helper import generate_images, assert_not_equals
-from ..polyfit_correlation import do_calculate_correlation_err, get_search_range, find_center, _find_shift
+from ..polyfit_correlation import get_search_range, find_center, _find_shift, calculate_correlation_error
 from ...data import ImageStack
 from ...utility.progress_reporting import Progress
 
 
+def do_calculate_correlation_err(store, search_index, p0_and_180, image_width):
+    """
+    Reference implementation of calculate_correlation_error for a single shift, rolling the projection.
+    Calculates squared sum error in the difference between the projection at 0 degrees, and the one at 180 degrees
+    """
+    store[:] = np.square(np.roll(p0_and_180[0], search_index, axis=1) - p0_and_180[1]).sum(axis=1) / image_width
+
+
 @start_multiprocessing_pool
 class PolyfitCorrelationTest(unittest.TestCase):
     def test_do_search(self):
@@ -38,10 +46,38 @@ class PolyfitCorrelationTest(unittest.TestCase):
         images.proj180deg = ImageStack(np.fliplr(images.data))
         mock_progress = mock.create_autospec(Progress)
         res_cor, res_tilt = find_center(images, mock_progress)
-        assert mock_progress.update.call_count == 11
+        assert mock_progress.update.call_count == 2
         assert res_cor.value == 5.0, f"Found {res_cor.value}"
         assert res_tilt.value == 0.0, f"Found {res_tilt.value}"
 
+    def test_correlation_error_matches_rolling(self):
+        rng = np.random.default_rng(0)
+        p0 = rng.random((6, 13))
+        p180 = rng.random((6, 13))
+        search_range = get_search_range(p0.shape[1])
+
+        result = calculate_correlation_error(p0, p180, search_range)
+
+        self.assertEqual((len(search_range), 6), result.shape)
+        expected = np.zeros(6)
+        for i, search_index in enumerate(search_range):
+            do_calculate_correlation_err(expected, search_index, (p0, p180), p0.shape[1])
+            np.testing.assert_allclose(result[i], expected)
+
+    def test_find_center_sub_pixel(self):
+        x = np.arange(64)
+        images = generate_images((2, 8, 64))
+        images.data[0] = np.exp(-0.5 * ((x - 35.3) / 4)**2)
+        # once flipped the peak is at 33.0, so the 0 degree projection has to be shifted by -2.3
+        images.proj180deg = ImageStack(np.exp(-0.5 * ((x - 30.0) / 4)**2)[np.newaxis, np.newaxis].repeat(8, axis=1))
+
+        res_cor, res_tilt = find_center(images, mock.create_autospec(Progress), sub_pixel=True)
+        self.assertAlmostEqual(res_cor.value, 32 + 1.15, delta=0.05)
+        self.assertAlmostEqual(res_tilt.value, 0.0)
+
+        res_cor, _ = find_center(images, mock.create_autospec(Progress))
+        self.assertEqual(res_cor.value, 33.0)
+
     def test_find_shift(self):
         images = generate_images((10, 10, 10))
         search_range = get_search_range(images.width)
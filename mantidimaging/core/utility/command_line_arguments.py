@@ -3,16 +3,23 @@
 from __future__ import annotations
 from logging import getLogger
 import os
-
-from mantidimaging.core.operations.loader import load_filter_packages
+from typing import Dict
 
 logger = getLogger(__name__)
 
-filter_names = [package.filter_name for package in load_filter_packages()]
-command_line_names = {}
+command_line_names: Dict[str, str] = {}
+
 
-for filter_name in filter_names:
-    command_line_names[filter_name.replace(" ", "-").lower()] = filter_name
+def _command_line_names() -> Dict[str, str]:
+    """
+    The filter names, keyed by the names used on the command line. The filters are loaded when first needed
+    rather than on import, as they import the GUI, which imports this module.
+    """
+    if not command_line_names:
+        from mantidimaging.core.operations.loader import load_filter_packages
+        for package in load_filter_packages():
+            command_line_names[package.filter_name.replace(" ", "-").lower()] = package.filter_name
+    return command_line_names
 
 
 def _valid_operation(operation: str):
@@ -21,7 +28,7 @@ def _valid_operation(operation: str):
     :param operation: The name of the operation.
     :return: True if it is a valid operation, False otherwise.
     """
-    return operation.lower() in command_line_names.keys()
+    return operation.lower() in _command_line_names().keys()
 
 
 def _log_and_exit(msg: str):
@@ -57,12 +64,12 @@ class CommandLineArguments:
                 if not cls._images_path:
                     _log_and_exit("No path given for initial operation. Exiting.")
                 elif not _valid_operation(operation):
-                    valid_filters = ", ".join(command_line_names.keys())
+                    valid_filters = ", ".join(_command_line_names().keys())
                     _log_and_exit(
                         f"{operation} is not a known operation. Available filters arguments are {valid_filters}."
                         " Exiting.")
                 else:
-                    cls._init_operation = command_line_names[operation]
+                    cls._init_operation = _command_line_names()[operation]
             if show_recon and not path:
                 _log_and_exit("No path given for reconstruction. Exiting.")
             else:
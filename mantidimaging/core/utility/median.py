@@ -0,0 +1,141 @@
+# Copyright (C) 2023 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+"""
+Median filtering of 2D images on the CPU.
+
+NaNs are treated as negative infinity while calculating the medians, so that they do not spread to the
+neighbouring pixels, and are kept in the result.
+
+Small kernels use scipy.ndimage.median_filter, which sorts the whole window for every pixel. Its cost grows
+with the kernel area, so large kernels use a sliding window histogram median (Huang's algorithm, with the
+coarse and fine histograms of Perreault and Hebert). The image is split into tiles, and the values in each
+tile are replaced by their ranks, so that the histograms are exact and the result is the same as SciPy's.
+The window slides along the rows of a tile, with batches of rows processed together. The batches are
+sized so that their histograms fit in HISTOGRAM_MEMORY_LIMIT.
+"""
+from __future__ import annotations
+
+import numpy as np
+import scipy.ndimage as scipy_ndimage
+
+# Kernels at least this size use the histogram median
+HISTOGRAM_MEDIAN_MIN_SIZE = 15
+
+# Bytes used by the histograms of a batch of rows in a tile
+HISTOGRAM_MEMORY_LIMIT = 64 * 1024**2
+
+# The numpy padding modes that extend the image in the same way as the scipy.ndimage modes
+_PAD_MODES = {'reflect': 'symmetric', 'mirror': 'reflect', 'nearest': 'edge', 'wrap': 'wrap', 'constant': 'constant'}
+
+
+def median_filter(data: np.ndarray, size: int, mode: str = 'reflect', keep_nans: bool = True) -> np.ndarray:
+    """
+    Median filter a 2D image, with a square kernel. The NaNs in the image are replaced while the SciPy filter
+    runs, and put back afterwards.
+
+    :param data: The image
+    :param size: Width of the kernel
+    :param mode: How the edges are handled, as in scipy.ndimage.median_filter
+    :param keep_nans: Put the NaNs back in the result. Otherwise the medians of their neighbourhoods are kept,
+                      which are negative infinity where most of the kernel is NaN.
+    :return: A new array with the filtered image
+    """
+    nans = np.isnan(data) if data.dtype.kind == 'f' else None
+    has_nans = nans is not None and nans.any()
+
+    if size >= HISTOGRAM_MEDIAN_MIN_SIZE and mode in _PAD_MODES and min(data.shape) >= size:
+        result = _histogram_median_filter(data, size, mode)
+    elif has_nans:
+        data[nans] = -np.inf
+        try:
+            result = scipy_ndimage.median_filter(data, size=size, mode=mode)
+        finally:
+            data[nans] = np.nan
+    else:
+        result = scipy_ndimage.median_filter(data, size=size, mode=mode)
+
+    if keep_nans and has_nans:
+        result[nans] = np.nan
+    return result
+
+
+def _tile_size(size: int) -> int:
+    # Larger tiles sort fewer overlapping values, but have more ranks to search for each pixel
+    return 64 if size < 64 else 128
+
+
+def _histogram_median_filter(data: np.ndarray, size: int, mode: str) -> np.ndarray:
+    # Pad in the same way as scipy, where the window of a pixel starts size // 2 before it
+    before, after = size // 2, (size - 1) // 2
+    padded = np.pad(data, ((before, after), (before, after)), mode=_PAD_MODES[mode])
+    result = np.empty_like(data)
+    tile = _tile_size(size)
+    for row in range(0, data.shape[0], tile):
+        for col in range(0, data.shape[1], tile):
+            out = result[row:row + tile, col:col + tile]
+            _median_tile(padded[row:row + out.shape[0] + size - 1, col:col + out.shape[1] + size - 1], size, out)
+    return result
+
+
+def _rows_per_batch(num_ranks: int, size: int, rows: int) -> int:
+    # Each row of a batch has a 32 bit count for every rank in the tile, and the ranks of its first window
+    # and their coarse bins while the histograms are filled
+    row_bytes = num_ranks * np.dtype(np.int32).itemsize + 2 * size * size * np.dtype(np.intp).itemsize
+    return max(1, min(rows, HISTOGRAM_MEMORY_LIMIT // row_bytes))
+
+
+def _median_tile(values: np.ndarray, size: int, out: np.ndarray):
+    rows = out.shape[0]
+    flat = values.ravel()
+    if flat.dtype.kind == 'f':
+        # NaNs sort as negative infinity, ahead of everything else
+        flat = np.where(np.isnan(flat), -np.inf, flat)
+    order = np.argsort(flat, kind='stable')
+    sorted_values = flat[order]
+    ranks = np.empty(flat.size, dtype=np.intp)
+    ranks[order] = np.arange(flat.size)
+    ranks = ranks.reshape(values.shape)
+
+    # Each fine bin covers a range of ranks. With about the same number of coarse and fine bins each
+    # search looks at about the width of the tile's values
+    fine_bins = 1 << int(np.sqrt(flat.size)).bit_length() - 1
+    num_coarse = -(-flat.size // fine_bins)
+    # The windows of the tile rows, over the columns entering and leaving as the window slides
+    windows = np.lib.stride_tricks.sliding_window_view(ranks, size, axis=0)[:rows]
+
+    batch = _rows_per_batch(num_coarse * fine_bins, size, rows)
+    for row in range(0, rows, batch):
+        _median_rows(windows[row:row + batch], sorted_values, size, fine_bins, num_coarse, out[row:row + batch])
+
+
+def _median_rows(windows: np.ndarray, sorted_values: np.ndarray, size: int, fine_bins: int, num_coarse: int,
+                 out: np.ndarray):
+    rows, cols = out.shape
+    row_ids = np.arange(rows)[:, np.newaxis]
+
+    fine = np.zeros((rows, num_coarse * fine_bins), dtype=np.int32)
+    first = windows[:, :size].reshape(rows, -1)
+    fine[row_ids, first] = 1
+    coarse_offsets = row_ids * num_coarse
+    coarse = np.bincount((coarse_offsets + first // fine_bins).ravel(), minlength=rows * num_coarse)
+    coarse = coarse.reshape(rows, num_coarse)
+
+    target = (size * size) // 2
+    for col in range(cols):
+        if col > 0:
+            leaving, entering = windows[:, col - 1], windows[:, col + size - 1]
+            # The ranks are unique, so each row's counts are changed at most once for each rank
+            fine[row_ids, leaving] -= 1
+            fine[row_ids, entering] += 1
+            coarse += np.bincount((coarse_offsets + entering // fine_bins).ravel(),
+                                  minlength=coarse.size).reshape(coarse.shape)
+            coarse -= np.bincount((coarse_offsets + leaving // fine_bins).ravel(),
+                                  minlength=coarse.size).reshape(coarse.shape)
+
+        # Find the coarse bin holding the median, then the fine bin within it
+        cumulative = np.cumsum(coarse, axis=1)
+        coarse_bin = np.argmax(cumulative > target, axis=1)
+        below = cumulative[row_ids[:, 0], coarse_bin] - coarse[row_ids[:, 0], coarse_bin]
+        fine_counts = fine.reshape(rows, num_coarse, fine_bins)[row_ids[:, 0], coarse_bin]
+        fine_bin = np.argmax(np.cumsum(fine_counts, axis=1) > (target - below)[:, np.newaxis], axis=1)
+        out[:, col] = sorted_values[coarse_bin * fine_bins + fine_bin]
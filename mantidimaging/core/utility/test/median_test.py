@@ -0,0 +1,97 @@
+# Copyright (C) 2023 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import unittest
+from unittest import mock
+
+import numpy as np
+import numpy.testing as npt
+import scipy.ndimage as scipy_ndimage
+from parameterized import parameterized
+
+from mantidimaging.core.utility import median
+
+
+def _scipy_median(data: np.ndarray, size: int, mode: str, keep_nans: bool = False) -> np.ndarray:
+    nans = np.isnan(data)
+    result = scipy_ndimage.median_filter(np.where(nans, -np.inf, data), size=size, mode=mode)
+    if keep_nans:
+        result[nans] = np.nan
+    return result
+
+
+class MedianTest(unittest.TestCase):
+    def setUp(self):
+        self.data = np.random.default_rng(2023).random((45, 70)).astype(np.float32)
+        self.data[0, 3] = np.nan
+        self.data[20:23, 30:34] = np.nan
+
+    @parameterized.expand([(mode, size) for mode in ['reflect', 'constant', 'nearest', 'mirror', 'wrap']
+                           for size in [15, 16, 31]])
+    def test_histogram_median_matches_scipy(self, mode, size):
+        npt.assert_equal(median._histogram_median_filter(self.data, size, mode), _scipy_median(self.data, size, mode))
+
+    def test_histogram_median_with_repeated_values(self):
+        data = np.round(self.data * 4)
+
+        npt.assert_equal(median._histogram_median_filter(data, 17, 'reflect'), _scipy_median(data, 17, 'reflect'))
+
+    @mock.patch("mantidimaging.core.utility.median._tile_size", return_value=16)
+    def test_histogram_median_over_tiles(self, _):
+        npt.assert_equal(median._histogram_median_filter(self.data, 21, 'mirror'),
+                         _scipy_median(self.data, 21, 'mirror'))
+
+    @mock.patch("mantidimaging.core.utility.median.HISTOGRAM_MEMORY_LIMIT", 200_000)
+    def test_histogram_median_in_row_batches(self):
+        with mock.patch("mantidimaging.core.utility.median._median_rows", wraps=median._median_rows) as median_rows:
+            result = median._histogram_median_filter(self.data, 21, 'reflect')
+
+        self.assertGreater(median_rows.call_count, 2)
+        npt.assert_equal(result, _scipy_median(self.data, 21, 'reflect'))
+
+    @parameterized.expand([(15, ), (501, ), (999, )])
+    def test_histogram_memory_is_bounded(self, size):
+        tile = median._tile_size(size)
+        num_ranks = (tile + size - 1)**2
+        rows = median._rows_per_batch(num_ranks, size, tile)
+
+        self.assertLessEqual(rows * num_ranks * np.dtype(np.int32).itemsize, median.HISTOGRAM_MEMORY_LIMIT)
+        self.assertGreaterEqual(rows, 1)
+
+    @parameterized.expand([("small kernel", 3, False), ("large kernel", 15, True),
+                           ("kernel larger than image", 51, False)])
+    def test_median_filter_backend(self, _, size, uses_histogram):
+        with mock.patch("mantidimaging.core.utility.median._histogram_median_filter",
+                        wraps=median._histogram_median_filter) as histogram_median:
+            result = median.median_filter(self.data.copy(), size, 'reflect')
+
+        self.assertEqual(uses_histogram, histogram_median.called)
+        npt.assert_equal(result, _scipy_median(self.data, size, 'reflect', keep_nans=True))
+
+    @parameterized.expand([("scipy", 3), ("histogram", 15)])
+    def test_median_filter_without_nans_kept(self, _, size):
+        data = self.data.copy()
+        data[:, :size] = np.nan
+
+        result = median.median_filter(data, size, 'reflect', keep_nans=False)
+
+        npt.assert_equal(result, _scipy_median(data, size, 'reflect'))
+        self.assertTrue(np.isneginf(result[:, 0]).all())
+
+    def test_median_filter_integers(self):
+        data = (self.data * 100).astype(np.uint16)
+
+        for size in [3, 15]:
+            npt.assert_equal(median.median_filter(data, size), scipy_ndimage.median_filter(data, size))
+
+    def test_median_filter_restores_input(self):
+        data = self.data.copy()
+
+        median.median_filter(data, 3, 'reflect')
+
+        npt.assert_equal(data, self.data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,7 @@ from __future__ import annotations
 from typing import Iterable
 
 from mantidimaging.core.data import ImageStack
-from mantidimaging.core.operation_history.operations import ops_to_partials, ImageOperation
+from mantidimaging.core.operation_history.operations import apply_operations, ImageOperation
 
 
 class OpHistoryCopyDialogModel:
@@ -16,7 +16,6 @@ class OpHistoryCopyDialogModel:
         if copy:
             self.images = self.images.copy()
 
-        to_apply = ops_to_partials(ops)
-        for op in to_apply:
-            op(self.images)
+        # The presenter adds the operations to the history
+        self.images = apply_operations(self.images, ops, record=False)
         return self.images
@@ -8,6 +8,8 @@ from unittest.mock import patch, MagicMock
 import numpy as np
 
 from mantidimaging.core.data import ImageStack
+from mantidimaging.core.operation_history import const, operations
+from mantidimaging.core.operation_history.operations import ImageOperation
 from mantidimaging.gui.dialogs.op_history_copy import OpHistoryCopyDialogModel
 
 
@@ -17,30 +19,36 @@ class OpHistoryCopyDialogModelTest(unittest.TestCase):
         self.images.data[:] = 100
         self.model = OpHistoryCopyDialogModel(self.images)
 
-    @patch('mantidimaging.gui.dialogs.op_history_copy.model.ops_to_partials')
-    def test_final_function_result_returned(self, mock_partial_conversions):
+    @patch('mantidimaging.gui.dialogs.op_history_copy.model.apply_operations')
+    def test_final_function_result_returned(self, mock_apply_operations):
         expected = self.images
-        call_mock = MagicMock()
+        ops = [MagicMock()]
+        mock_apply_operations.side_effect = lambda images, *args, **kwargs: images
 
-        def fake_filter(_):
-            call_mock()
-            return 123
-
-        mock_partial_conversions.return_value = [
-            fake_filter,
-        ]
-        # Value passed to apply_ops is only used in ops_to_partial, which is mocked for
-        # this test, so the value of the parameter shouldn't matter.
-        result = self.model.apply_ops([1], copy=False)
-        call_mock.assert_called_once()
+        result = self.model.apply_ops(ops, copy=False)
+        mock_apply_operations.assert_called_once_with(expected, ops, record=False)
         self.assertIs(expected, result)
         self.assertEqual(expected, result)
         np.testing.assert_equal(expected.data, result.data)
 
-        call_mock.reset_mock()
+        mock_apply_operations.reset_mock()
 
-        result = self.model.apply_ops([1], copy=True)
-        call_mock.assert_called_once()
+        result = self.model.apply_ops(ops, copy=True)
+        mock_apply_operations.assert_called_once()
         self.assertIsNot(expected, result)
         self.assertEqual(expected, result)
         np.testing.assert_equal(expected.data, result.data)
+
+    @patch('mantidimaging.core.operation_history.operations.ps.run_image_kernels',
+           wraps=operations.ps.run_image_kernels)
+    def test_element_wise_ops_applied_in_one_pass(self, run_image_kernels):
+        ops = [
+            ImageOperation("ArithmeticFilter", {"add_val": 1.0}, "Arithmetic"),
+            ImageOperation("ArithmeticFilter", {"mult_val": 2.0}, "Arithmetic"),
+        ]
+
+        result = self.model.apply_ops(ops, copy=False)
+
+        run_image_kernels.assert_called_once()
+        np.testing.assert_equal(202, result.data)
+        self.assertEqual([], result.metadata.get(const.OPERATION_HISTORY, []))
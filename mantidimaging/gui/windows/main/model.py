@@ -90,9 +90,13 @@ class MainWindowModel(object):
         images.filenames = filenames
         return True
 
-    def do_nexus_saving(self, dataset_id: uuid.UUID, path: str, sample_name: str) -> Optional[bool]:
+    def do_nexus_saving(self,
+                        dataset_id: uuid.UUID,
+                        path: str,
+                        sample_name: str,
+                        progress: Optional['Progress'] = None) -> Optional[bool]:
         if dataset_id in self.datasets and isinstance(self.datasets[dataset_id], StrictDataset):
-            saver.nexus_save(self.datasets[dataset_id], path, sample_name)  # type: ignore
+            saver.nexus_save(self.datasets[dataset_id], path, sample_name, progress=progress)  # type: ignore
             return True
         else:
             raise RuntimeError(f"Failed to get StrictDataset with ID {dataset_id}")
@@ -13,6 +13,7 @@ from PyQt5.QtWidgets import QTabBar, QApplication, QTreeWidgetItem
 
 from mantidimaging.core.data import ImageStack
 from mantidimaging.core.data.dataset import StrictDataset, MixedDataset, _get_stack_data_type
+from mantidimaging.core.data.median_cache import median_cache
 from mantidimaging.core.io.loader.loader import create_loading_parameters_for_file_path
 from mantidimaging.core.io.utility import find_projection_closest_to_180, THRESHOLD_180
 from mantidimaging.core.utility.data_containers import ProjectionAngles, LoadingParameters
@@ -145,14 +146,12 @@ class MainWindowPresenter(BasePresenter):
     def save_nexus_file(self):
         assert self.view.nexus_save_dialog is not None
         dataset_id = self.view.nexus_save_dialog.selected_dataset
-        start_async_task_view(self.view,
-                              self.model.do_nexus_saving,
-                              self._on_save_done, {
-                                  'dataset_id': dataset_id,
-                                  'path': self.view.nexus_save_dialog.save_path(),
-                                  'sample_name': self.view.nexus_save_dialog.sample_name()
-                              },
-                              busy=True)
+        kwargs = {
+            'dataset_id': dataset_id,
+            'path': self.view.nexus_save_dialog.save_path(),
+            'sample_name': self.view.nexus_save_dialog.sample_name()
+        }
+        start_async_task_view(self.view, self.model.do_nexus_saving, self._on_save_done, kwargs)
 
     def load_image_stack(self, file_path: str) -> None:
         start_async_task_view(self.view, self.model.load_images_into_mixed_dataset, self._on_stack_load_done,
@@ -607,6 +606,7 @@ class MainWindowPresenter(BasePresenter):
         # We need the ids of the stacks that have been deleted to tidy up the stack visualiser tabs
         removed_stack_ids = self.model.remove_container(container_id)
         for stack_id in removed_stack_ids:
+            median_cache.forget_stack(stack_id)
             if stack_id in self.stack_visualisers:
                 self._delete_stack(stack_id)
 
@@ -516,7 +516,7 @@ class MainWindowModelTest(unittest.TestCase):
         sample_name = "sample-name"
 
         self.model.do_nexus_saving(sd.id, path, sample_name)
-        nexus_save.assert_called_once_with(sd, path, sample_name)
+        nexus_save.assert_called_once_with(sd, path, sample_name, progress=None)
 
     def test_is_dataset_strict_returns_true(self):
         strict_ds = StrictDataset(generate_images())
@@ -416,6 +416,16 @@ class MainWindowPresenterTest(unittest.TestCase):
         self.presenter.remove_item_from_tree_view.assert_called_once_with(id_to_remove)
         self.view.model_changed.emit.assert_called_once()
 
+    @mock.patch("mantidimaging.gui.windows.main.presenter.median_cache")
+    def test_delete_container_forgets_cached_medians(self, mock_median_cache):
+        ids_to_remove = ["sample-to-remove", "proj_180_to_remove"]
+        self.model.remove_container = mock.Mock(return_value=ids_to_remove)
+        self.presenter.remove_item_from_tree_view = mock.Mock()
+
+        self.presenter._delete_container(ids_to_remove[0])
+
+        mock_median_cache.forget_stack.assert_has_calls([call(ids_to_remove[0]), call(ids_to_remove[1])])
+
     def test_delete_sample_stack_with_180(self):
         ids_to_remove = ["sample-to-remove", "proj_180_to_remove"]
         self.model.remove_container = mock.Mock(return_value=ids_to_remove)
@@ -757,14 +767,9 @@ class MainWindowPresenterTest(unittest.TestCase):
         nexus_save_dialog_mock.selected_dataset = dataset_id = "dataset-id"
 
         self.presenter.notify(Notification.NEXUS_SAVE)
-        start_async_mock.assert_called_once_with(self.presenter.view,
-                                                 self.model.do_nexus_saving,
-                                                 self.presenter._on_save_done, {
-                                                     'dataset_id': dataset_id,
-                                                     'path': save_path,
-                                                     'sample_name': sample_name
-                                                 },
-                                                 busy=True)
+        expected_kwargs = {'dataset_id': dataset_id, 'path': save_path, 'sample_name': sample_name}
+        start_async_mock.assert_called_once_with(self.presenter.view, self.model.do_nexus_saving,
+                                                 self.presenter._on_save_done, expected_kwargs)
 
     def test_get_dataset(self):
         test_ds = StrictDataset(generate_images())
@@ -52,12 +52,48 @@ def _missing_data_message(data_string: str) -> str:
     return f"The NeXus file does not contain the {data_string} data."
 
 
+def _strided_runs(frame_indices: np.ndarray) -> List[Tuple[int, int, int]]:
+    """
+    Split a sorted array of frame indices into runs with a constant stride, so that each run
+    can be read from the file as a single hyperslab.
+    :param frame_indices: The indices of the frames to read.
+    :return: A list of (start, stop, step) tuples covering all of the indices in order.
+    """
+    runs = []
+    i = 0
+    while i < frame_indices.size:
+        start = int(frame_indices[i])
+        step = int(frame_indices[i + 1] - start) if i + 1 < frame_indices.size else 1
+        end = i + 1
+        while end < frame_indices.size and frame_indices[end] - frame_indices[end - 1] == step:
+            end += 1
+        runs.append((start, int(frame_indices[end - 1]) + 1, step))
+        i = end
+    return runs
+
+
+def _read_frames_into(dataset: h5py.Dataset, frame_indices: np.ndarray, out: np.ndarray):
+    """
+    Read frames from a dataset straight into an existing array, without an intermediate copy.
+    HDF5 converts to the dtype of the output array while reading.
+    :param dataset: The h5py dataset containing the frames.
+    :param frame_indices: The indices of the frames to read.
+    :param out: The array to read into, with one image for each frame index.
+    """
+    dest = 0
+    for start, stop, step in _strided_runs(frame_indices):
+        count = len(range(start, stop, step))
+        dataset.read_direct(out, source_sel=np.s_[start:stop:step], dest_sel=np.s_[dest:dest + count])
+        dest += count
+
+
 class NexusLoadPresenter:
     view: 'NexusLoadDialog'
 
     def __init__(self, view: 'NexusLoadDialog'):
         self.view = view
-        self.nexus_file = None
+        self.nexus_file: Optional[h5py.File] = None
+        self.file_path = ""
         self.tomo_entry = None
         self.data = None
         self.tomo_path = ""
@@ -66,11 +102,12 @@ class NexusLoadPresenter:
         self.title = ""
         self.recon_data: List[np.array] = []
 
-        self.sample_array = None
-        self.dark_before_array = None
-        self.flat_before_array = None
-        self.flat_after_array = None
-        self.dark_after_array = None
+        # Frame indices in the data for each type of image. The frames are only read when the dataset is created.
+        self.sample_indices = np.empty(0, dtype=int)
+        self.dark_before_indices = np.empty(0, dtype=int)
+        self.flat_before_indices = np.empty(0, dtype=int)
+        self.flat_after_indices = np.empty(0, dtype=int)
+        self.dark_after_indices = np.empty(0, dtype=int)
 
     def notify(self, n: Notification):
         try:
@@ -83,41 +120,44 @@ class NexusLoadPresenter:
         """
         Try to open the NeXus file and display its contents on the view.
         """
-        file_path = self.view.filePathLineEdit.text()
+        self.close_nexus_file()
+        self.file_path = file_path = self.view.filePathLineEdit.text()
         try:
-            with h5py.File(file_path, "r") as self.nexus_file:
-                self.tomo_entry = self._look_for_nxtomo_entry()
-                if self.tomo_entry is None:
-                    return
-
-                self.data = self._look_for_tomo_data_and_update_view(DATA_PATH, 2)
-                if self.data is None:
-                    return
-
-                self.image_key_dataset = self._look_for_tomo_data_and_update_view(IMAGE_KEY_PATH, 0)
-                if self.image_key_dataset is None:
-                    return
-
-                self.image_key_dataset = self.image_key_dataset[:]
-
-                self.rotation_angles = self._look_for_tomo_data_and_update_view(ROTATION_ANGLE_PATH, 1)
-                if self.rotation_angles is None:
-                    return
-
-                if "units" not in self.rotation_angles.attrs.keys():
-                    logger.warning("No unit information found for rotation angles. Will infer from array values.")
-                    degrees = np.abs(self.rotation_angles).max() > 2 * np.pi
-                else:
-                    degrees = "deg" in self.rotation_angles.attrs["units"]
-                if degrees:
-                    self.rotation_angles = np.radians(self.rotation_angles)
-                self.rotation_angles = self.rotation_angles[:]
-
-                self._look_for_recon_entries()
-
-                self._get_data_from_image_key()
-                self.title = self._find_data_title()
+            # Kept open until the dataset has been created, so that the file is only opened once per load
+            self.nexus_file = h5py.File(file_path, "r")
+            self.tomo_entry = self._look_for_nxtomo_entry()
+            if self.tomo_entry is None:
+                return
+
+            self.data = self._look_for_tomo_data_and_update_view(DATA_PATH, 2)
+            if self.data is None:
+                return
+
+            self.image_key_dataset = self._look_for_tomo_data_and_update_view(IMAGE_KEY_PATH, 0)
+            if self.image_key_dataset is None:
+                return
+
+            self.image_key_dataset = self.image_key_dataset[:]
+
+            self.rotation_angles = self._look_for_tomo_data_and_update_view(ROTATION_ANGLE_PATH, 1)
+            if self.rotation_angles is None:
+                return
+
+            if "units" not in self.rotation_angles.attrs.keys():
+                logger.warning("No unit information found for rotation angles. Will infer from array values.")
+                degrees = np.abs(self.rotation_angles).max() > 2 * np.pi
+            else:
+                degrees = "deg" in self.rotation_angles.attrs["units"]
+            if degrees:
+                self.rotation_angles = np.radians(self.rotation_angles)
+            self.rotation_angles = self.rotation_angles[:]
+
+            self._look_for_recon_entries()
+
+            self._get_data_from_image_key()
+            self.title = self._find_data_title()
         except OSError:
+            self.close_nexus_file()
             unable_message = f"Unable to read NeXus data from {file_path}"
             logger.error(unable_message)
             self.view.show_data_error(unable_message)
@@ -219,36 +259,42 @@ class NexusLoadPresenter:
         """
         Looks for the projection and dark/flat before/after images and update the information on the view.
         """
-        self.sample_array = self._get_images(ImageKeys.Projections)
-        self.view.set_images_found(0, self.sample_array.size != 0, self.sample_array.shape)
-        if self.sample_array.size == 0:
+        self.sample_indices = self._get_image_indices(ImageKeys.Projections)
+        self.view.set_images_found(0, self.sample_indices.size != 0, self._images_shape(self.sample_indices))
+        if self.sample_indices.size == 0:
             self._missing_data_error("projection images")
             self.view.disable_ok_button()
             return
-        self.view.set_projections_increment(self.sample_array.shape[0])
+        self.view.set_projections_increment(self.sample_indices.size)
 
-        self.flat_before_array = self._get_images(ImageKeys.FlatField, True)
-        self.view.set_images_found(1, self.flat_before_array.size != 0, self.flat_before_array.shape)
+        self.flat_before_indices = self._get_image_indices(ImageKeys.FlatField, True)
+        self.view.set_images_found(1, self.flat_before_indices.size != 0, self._images_shape(self.flat_before_indices))
 
-        self.flat_after_array = self._get_images(ImageKeys.FlatField, False)
-        self.view.set_images_found(2, self.flat_after_array.size != 0, self.flat_after_array.shape)
+        self.flat_after_indices = self._get_image_indices(ImageKeys.FlatField, False)
+        self.view.set_images_found(2, self.flat_after_indices.size != 0, self._images_shape(self.flat_after_indices))
 
-        self.dark_before_array = self._get_images(ImageKeys.DarkField, True)
-        self.view.set_images_found(3, self.dark_before_array.size != 0, self.dark_before_array.shape)
+        self.dark_before_indices = self._get_image_indices(ImageKeys.DarkField, True)
+        self.view.set_images_found(3, self.dark_before_indices.size != 0, self._images_shape(self.dark_before_indices))
 
-        self.dark_after_array = self._get_images(ImageKeys.DarkField, False)
-        self.view.set_images_found(4, self.dark_after_array.size != 0, self.dark_after_array.shape)
+        self.dark_after_indices = self._get_image_indices(ImageKeys.DarkField, False)
+        self.view.set_images_found(4, self.dark_after_indices.size != 0, self._images_shape(self.dark_after_indices))
 
-    def _get_images(self, image_key_number: ImageKeys, before: Optional[bool] = None) -> np.ndarray:
+    def _images_shape(self, frame_indices: np.ndarray) -> Tuple[int, ...]:
         """
-        Retrieve images from the data based on an image key number.
+        The shape of the images at the given frame indices.
+        """
+        assert self.data is not None
+        return (frame_indices.size, ) + tuple(self.data.shape[1:])
+
+    def _get_image_indices(self, image_key_number: ImageKeys, before: Optional[bool] = None) -> np.ndarray:
+        """
+        Find the frames in the data that have an image key number.
         :param image_key_number: The image key number.
         :param before: True if the function should return before images, False if the function should return after
                        images. Ignored when getting projection images.
-        :return: The set of images that correspond with a given image key.
+        :return: The frame indices of the images that correspond with a given image key.
         """
         assert self.image_key_dataset is not None
-        assert self.data is not None
         if image_key_number is ImageKeys.Projections:
             indices = self.image_key_dataset[...] == image_key_number.value
         else:
@@ -257,8 +303,7 @@ class NexusLoadPresenter:
             else:
                 indices = self.image_key_dataset[:] == image_key_number.value
                 indices[:self.image_key_dataset.size // 2] = False
-        # Shouldn't have to use numpy.where but h5py doesn't allow indexing with bool arrays currently
-        return self.data[np.where(indices)]
+        return np.where(indices)[0]
 
     def _find_data_title(self) -> str:
         """
@@ -277,16 +322,19 @@ class NexusLoadPresenter:
         Create a LoadingDataset and title using the arrays that have been retrieved from the NeXus file.
         :return: A tuple containing the Dataset and the data title string.
         """
+        if not self.nexus_file:
+            self.nexus_file = h5py.File(self.file_path, "r")
+        self.data = self.nexus_file[self.tomo_path][DATA_PATH]
         sample_images = self._create_sample_images()
         sample_images.name = self.title
         ds = StrictDataset(sample=sample_images,
-                           flat_before=self._create_images_if_required(self.flat_before_array, "Flat Before",
+                           flat_before=self._create_images_if_required(self.flat_before_indices, "Flat Before",
                                                                        ImageKeys.FlatField.value),
-                           flat_after=self._create_images_if_required(self.flat_after_array, "Flat After",
+                           flat_after=self._create_images_if_required(self.flat_after_indices, "Flat After",
                                                                       ImageKeys.FlatField.value),
-                           dark_before=self._create_images_if_required(self.dark_before_array, "Dark Before",
+                           dark_before=self._create_images_if_required(self.dark_before_indices, "Dark Before",
                                                                        ImageKeys.DarkField.value),
-                           dark_after=self._create_images_if_required(self.dark_after_array, "Dark After",
+                           dark_after=self._create_images_if_required(self.dark_after_indices, "Dark After",
                                                                       ImageKeys.DarkField.value),
                            name=self.title)
 
@@ -302,12 +350,10 @@ class NexusLoadPresenter:
         :return: An ImageStack object containing projections. If given, projection angles, pixel size, and 180deg are
             also set.
         """
-        assert self.sample_array is not None
-
         # Create sample array and ImageStack object
-        self.sample_array = self.sample_array[self.view.start_widget.value():self.view.stop_widget.value():self.view.
-                                              step_widget.value()]
-        sample_images = self._create_images(self.sample_array, "Projections")
+        sample_indices = self.sample_indices[self.view.start_widget.value():self.view.stop_widget.value():self.view.
+                                             step_widget.value()]
+        sample_images = self._create_images(sample_indices, "Projections")
 
         # Set attributes
         sample_images.pixel_size = int(self.view.pixelSizeSpinBox.value())
@@ -318,35 +364,44 @@ class NexusLoadPresenter:
                                                    view.step_widget.value()]))
         return sample_images
 
-    def _create_images(self, data_array: np.ndarray, name: str) -> ImageStack:
+    def _create_images(self, frame_indices: np.ndarray, name: str) -> ImageStack:
         """
-        Use a data array to create an ImageStack object.
-        :param data_array: The images array obtained from the NeXus file.
+        Read frames from the NeXus file directly into shared memory to create an ImageStack object.
+        :param frame_indices: The indices of the frames in the NeXus data.
         :param name: The name of the image dataset.
         :return: An ImageStack object.
         """
-        data = pu.create_array(data_array.shape, self.view.pixelDepthComboBox.currentText())
-        data.array[:] = data_array
+        assert self.data is not None
+        data = pu.create_array(self._images_shape(frame_indices), self.view.pixelDepthComboBox.currentText())
+        _read_frames_into(self.data, frame_indices, data.array)
         return ImageStack(data, [f"{name} {self.title}"])
 
-    def _create_images_if_required(self, data_array: np.ndarray, name: str, image_key: int) -> Optional[ImageStack]:
+    def _create_images_if_required(self, frame_indices: np.ndarray, name: str, image_key: int) -> Optional[ImageStack]:
         """
         Create the ImageStack objects if the corresponding data was found in the NeXus file, and the user checked the
         "Use?" checkbox.
-        :param data_array: The images data array.
+        :param frame_indices: The indices of the frames in the NeXus data.
         :param name: The name of the images.
         :param image_key: The image key index for the image type.
         :return: An ImageStack object or None.
         """
-        if data_array.size == 0 or not self.view.checkboxes[name].isChecked():
+        if frame_indices.size == 0 or not self.view.checkboxes[name].isChecked():
             return None
-        image_stack = self._create_images(data_array, name)
+        image_stack = self._create_images(frame_indices, name)
         if image_stack is not None:
             projection_angles = self._read_rotation_angles(image_key, "Before" in name)
             if projection_angles is not None:
                 image_stack.set_projection_angles(ProjectionAngles(projection_angles))
         return image_stack
 
+    def close_nexus_file(self):
+        """
+        Close the NeXus file kept open since it was scanned.
+        """
+        if self.nexus_file:
+            self.nexus_file.close()
+        self.nexus_file = None
+
     def _create_recon_list(self) -> ReconList:
         """
         Uses the array of recon data extracted from the NeXus file to create a ReconList object.
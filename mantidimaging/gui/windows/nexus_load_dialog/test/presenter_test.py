@@ -11,7 +11,7 @@ from mantidimaging.test_helpers.unit_test_helper import generate_images
 
 from mantidimaging.core.data.dataset import StrictDataset
 from mantidimaging.gui.windows.nexus_load_dialog.presenter import _missing_data_message, TOMO_ENTRY, DATA_PATH, \
-    IMAGE_KEY_PATH, NexusLoadPresenter, ROTATION_ANGLE_PATH
+    IMAGE_KEY_PATH, NexusLoadPresenter, ROTATION_ANGLE_PATH, _strided_runs
 from mantidimaging.gui.windows.nexus_load_dialog.presenter import logger as nexus_logger
 from mantidimaging.gui.windows.nexus_load_dialog.view import NexusLoadDialog
 
@@ -64,7 +64,6 @@ class NexusLoaderTest(unittest.TestCase):
             self.view.checkboxes[image_type] = checkbox_mock
 
         self.nexus_loader = NexusLoadPresenter(self.view)
-        self.nexus_loader.nexus_file = self.nexus
 
         self.nexus_load_patcher = mock.patch("mantidimaging.gui.windows.nexus_load_dialog.presenter.h5py.File")
         self.nexus_load_mock = self.nexus_load_patcher.start()
@@ -98,6 +97,7 @@ class NexusLoaderTest(unittest.TestCase):
                 self.tomo_entry[IMAGE_KEY_PATH][self.n_images // 2:])
 
     def test_look_for_nx_tomo_entry_successful(self):
+        self.nexus_loader.nexus_file = self.nexus
         self.assertIsNotNone(self.nexus_loader._look_for_nxtomo_entry())
 
     def test_look_for_nx_tomo_entry_unsuccessful(self):
@@ -150,6 +150,17 @@ class NexusLoaderTest(unittest.TestCase):
         self.nexus_loader.scan_nexus_file()
         self.nexus_load_mock.assert_called_once_with(expected_file_path, "r")
 
+    def test_file_opened_once_per_load(self):
+        self.nexus_loader.scan_nexus_file()
+        self.nexus_loader.get_dataset()
+        self.nexus_load_mock.assert_called_once()
+
+    def test_close_nexus_file(self):
+        self.nexus_loader.scan_nexus_file()
+        self.nexus_loader.close_nexus_file()
+        self.assertIsNone(self.nexus_loader.nexus_file)
+        self.assertFalse(self.nexus)
+
     def test_complete_file_returns_expected_dataset_and_title(self):
         self.nexus_loader.scan_nexus_file()
         dataset, title = self.nexus_loader.get_dataset()
@@ -271,6 +282,29 @@ class NexusLoaderTest(unittest.TestCase):
         dataset = self.nexus_loader.get_dataset()[0]
         self.assertEqual(dataset.sample.data.shape[0], 1)
 
+    def test_step_load_reads_selected_frames(self):
+        self.tomo_entry[IMAGE_KEY_PATH][:] = 0
+        self.view.start_widget.value.return_value = 1
+        self.view.stop_widget.value.return_value = 9
+        self.view.step_widget.value.return_value = 3
+        self.nexus_loader.scan_nexus_file()
+        dataset = self.nexus_loader.get_dataset()[0]
+        np.testing.assert_array_almost_equal(dataset.sample.data, self.data_array[1:9:3])
+
+    def test_scan_does_not_read_frames(self):
+        with mock.patch("mantidimaging.gui.windows.nexus_load_dialog.presenter._read_frames_into") as read_frames:
+            self.nexus_loader.scan_nexus_file()
+            read_frames.assert_not_called()
+            self.nexus_loader.get_dataset()
+        self.assertEqual(5, read_frames.call_count)
+
+    def test_strided_runs(self):
+        self.assertEqual([], _strided_runs(np.array([], dtype=int)))
+        self.assertEqual([(4, 5, 1)], _strided_runs(np.array([4])))
+        self.assertEqual([(0, 2, 1), (6, 8, 1)], _strided_runs(np.array([0, 1, 6, 7])))
+        self.assertEqual([(1, 8, 3)], _strided_runs(np.array([1, 4, 7])))
+        self.assertEqual([(0, 3, 1), (5, 10, 2)], _strided_runs(np.array([0, 1, 2, 5, 7, 9])))
+
     def test_load_invalid_nexus_file(self):
         self.nexus_load_mock.side_effect = OSError
         unable_message = f"Unable to read NeXus data from {self.file_path}"
@@ -364,6 +398,7 @@ class NexusLoaderTest(unittest.TestCase):
         data.create_dataset("data", shape=recon.data.shape, dtype="float16")
         data["data"][:] = recon.data
 
+        self.nexus_loader.nexus_file = self.nexus
         self.nexus_loader._look_for_recon_entries()
         self.assertEqual(len(self.nexus_loader.recon_data), 1)
 
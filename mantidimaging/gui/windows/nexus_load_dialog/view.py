@@ -74,6 +74,9 @@ class NexusLoadDialog(BaseDialogView):
         self.tree.setItemWidget(child, 0, QLabel("Indices"))
 
         self.accepted.connect(self.parent_view.execute_nexus_load)
+        # The file is kept open from when it is scanned, until it has been loaded or the dialog is cancelled
+        self.accepted.connect(self.presenter.close_nexus_file)
+        self.rejected.connect(self.presenter.close_nexus_file)
 
         self.previewPushButton.clicked.connect(self._set_preview_step)
         self.allPushButton.clicked.connect(self._set_all_step)
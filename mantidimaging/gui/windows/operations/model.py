@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from functools import partial
-from typing import Callable, TYPE_CHECKING, List, Any, Dict
+from typing import Callable, TYPE_CHECKING, List, Any, Dict, Type
 
 from mantidimaging.core.operations.base_filter import BaseFilter, FilterGroup
 from mantidimaging.core.operations.loader import load_filter_packages
@@ -21,8 +21,8 @@ def ensure_tuple(val):
 
 
 class FiltersWindowModel(object):
-    filters: List[BaseFilter]
-    selected_filter: BaseFilter
+    filters: List[Type[BaseFilter]]
+    selected_filter: Type[BaseFilter]
     filter_widget_kwargs: Dict[str, Any]
 
     def __init__(self, presenter: 'FiltersWindowPresenter'):
@@ -128,7 +128,13 @@ class FiltersWindowModel(object):
         # Run filter
         exec_func: partial = self.selected_filter.execute_wrapper(**input_kwarg_widgets)
         exec_func.keywords["progress"] = progress
-        exec_func(images)
+        try:
+            exec_func(images)
+        except Exception:
+            # The filter may have changed some of the data before it failed, so results from the old data, such
+            # as the cached statistics and medians, must not be used
+            images.invalidate_statistics()
+            raise
         # store the executed filter in history if it executed successfully
         images.record_operation(
             self.selected_filter.__name__,  # type: ignore
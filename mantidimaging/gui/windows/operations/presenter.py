@@ -281,7 +281,7 @@ class FiltersWindowPresenter(BasePresenter):
                         # and running another async instance causes a race condition in the parallel module
                         # where the shared data can be removed in the middle of the operation of another operation
                         self._do_apply_filter_sync([stack.proj180deg])
-                if np.any(stack.data < 0):
+                if stack.statistics().negative_count > 0:
                     negative_stacks.append(stack)
 
             if self.view.roi_view is not None:
@@ -471,10 +471,7 @@ class FiltersWindowPresenter(BasePresenter):
         gui_error = [f"{operation_name} completed."]
 
         for stack in negative_stacks:
-            negative_slices = []
-            for i in range(len(stack.data)):
-                if np.any(stack.data[i] < 0):
-                    negative_slices.append(i)
+            negative_slices = stack.statistics().images_with_negative_values()
             stack_msg = f'Slices containing negative values in {stack.name}: '
             if len(negative_slices) == len(stack.data):
                 slices_msg = stack_msg + "all slices."
@@ -155,6 +155,17 @@ class FiltersWindowModelTest(unittest.TestCase):
         selected_filter_mock.validate_execute_kwargs.assert_called_once()
         callback_mock.assert_called_once_with(images, progress=progress_mock)
 
+    def test_failed_filter_invalidates_statistics(self):
+        images = th.generate_images()
+        version = images.version
+        selected_filter_mock = mock.Mock()
+        selected_filter_mock.execute_wrapper.return_value = partial(mock.Mock(side_effect=RuntimeError))
+        self.model.selected_filter = selected_filter_mock
+
+        self.assertRaises(RuntimeError, self.model.apply_to_images, images)
+
+        self.assertGreater(images.version, version)
+
     def test_get_filter_module_name(self):
         self.model.filters = mock.MagicMock()
 
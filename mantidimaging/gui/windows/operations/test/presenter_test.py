@@ -33,6 +33,7 @@ class FiltersWindowPresenterTest(unittest.TestCase):
         for _ in range(2):
             mock_stack = mock.Mock()
             mock_stack.data = np.zeros([3, 3, 3])
+            mock_stack.statistics.return_value.negative_count = 0
             mock_stack.has_proj180deg = mock.Mock(return_value=True)
             self.mock_stacks.append(mock_stack)
 
@@ -194,7 +195,7 @@ class FiltersWindowPresenterTest(unittest.TestCase):
         self.presenter.applying_to_all = False
         mock_stack = mock.MagicMock()
         mock_stack.has_proj180deg.return_value = True
-        mock_stack.data = np.array([i for i in range(3)])
+        mock_stack.statistics.return_value.negative_count = 0
         mock_stacks: List[ImageStack] = [mock_stack]
         mock_task = mock.MagicMock()
         mock_task.error = None
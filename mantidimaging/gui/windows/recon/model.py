@@ -1,8 +1,10 @@
 # Copyright (C) 2023 ISIS Rutherford Appleton Laboratory UKRI
 # SPDX - License - Identifier: GPL-3.0-or-later
 from __future__ import annotations
+import threading
+from collections import OrderedDict
 from logging import getLogger
-from typing import List, Optional, Tuple, Union, TYPE_CHECKING
+from typing import Any, List, Optional, Tuple, Union, TYPE_CHECKING
 
 import numpy as np
 
@@ -21,9 +23,15 @@ from mantidimaging.gui.windows.recon.point_table_model import CorTiltPointQtMode
 
 if TYPE_CHECKING:
     import uuid
+    from mantidimaging.core.data.stack_statistics import StackStatistics
 
 LOG = getLogger(__name__)
 
+# Memory used by the cached preview reconstructions, beyond which the least recently used are dropped
+PREVIEW_CACHE_MAX_BYTES = 256 * 1024**2
+# Slices either side of the preview slice that are reconstructed ahead of time while the user is idle
+PREVIEW_PREFETCH_DISTANCE = 2
+
 
 class ReconstructWindowModel(object):
     def __init__(self, data_model: CorTiltPointQtModel):
@@ -34,6 +42,9 @@ class ReconstructWindowModel(object):
         self.data_model = data_model
         self._last_result = None
         self._last_cor = ScalarCoR(0.0)
+        self._preview_cache: OrderedDict[Tuple[Any, ...], np.ndarray] = OrderedDict()
+        self._preview_cache_lock = threading.Lock()
+        self._prefetch_generation = 0
 
     @property
     def last_result(self):
@@ -92,6 +103,7 @@ class ReconstructWindowModel(object):
 
     def initial_select_data(self, images: 'ImageStack'):
         self._images = images
+        self.clear_preview_cache()
         self.reset_cor_model()
 
     def reset_cor_model(self):
@@ -136,18 +148,87 @@ class ReconstructWindowModel(object):
         if images is None:
             return None
 
-        # Perform single slice reconstruction
-        reconstructor = get_reconstructor_for(recon_params.algorithm)
+        # Perform single slice reconstruction, unless it has been done already
         output_shape = (1, images.width, images.width)
         recon: ImageStack = ImageStack.create_empty_image_stack(output_shape, images.dtype, images.metadata)
-        recon.data[0] = reconstructor.single_sino(images.sino(slice_idx),
-                                                  cor,
-                                                  images.projection_angles(recon_params.max_projection_angle),
-                                                  recon_params,
-                                                  progress=progress)
+        recon.data[0] = self._preview_slice(images, slice_idx, cor, recon_params, progress)
         recon = self._apply_pixel_size(recon, recon_params)
         return recon
 
+    def _preview_slice(self,
+                       images: ImageStack,
+                       slice_idx: int,
+                       cor: ScalarCoR,
+                       recon_params: ReconstructionParameters,
+                       progress: Optional[Progress] = None) -> np.ndarray:
+        key = (images.id, images.version, slice_idx, cor.value, repr(recon_params))
+        with self._preview_cache_lock:
+            if key in self._preview_cache:
+                self._preview_cache.move_to_end(key)
+                return self._preview_cache[key]
+
+        reconstructor = get_reconstructor_for(recon_params.algorithm)
+        sino = reconstructor.single_sino(images.sino(slice_idx),
+                                         cor,
+                                         images.projection_angles(recon_params.max_projection_angle),
+                                         recon_params,
+                                         progress=progress)
+
+        with self._preview_cache_lock:
+            self._preview_cache[key] = sino
+            cache_bytes = sum(cached.nbytes for cached in self._preview_cache.values())
+            while cache_bytes > PREVIEW_CACHE_MAX_BYTES and len(self._preview_cache) > 1:
+                _, dropped = self._preview_cache.popitem(last=False)
+                cache_bytes -= dropped.nbytes
+        return sino
+
+    def clear_preview_cache(self):
+        with self._preview_cache_lock:
+            self._preview_cache.clear()
+
+    def cancel_preview_prefetch(self):
+        """
+        Stop a running prefetch after the slice it is reconstructing, so that it does not hold up a preview.
+        """
+        self._prefetch_generation += 1
+
+    def preview_prefetch_slices(self) -> List[Tuple[int, ScalarCoR]]:
+        """
+        The slices around the preview slice to reconstruct ahead of time, closest first, with their CoRs.
+        """
+        if self.images is None:
+            return []
+
+        slices = []
+        centre = self.preview_slice_idx
+        for distance in range(1, PREVIEW_PREFETCH_DISTANCE + 1):
+            for slice_idx in (centre + distance, centre - distance):
+                if 0 <= slice_idx < self.images.height:
+                    cor = ScalarCoR(
+                        self.data_model.get_cor_from_regression(slice_idx)) if self.has_results else self.last_cor
+                    slices.append((slice_idx, cor))
+        return slices
+
+    def prefetch_preview_recons(self,
+                                images: ImageStack,
+                                slices: List[Tuple[int, ScalarCoR]],
+                                recon_params: ReconstructionParameters,
+                                progress: Progress = None) -> bool:
+        """
+        Reconstruct slices into the preview cache, in order. This runs in a worker thread, so everything it
+        needs is passed in rather than read from the model.
+
+        :param images: The stack to reconstruct from
+        :param slices: The indices of the slices with their CoRs, from preview_prefetch_slices
+        """
+        generation = self._prefetch_generation
+        for slice_idx, cor in slices:
+            if generation != self._prefetch_generation:
+                break
+            self._preview_slice(images, slice_idx, cor, recon_params)
+        # Async task needs a non-None result of some sort
+        return True
+
     def run_full_recon(self, recon_params: ReconstructionParameters, progress: Progress) -> Optional[ImageStack]:
         # Ensure we have some sample data
         images = self.images
@@ -257,12 +338,7 @@ class ReconstructWindowModel(object):
         reconstructor = get_reconstructor_for(recon_params.algorithm)
         progress = Progress.ensure_instance(progress, num_steps=len(slices))
         progress.update(0, msg=f"Calculating COR for slice {slices[0]}")
-        cors = []
-        for idx, slice in enumerate(slices):
-            cor = reconstructor.find_cor(self.images, slice, initial_cor[idx], recon_params)
-            cors.append(cor)
-            progress.update(msg=f"Calculating COR for slice {slice}")
-        return cors
+        return reconstructor.find_cors(self.images, list(slices), initial_cor, recon_params, progress)
 
     def auto_find_correlation(self, progress: Progress) -> Tuple[ScalarCoR, Degrees]:
         return find_center(self.images, progress)
@@ -272,14 +348,18 @@ class ReconstructWindowModel(object):
         return images.has_proj180deg() and images.height == images.proj180deg.height \
                and images.width == images.proj180deg.width
 
+    def _statistics(self) -> StackStatistics:
+        assert self._images is not None
+        return self._images.statistics()
+
     def stack_contains_nans(self) -> bool:
-        return np.any(np.isnan(self.images.data))
+        return self._statistics().nan_count > 0
 
     def stack_contains_zeroes(self) -> bool:
-        return not np.all(self.images.data)
+        return self._statistics().zero_count > 0
 
     def stack_contains_negative_values(self) -> bool:
-        return np.any(self.images.data < 0)
+        return self._statistics().negative_count > 0
 
     @property
     def stack_id(self):
@@ -9,6 +9,7 @@ from logging import getLogger
 from typing import TYPE_CHECKING, Any, Dict, List, Optional, Callable, Set
 
 import numpy as np
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QWidget
 
 from mantidimaging.core.data import ImageStack
@@ -21,6 +22,9 @@ from mantidimaging.gui.windows.recon.model import ReconstructWindowModel
 
 LOG = getLogger(__name__)
 
+# Time without a new preview request before the neighbouring slices are reconstructed ahead of time
+PREVIEW_PREFETCH_IDLE_MS = 1000
+
 if TYPE_CHECKING:
     from mantidimaging.gui.windows.recon.view import ReconstructWindowView  # pragma: no cover
     from mantidimaging.gui.windows.main import MainWindowView
@@ -72,6 +76,12 @@ class ReconstructWindowPresenter(BasePresenter):
         self.recon_is_running = False
         self.async_tracker: Set[Any] = set()
 
+        self.prefetch_timer = QTimer()
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.setInterval(PREVIEW_PREFETCH_IDLE_MS)
+        self.prefetch_timer.timeout.connect(self._prefetch_preview_slices)
+        self.prefetch_worker: Optional[TaskWorkerThread] = None
+
         self.main_window.stack_changed.connect(self.handle_stack_changed)
         self.stack_changed_pending = False
         self.stack_selection_change_pending = False
@@ -185,6 +195,7 @@ class ReconstructWindowPresenter(BasePresenter):
         self.view.update_projection(img_data, self.model.preview_slice_idx, self.model.tilt_angle)
 
     def handle_stack_changed(self):
+        self.model.clear_preview_cache()
         if self.view.isVisible():
             self.model.reset_cor_model()
             self.do_update_projection()
@@ -226,6 +237,9 @@ class ReconstructWindowPresenter(BasePresenter):
                               tracker=self.async_tracker)
 
     def _get_reconstruct_slice(self, cor, slice_idx: int, call_back: Callable[[TaskWorkerThread], None]) -> None:
+        # Don't let the slices being reconstructed ahead of time hold up the one that is wanted now
+        self.prefetch_timer.stop()
+        self.model.cancel_preview_prefetch()
         # If no COR is provided and there are regression results then calculate
         # the COR for the selected preview slice
         cor = self.model.get_me_a_cor(cor)
@@ -270,6 +284,29 @@ class ReconstructWindowPresenter(BasePresenter):
             # We copy the preview data out of shared memory when passing it into update_recon_preview so that it
             # will still be available after this function ends
             self.view.update_recon_preview(np.copy(images.data[0]), reset_roi)
+            self.prefetch_timer.start()
+
+    def _prefetch_preview_slices(self):
+        if self.model.images is None or self.recon_is_running or self.prefetch_worker is not None:
+            return
+
+        worker = TaskWorkerThread()
+        worker.task_function = self.model.prefetch_preview_recons
+        worker.kwargs = {
+            'images': self.model.images,
+            'slices': self.model.preview_prefetch_slices(),
+            'recon_params': self.view.recon_params()
+        }
+        worker.finished.connect(self._on_prefetch_done)
+        self.prefetch_worker = worker
+        self.async_tracker.add(worker)
+        worker.start()
+
+    def _on_prefetch_done(self):
+        if self.prefetch_worker is not None:
+            self.prefetch_worker.wait()
+            self.async_tracker.discard(self.prefetch_worker)
+            self.prefetch_worker = None
 
     def do_stack_reconstruct_slice(self, cor=None, slice_idx: Optional[int] = None):
         self.view.set_recon_buttons_enabled(False)
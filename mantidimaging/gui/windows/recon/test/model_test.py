@@ -10,6 +10,7 @@ import numpy as np
 from mantidimaging.core.data import ImageStack
 from mantidimaging.core.operation_history import const
 from mantidimaging.core.reconstruct.astra_recon import allowed_recon_kwargs as astra_allowed_kwargs
+from mantidimaging.core.reconstruct.base_recon import BaseRecon
 from mantidimaging.core.reconstruct.tomopy_recon import allowed_recon_kwargs as tomopy_allowed_kwargs
 from mantidimaging.core.reconstruct.cil_recon import allowed_recon_kwargs as cil_allowed_kwargs
 from mantidimaging.core.rotation.data_model import Point
@@ -111,6 +112,106 @@ class ReconWindowModelTest(unittest.TestCase):
         assert_called_once_with(mock_reconstructor.single_sino, expected_sino, expected_cor,
                                 self.model.images.projection_angles(), expected_recon_params)
 
+    @mock.patch('mantidimaging.gui.windows.recon.model.get_reconstructor_for')
+    def test_run_preview_recon_uses_cache(self, mock_get_reconstructor_for):
+        single_sino = mock_get_reconstructor_for.return_value.single_sino
+        single_sino.side_effect = lambda *args, **kwargs: np.random.rand(256, 256)
+        recon_params = ReconstructionParameters("FBP_CUDA", "ram-lak")
+
+        first = self.model.run_preview_recon(5, ScalarCoR(15), recon_params)
+        second = self.model.run_preview_recon(5, ScalarCoR(15), recon_params)
+
+        single_sino.assert_called_once()
+        np.testing.assert_equal(first.data, second.data)
+
+    @mock.patch('mantidimaging.gui.windows.recon.model.get_reconstructor_for')
+    def test_run_preview_recon_cache_key(self, mock_get_reconstructor_for):
+        single_sino = mock_get_reconstructor_for.return_value.single_sino
+        single_sino.return_value = np.zeros((256, 256))
+        recon_params = ReconstructionParameters("FBP_CUDA", "ram-lak")
+
+        self.model.run_preview_recon(5, ScalarCoR(15), recon_params)
+        self.model.run_preview_recon(4, ScalarCoR(15), recon_params)
+        self.model.run_preview_recon(5, ScalarCoR(16), recon_params)
+        self.model.run_preview_recon(5, ScalarCoR(15), ReconstructionParameters("FBP_CUDA", "shepp-logan"))
+        self.model.images.record_operation("Test", "Test")
+        self.model.run_preview_recon(5, ScalarCoR(15), recon_params)
+        self.model.images.invalidate_statistics()
+        self.model.run_preview_recon(5, ScalarCoR(15), recon_params)
+
+        self.assertEqual(6, single_sino.call_count)
+
+    @mock.patch('mantidimaging.gui.windows.recon.model.get_reconstructor_for')
+    def test_clear_preview_cache(self, mock_get_reconstructor_for):
+        single_sino = mock_get_reconstructor_for.return_value.single_sino
+        single_sino.return_value = np.zeros((256, 256))
+        recon_params = ReconstructionParameters("FBP_CUDA", "ram-lak")
+
+        self.model.run_preview_recon(5, ScalarCoR(15), recon_params)
+        self.model.clear_preview_cache()
+        self.model.run_preview_recon(5, ScalarCoR(15), recon_params)
+
+        self.assertEqual(2, single_sino.call_count)
+
+    @mock.patch('mantidimaging.gui.windows.recon.model.PREVIEW_CACHE_MAX_BYTES', 2 * 256 * 256 * 8)
+    @mock.patch('mantidimaging.gui.windows.recon.model.get_reconstructor_for')
+    def test_preview_cache_drops_least_recently_used(self, mock_get_reconstructor_for):
+        single_sino = mock_get_reconstructor_for.return_value.single_sino
+        single_sino.return_value = np.zeros((256, 256))
+        recon_params = ReconstructionParameters("FBP_CUDA", "ram-lak")
+
+        for slice_idx in [1, 2, 1, 3, 1, 2]:
+            self.model.run_preview_recon(slice_idx, ScalarCoR(15), recon_params)
+
+        # slice 2 was dropped for slice 3, then slice 3 for slice 2
+        self.assertEqual(4, single_sino.call_count)
+
+    def test_preview_prefetch_slices(self):
+        self.model.preview_slice_idx = 1
+        self.model.last_cor = ScalarCoR(15)
+
+        slices = self.model.preview_prefetch_slices()
+
+        self.assertEqual([2, 0, 3], [slice_idx for slice_idx, _ in slices])
+        self.assertTrue(all(cor.value == 15 for _, cor in slices))
+
+    def test_preview_prefetch_slices_uses_regression(self):
+        self.model.preview_slice_idx = 1
+        self.model.data_model = mock.Mock(has_results=True)
+        self.model.data_model.get_cor_from_regression.side_effect = lambda slice_idx: 10.0 + slice_idx
+
+        slices = self.model.preview_prefetch_slices()
+
+        self.assertEqual([(2, 12.0), (0, 10.0), (3, 13.0)], [(slice_idx, cor.value) for slice_idx, cor in slices])
+
+    @mock.patch('mantidimaging.gui.windows.recon.model.get_reconstructor_for')
+    def test_prefetch_preview_recons(self, mock_get_reconstructor_for):
+        single_sino = mock_get_reconstructor_for.return_value.single_sino
+        single_sino.return_value = np.zeros((256, 256))
+        recon_params = ReconstructionParameters("FBP_CUDA", "ram-lak")
+        slices = [(2, ScalarCoR(15)), (0, ScalarCoR(15)), (3, ScalarCoR(15))]
+
+        self.model.prefetch_preview_recons(self.model.images, slices, recon_params)
+
+        prefetched = [call.args[0] for call in single_sino.call_args_list]
+        expected = [self.model.images.sino(i) for i in [2, 0, 3]]
+        self.assertEqual(len(expected), len(prefetched))
+        for sino, expected_sino in zip(prefetched, expected):
+            np.testing.assert_equal(sino, expected_sino)
+
+        self.model.run_preview_recon(2, ScalarCoR(15), recon_params)
+        self.assertEqual(3, single_sino.call_count)
+
+    @mock.patch('mantidimaging.gui.windows.recon.model.get_reconstructor_for')
+    def test_prefetch_preview_recons_stops_when_cancelled(self, mock_get_reconstructor_for):
+        single_sino = mock_get_reconstructor_for.return_value.single_sino
+        single_sino.side_effect = lambda *args, **kwargs: self.model.cancel_preview_prefetch() or np.zeros((256, 256))
+
+        self.model.prefetch_preview_recons(self.model.images, [(2, ScalarCoR(15)), (0, ScalarCoR(15))],
+                                           ReconstructionParameters("FBP_CUDA", "ram-lak"))
+
+        single_sino.assert_called_once()
+
     def test_apply_pixel_size(self):
         images = generate_images()
 
@@ -185,6 +286,29 @@ class ReconWindowModelTest(unittest.TestCase):
         with mock.patch("mantidimaging.gui.windows.recon.model.CudaChecker.cuda_is_present", return_value=True):
             assert self.model.load_allowed_recon_kwargs() == allowed_args
 
+    @mock.patch('mantidimaging.gui.windows.recon.model.get_reconstructor_for')
+    def test_auto_find_minimisation_sqsum_searches_all_slices_at_once(self, get_reconstructor_for):
+        reconstructor = get_reconstructor_for.return_value
+        reconstructor.find_cors.return_value = [1.0, 2.0]
+        params = ReconstructionParameters("FBP_CUDA", "ram-lak")
+        progress = mock.Mock()
+
+        result = self.model.auto_find_minimisation_sqsum([3, 5], params, 4.0, progress)
+
+        self.assertEqual([1.0, 2.0], result)
+        reconstructor.find_cors.assert_called_once_with(self.model.images, [3, 5], [4.0, 4.0], params, progress)
+
+    @mock.patch.object(BaseRecon, 'find_cor', side_effect=[1.0, 2.0])
+    def test_base_find_cors_searches_each_slice(self, find_cor):
+        params = ReconstructionParameters("FBP_CUDA", "ram-lak")
+        progress = mock.Mock()
+
+        result = BaseRecon.find_cors(self.data, [3, 5], [4.0, 6.0], params, progress)
+
+        self.assertEqual([1.0, 2.0], result)
+        find_cor.assert_has_calls([mock.call(self.data, 3, 4.0, params), mock.call(self.data, 5, 6.0, params)])
+        self.assertEqual(2, progress.update.call_count)
+
     def test_stack_contains_nans_returns_false(self):
         self.model.images.data = np.array([1, 2, 3])
         self.assertFalse(self.model.stack_contains_nans())
@@ -189,6 +189,53 @@ class ReconWindowPresenterTest(unittest.TestCase):
 
         self.view.update_recon_preview.assert_called_once_with(image_mock, False)
 
+    def test_do_preview_reconstruct_slice_done_schedules_prefetch(self):
+        self.presenter.prefetch_timer = mock.Mock()
+        task_mock = mock.Mock(result=mock.Mock(data=[mock.Mock()]), error=None)
+
+        self.presenter._on_preview_reconstruct_slice_done(task_mock)
+
+        self.presenter.prefetch_timer.start.assert_called_once()
+
+    @mock.patch('mantidimaging.gui.windows.recon.presenter.start_async_task_view')
+    def test_get_reconstruct_slice_cancels_prefetch(self, _):
+        self.presenter.prefetch_timer = mock.Mock()
+        self.presenter.model.cancel_preview_prefetch = mock.Mock()
+
+        self.presenter._get_reconstruct_slice(ScalarCoR(15), 5, mock.Mock())
+
+        self.presenter.prefetch_timer.stop.assert_called_once()
+        self.presenter.model.cancel_preview_prefetch.assert_called_once()
+
+    @mock.patch('mantidimaging.gui.windows.recon.presenter.TaskWorkerThread')
+    def test_prefetch_preview_slices(self, mock_worker_class):
+        self.presenter.model.preview_prefetch_slices = mock.Mock()
+        self.presenter._prefetch_preview_slices()
+
+        worker = mock_worker_class.return_value
+        self.assertEqual(self.presenter.model.prefetch_preview_recons, worker.task_function)
+        self.assertEqual(
+            {
+                'images': self.presenter.model.images,
+                'slices': self.presenter.model.preview_prefetch_slices.return_value,
+                'recon_params': self.view.recon_params.return_value
+            }, worker.kwargs)
+        worker.start.assert_called_once()
+        self.assertIs(worker, self.presenter.prefetch_worker)
+        self.assertIn(worker, self.presenter.async_tracker)
+
+        self.presenter._on_prefetch_done()
+        self.assertIsNone(self.presenter.prefetch_worker)
+        self.assertNotIn(worker, self.presenter.async_tracker)
+
+    @mock.patch('mantidimaging.gui.windows.recon.presenter.TaskWorkerThread')
+    def test_prefetch_preview_slices_not_while_reconstructing(self, mock_worker_class):
+        self.presenter.recon_is_running = True
+
+        self.presenter._prefetch_preview_slices()
+
+        mock_worker_class.assert_not_called()
+
     def test_do_preview_reconstruct_slice_raises(self):
         task_mock = mock.Mock(error=ValueError())
 
@@ -442,6 +489,14 @@ class ReconWindowPresenterTest(unittest.TestCase):
 
         self.presenter.do_preview_reconstruct_slice.assert_called_once_with(reset_roi=True)
 
+    def test_handle_stack_changed_clears_preview_cache(self):
+        self.view.isVisible.return_value = False
+        self.presenter.model.clear_preview_cache = mock.Mock()
+
+        self.presenter.handle_stack_changed()
+
+        self.presenter.model.clear_preview_cache.assert_called_once()
+
     def test_handle_stack_changed_updates_preview_indexes(self):
         self.view.isVisible.return_value = True
         self.presenter.model.reset_cor_model = mock.Mock()
@@ -0,0 +1,211 @@
+# Copyright (C) 2023 ISIS Rutherford Appleton Laboratory UKRI
+# SPDX - License - Identifier: GPL-3.0-or-later
+from __future__ import annotations
+
+import json
+import os
+import unittest
+from unittest import mock
+
+import numpy as np
+import numpy.testing as npt
+
+from mantidimaging import batch
+from mantidimaging.core.data import ImageStack
+from mantidimaging.core.operation_history import const
+from mantidimaging.test_helpers import FileOutputtingTestCase
+from mantidimaging.test_helpers.start_qapplication import start_multiprocessing_pool
+
+
+def _entry(name, kwargs, display_name=""):
+    return {
+        const.OPERATION_NAME: name,
+        const.OPERATION_KEYWORD_ARGS: kwargs,
+        const.OPERATION_DISPLAY_NAME: display_name
+    }
+
+
+ARITHMETIC = _entry("ArithmeticFilter", {"add_val": 1.0}, "Arithmetic")
+FLAT_FIELDING = _entry("FlatFieldFilter", {"selected_flat_fielding": "Only Before", "use_dark": True}, "Flat-fielding")
+COR_TILT = _entry(const.OPERATION_NAME_COR_TILT_FINDING, {
+    const.COR_TILT_ROTATION_CENTRE: 12.5,
+    const.COR_TILT_TILT_ANGLE_DEG: 0.5
+})
+
+
+class BatchArgsTest(unittest.TestCase):
+    def test_parse_args(self):
+        args = batch.parse_args(["--input-path", "in", "--output-path", "out", "--flat-before", "flats"])
+
+        self.assertEqual("in", args.input_path)
+        self.assertEqual("flats", args.flat_before)
+        self.assertIsNone(args.dark_before)
+        self.assertFalse(args.reconstruct)
+        self.assertEqual("float32", args.pixel_depth)
+
+    def test_parse_args_slab_size_with_reconstruct(self):
+        with mock.patch("sys.stderr"):
+            self.assertRaises(SystemExit, batch.parse_args,
+                              ["--input-path", "in", "--output-path", "out", "--slab-size", "4", "--reconstruct"])
+
+    @mock.patch("mantidimaging.batch.CudaChecker")
+    def test_default_algorithm_with_cuda(self, cuda_checker):
+        cuda_checker.return_value.cuda_is_present.return_value = True
+        self.assertEqual(batch.CUDA_ALGORITHM, batch.default_algorithm())
+
+    @mock.patch("mantidimaging.batch.CudaChecker")
+    def test_default_algorithm_without_cuda(self, cuda_checker):
+        cuda_checker.return_value.cuda_is_present.return_value = False
+        self.assertEqual(batch.CPU_ALGORITHM, batch.default_algorithm())
+
+    def test_find_cor_and_tilt_from_history(self):
+        self.assertEqual((12.5, 0.5), batch.find_cor_and_tilt([ARITHMETIC, COR_TILT], 40, None, None))
+
+    def test_find_cor_and_tilt_arguments_take_priority(self):
+        self.assertEqual((3.0, 1.0), batch.find_cor_and_tilt([COR_TILT], 40, 3.0, 1.0))
+
+    def test_find_cor_and_tilt_defaults(self):
+        self.assertEqual((20.0, 0.0), batch.find_cor_and_tilt([ARITHMETIC], 40, None, None))
+
+    def test_replayable_operations_skips_cor_tilt(self):
+        ops = batch.replayable_operations([ARITHMETIC, COR_TILT])
+
+        self.assertEqual(["ArithmeticFilter"], [op.filter_name for op in ops])
+
+    def test_check_replayable_missing_flats(self):
+        ops = batch.replayable_operations([ARITHMETIC, FLAT_FIELDING])
+
+        self.assertRaisesRegex(ValueError, "'Flat-fielding' needs --flat-before, --dark-before", batch.check_replayable,
+                               ops, ["flat_after"])
+        batch.check_replayable(ops, ["flat_before", "dark_before"])
+
+    def test_check_replayable_roi_flat_field(self):
+        ops = batch.replayable_operations([
+            _entry("RoiNormalisationFilter", {"normalisation_mode": "Flat Field"}, "ROI"),
+            _entry("RoiNormalisationFilter", {"normalisation_mode": "Stack Average"}, "ROI average")
+        ])
+
+        self.assertRaisesRegex(ValueError, "'ROI' needs --flat-before$", batch.check_replayable, ops, [])
+
+    def test_check_replayable_monitor_normalisation(self):
+        ops = batch.replayable_operations([_entry("MonitorNormalisation", {}, "Monitor Normalisation")])
+
+        self.assertRaisesRegex(ValueError, "'Monitor Normalisation' can not be replayed", batch.check_replayable, ops,
+                               [])
+
+    def test_add_stack_inputs(self):
+        flat, dark = mock.Mock(), mock.Mock()
+        ops = batch.add_stack_inputs(batch.replayable_operations([ARITHMETIC, FLAT_FIELDING]), {
+            "flat_before": flat,
+            "dark_before": dark
+        })
+
+        self.assertEqual({"add_val": 1.0}, ops[0].filter_kwargs)
+        self.assertIs(flat, ops[1].filter_kwargs["flat_before"])
+        self.assertIs(dark, ops[1].filter_kwargs["dark_before"])
+        self.assertNotIn("flat_after", ops[1].filter_kwargs)
+
+
+@start_multiprocessing_pool
+class BatchRunTest(FileOutputtingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.history_file = os.path.join(self.output_directory, "history.json")
+        self.data = np.full((4, 6, 8), 3.0, dtype=np.float32)
+
+    def _write_history(self, history):
+        with open(self.history_file, "w") as f:
+            json.dump({const.OPERATION_HISTORY: history}, f)
+
+    def _args(self, *extra):
+        return batch.parse_args(
+            ["--input-path", "in", "--output-path", "out", "--operation-history", self.history_file, *extra])
+
+    def test_replay_history(self):
+        images = ImageStack(self.data.copy())
+
+        result = batch.replay_history(images, batch.replayable_operations([ARITHMETIC, COR_TILT]))
+
+        npt.assert_equal(result.data, self.data + 1)
+        history = result.metadata[const.OPERATION_HISTORY]
+        self.assertEqual(["ArithmeticFilter"], [entry[const.OPERATION_NAME] for entry in history])
+
+    def test_replay_flat_fielding(self):
+        images = ImageStack(self.data.copy())
+        flat, dark = ImageStack(np.full((2, 6, 8), 5.0, dtype=np.float32)), ImageStack(np.ones((2, 6, 8), np.float32))
+        ops = batch.add_stack_inputs(batch.replayable_operations([FLAT_FIELDING]), {
+            "flat_before": flat,
+            "dark_before": dark
+        })
+
+        result = batch.replay_history(images, ops)
+
+        npt.assert_allclose(result.data, 0.5)
+
+    @mock.patch("mantidimaging.batch.saver")
+    @mock.patch("mantidimaging.batch.loader")
+    def test_run(self, loader, saver):
+        self._write_history([ARITHMETIC])
+        images = ImageStack(self.data.copy())
+        images.record_operation("ArithmeticFilter", "Arithmetic", add_val=1.0)
+        loader.load.return_value = images
+
+        batch.run(self._args("--pixel-depth", "int16"))
+
+        saved = saver.image_save.call_args.args[0]
+        npt.assert_equal(saved.data, self.data + 1)
+        # the history loaded with the images is replaced by the replayed operations
+        self.assertEqual(1, len(saved.metadata[const.OPERATION_HISTORY]))
+        self.assertEqual("out", saver.image_save.call_args.args[1])
+        self.assertEqual("int16", saver.image_save.call_args.kwargs["pixel_depth"])
+
+    @mock.patch("mantidimaging.batch.saver")
+    @mock.patch("mantidimaging.batch.loader")
+    def test_run_loads_flats_and_darks(self, loader, saver):
+        self._write_history([FLAT_FIELDING])
+        flat, dark = ImageStack(np.full((2, 6, 8), 5.0, dtype=np.float32)), ImageStack(np.ones((2, 6, 8), np.float32))
+        loader.load.side_effect = [flat, dark, ImageStack(self.data.copy())]
+
+        batch.run(self._args("--flat-before", "flats", "--dark-before", "darks"))
+
+        self.assertEqual(["flats", "darks", "in"], [call.args[0] for call in loader.load.call_args_list])
+        npt.assert_allclose(saver.image_save.call_args.args[0].data, 0.5)
+
+    @mock.patch("mantidimaging.batch.saver")
+    @mock.patch("mantidimaging.batch.loader")
+    def test_run_rejects_history_before_loading(self, loader, saver):
+        self._write_history([ARITHMETIC, FLAT_FIELDING])
+
+        self.assertRaisesRegex(ValueError, "needs --flat-before", batch.run, self._args())
+
+        loader.load.assert_not_called()
+        saver.image_save.assert_not_called()
+
+    @mock.patch("mantidimaging.batch.saver")
+    @mock.patch("mantidimaging.batch.loader")
+    @mock.patch("mantidimaging.batch.reconstruct")
+    def test_run_reconstruct(self, reconstruct, loader, saver):
+        self._write_history([ARITHMETIC, COR_TILT])
+        loader.load.return_value = ImageStack(self.data.copy())
+
+        batch.run(self._args("--reconstruct"))
+
+        history = reconstruct.call_args.args[1]
+        self.assertEqual([ARITHMETIC, COR_TILT], history)
+        self.assertIs(reconstruct.return_value, saver.image_save.call_args.args[0])
+
+    @mock.patch("mantidimaging.batch.stream_process")
+    @mock.patch("mantidimaging.batch.get_file_names", return_value=["a.tif", "b.tif"])
+    def test_run_streaming(self, get_file_names, stream_process):
+        self._write_history([ARITHMETIC, COR_TILT])
+
+        batch.run(self._args("--slab-size", "0"))
+
+        file_names, ops, output_path = stream_process.call_args.args
+        self.assertEqual(["a.tif", "b.tif"], file_names)
+        self.assertEqual(["ArithmeticFilter"], [op.filter_name for op in ops])
+        self.assertIsNone(stream_process.call_args.kwargs["slab_size"])
+
+
+if __name__ == '__main__':
+    unittest.main()
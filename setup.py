@@ -226,8 +226,10 @@ setup(
         "mantidimaging.core": ["gpu/*.cu"],
     },
     entry_points={
-        "console_scripts":
-        ["mantidimaging-ipython = mantidimaging.ipython:main", "mantidimaging = mantidimaging.main:main"],
+        "console_scripts": [
+            "mantidimaging-ipython = mantidimaging.ipython:main", "mantidimaging = mantidimaging.main:main",
+            "mantidimaging-batch = mantidimaging.batch:main"
+        ],
     },
     url="https://github.com/mantidproject/mantidimaging",
     license="GPL-3.0",